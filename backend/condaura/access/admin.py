@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Access, Review
+from .models import Access, Review, ResourceOwner
 
 @admin.register(Access)
 class AccessAdmin(admin.ModelAdmin):
@@ -28,3 +28,9 @@ class ReviewAdmin(admin.ModelAdmin):
         ('Decision', {'fields': ('decision', 'comment', 'reviewed_at')}),
         ('Audit', {'fields': ('ip_address', 'user_agent', 'created_at', 'updated_at')}),
     )
+
+@admin.register(ResourceOwner)
+class ResourceOwnerAdmin(admin.ModelAdmin):
+    list_display = ('resource_name', 'owner', 'created_at')
+    search_fields = ('resource_name', 'owner__email')
+    raw_id_fields = ('owner',)
@@ -0,0 +1,220 @@
+import pandas as pd
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Access, Review
+from users.models import User
+from imports.base import BaseImporter
+
+
+class AccessImporter(BaseImporter):
+    """
+    Importe des accès depuis un fichier (CSV, XLSX ou Parquet) par lots:
+    chaque lot est validé dans un DataFrame (champs obligatoires, dates,
+    doublons dans le fichier, utilisateurs inconnus) avec une requête IN
+    pour les utilisateurs et une pour les access_id existants, puis est
+    écrit avec bulk_create dans une transaction.
+
+    En mode 'sync', le fichier est la référence complète: seules les
+    différences sont écrites (création, mise à jour des lignes dont
+    l'empreinte a changé, suppression des access_id absents du fichier).
+    Un accès absent qui porte des revues décidées n'est pas supprimé mais
+    marqué retiré (revoked_at), pour conserver l'historique de la revue.
+    """
+    REQUIRED_FIELDS = ['access_id', 'user_id', 'resource_name', 'layer', 'profile']
+    MODES = ('create', 'sync')
+    SYNC_UPDATE_FIELDS = ['user', 'resource_name', 'layer', 'profile', 'granted_date',
+                          'last_used', 'content_hash', 'revoked_at', 'updated_at']
+
+    def __init__(self, *args, mode='create', **kwargs):
+        super().__init__(*args, **kwargs)
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown import mode: {mode}")
+        self.mode = mode
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.revoked = 0
+        self.reviews_deleted = 0
+        self.reviews_kept = 0
+        self._seen_access_ids = set()
+        self._valid_rows = 0
+
+    def get_result(self):
+        """Résultat au format historique de l'API"""
+        result = {
+            'access_created': self.created,
+            'errors': self.errors
+        }
+        if self.mode == 'sync':
+            result.update({
+                'access_updated': self.updated,
+                'access_unchanged': self.unchanged,
+                'access_deleted': self.deleted,
+                'access_revoked': self.revoked,
+                'reviews_deleted': self.reviews_deleted,
+                'reviews_kept': self.reviews_kept,
+            })
+        if self.dry_run:
+            result['dry_run'] = True
+        return result
+
+    @staticmethod
+    def normalize_columns(frame):
+        """Compatibilité avec les anciens formats (resource_type / access_level)"""
+        renames = {}
+        if 'resource_type' in frame.columns and 'layer' not in frame.columns:
+            renames['resource_type'] = 'layer'
+        if 'access_level' in frame.columns and 'profile' not in frame.columns:
+            renames['access_level'] = 'profile'
+        if 'last_used' not in frame.columns:
+            frame = frame.assign(last_used='')
+        if 'granted_date' not in frame.columns:
+            frame = frame.assign(granted_date='')
+        return frame.rename(columns=renames)
+
+    @staticmethod
+    def parse_dates(values):
+        return pd.to_datetime(values.str.strip(), errors='coerce', format='ISO8601')
+
+    def validate_chunk(self, frame):
+        """
+        Valide un lot de façon vectorisée, sans écriture.
+        Renvoie les lignes valides et les accès existants du lot.
+        """
+        frame = self.normalize_columns(frame)
+        errors = self.missing_fields_errors(frame)
+
+        # Un access_id présent dans le fichier n'est jamais supprimé en
+        # mode sync, même si sa ligne est en erreur
+        seen_ids = self._seen_access_ids.copy()
+        if 'access_id' in frame.columns:
+            self._seen_access_ids.update(frame.loc[frame['access_id'].str.strip() != '', 'access_id'].tolist())
+
+        if (errors != '').all():
+            self.add_errors(errors)
+            return frame.iloc[0:0], {}
+
+        access_ids = frame['access_id']
+        complete = errors == ''
+
+        existing = {
+            access_id: (pk, content_hash, revoked_at)
+            for access_id, pk, content_hash, revoked_at in Access.objects.filter(
+                access_id__in=access_ids[complete].unique().tolist()
+            ).values_list('access_id', 'id', 'content_hash', 'revoked_at')
+        }
+
+        # Doublons dans le fichier (y compris les lots précédents) et,
+        # hors mode sync, accès déjà présents en base
+        duplicated = access_ids.duplicated(keep='first') | access_ids.isin(seen_ids)
+        if self.mode == 'create':
+            duplicated |= access_ids.isin(existing.keys())
+        self.flag(errors, duplicated, 'Access with ID ' + access_ids + ' already exists')
+
+        users_by_user_id = dict(
+            User.objects.filter(
+                user_id__in=frame.loc[errors == '', 'user_id'].unique().tolist()
+            ).values_list('user_id', 'id')
+        )
+        user_pks = frame['user_id'].map(users_by_user_id)
+        self.flag(errors, user_pks.isna(), 'User with ID ' + frame['user_id'] + ' not found')
+
+        granted_dates = self.parse_dates(frame['granted_date'])
+        last_used = self.parse_dates(frame['last_used'])
+        invalid_dates = granted_dates.isna() | ((frame['last_used'].str.strip() != '') & last_used.isna())
+        self.flag(errors, invalid_dates, 'Error processing row: invalid date for access ' + access_ids)
+
+        self.add_errors(errors)
+
+        valid = errors == ''
+        frame = frame[valid].assign(
+            user_pk=user_pks[valid].astype('int64'),
+            granted_date=granted_dates[valid].dt.date,
+            last_used=last_used[valid].dt.date
+        )
+        return frame, existing
+
+    def import_chunk(self, frame):
+        """Valide puis écrit un lot de lignes"""
+        frame, existing = self.validate_chunk(frame)
+        if frame.empty:
+            return
+        self._valid_rows += len(frame)
+
+        accesses_to_create = []
+        accesses_to_update = []
+        now = timezone.now()
+
+        for access_id, user_pk, resource_name, layer, profile, granted_date, last_used in zip(
+            frame['access_id'], frame['user_pk'], frame['resource_name'], frame['layer'],
+            frame['profile'], frame['granted_date'], frame['last_used']
+        ):
+            access = Access(
+                access_id=access_id,
+                user_id=int(user_pk),
+                resource_name=resource_name,
+                layer=layer,
+                profile=profile,
+                granted_date=granted_date,
+                last_used=None if pd.isna(last_used) else last_used
+            )
+            access.content_hash = access.compute_content_hash()
+
+            if access_id not in existing:
+                accesses_to_create.append(access)
+            elif existing[access_id][1] == access.content_hash and existing[access_id][2] is None:
+                self.unchanged += 1
+            else:
+                access.id = existing[access_id][0]
+                access.updated_at = now
+                accesses_to_update.append(access)
+
+        if not self.dry_run and (accesses_to_create or accesses_to_update):
+            with transaction.atomic():
+                Access.objects.bulk_create(accesses_to_create, batch_size=self.batch_size)
+                Access.objects.bulk_update(accesses_to_update, self.SYNC_UPDATE_FIELDS, batch_size=self.batch_size)
+        self.created += len(accesses_to_create)
+        self.updated += len(accesses_to_update)
+
+    def finalize(self):
+        """
+        En mode sync, traite les accès absents du fichier: leurs revues en
+        attente sont supprimées; un accès qui porte des revues décidées est
+        marqué retiré, les autres sont supprimés.
+        """
+        if self.mode != 'sync':
+            return
+        # Un fichier sans aucune ligne valide (mauvais séparateur, fichier
+        # tronqué...) ou illisible en cours de route ne doit pas vider la table
+        if not self._valid_rows or self.read_failed:
+            return
+
+        missing_ids = [
+            pk for pk, access_id in Access.objects.filter(revoked_at__isnull=True).values_list(
+                'id', 'access_id'
+            ).iterator(chunk_size=self.chunk_size)
+            if access_id not in self._seen_access_ids
+        ]
+
+        now = timezone.now()
+        with transaction.atomic():
+            for start in range(0, len(missing_ids), self.batch_size):
+                batch = missing_ids[start:start + self.batch_size]
+                reviews = Review.objects.filter(access_id__in=batch)
+                decided = dict(
+                    reviews.exclude(decision='pending').values('access_id').annotate(
+                        count=Count('id')
+                    ).values_list('access_id', 'count')
+                )
+                self.reviews_kept += sum(decided.values())
+                self.revoked += len(decided)
+                self.deleted += len(batch) - len(decided)
+                if self.dry_run:
+                    self.reviews_deleted += reviews.filter(decision='pending').count()
+                    continue
+
+                self.reviews_deleted += reviews.filter(decision='pending').delete()[1].get(Review._meta.label, 0)
+                Access.objects.filter(id__in=decided).update(revoked_at=now, updated_at=now)
+                Access.objects.filter(id__in=batch).exclude(id__in=decided).delete()
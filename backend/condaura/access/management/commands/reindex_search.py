@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from access.models import ACCESS_SEARCH_INDEX, REVIEW_SEARCH_INDEX
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les index de recherche plein texte des accès et des revues"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=['accesses', 'reviews'],
+                            help="Index à reconstruire; les deux par défaut")
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help="Nombre de lignes indexées par requête")
+
+    def handle(self, *args, **options):
+        indexes = {'accesses': ACCESS_SEARCH_INDEX, 'reviews': REVIEW_SEARCH_INDEX}
+        if options['only']:
+            indexes = {options['only']: indexes[options['only']]}
+        for name, index in indexes.items():
+            indexed = index.rebuild(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"{name}: {indexed} document(s) indexé(s)"))
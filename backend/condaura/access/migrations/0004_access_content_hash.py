@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access', '0003_rename_access_level_access_layer_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='access',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text="Empreinte du contenu, utilisée par l'import en mode sync", max_length=64),
+        ),
+    ]
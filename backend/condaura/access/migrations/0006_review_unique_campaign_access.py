@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    """Garde une revue par (campagne, accès): la plus ancienne décidée, sinon la plus ancienne"""
+    Review = apps.get_model('access', 'Review')
+    duplicates = (
+        Review.objects.values('campaign_id', 'access_id')
+        .annotate(count=models.Count('id'))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        reviews = Review.objects.filter(
+            campaign_id=duplicate['campaign_id'],
+            access_id=duplicate['access_id']
+        ).order_by(models.Case(models.When(decision='pending', then=1), default=0), 'id')
+        Review.objects.filter(id__in=list(reviews.values_list('id', flat=True)[1:])).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access', '0005_resourceowner'),
+        ('campaigns', '0004_campaign_assignment_method_campaign_reviewers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('campaign', 'access'), name='unique_review_per_campaign_access'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-17 19:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access', '0006_review_unique_campaign_access'),
+        ('campaigns', '0008_reviewerstat'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='access',
+            index=models.Index(fields=['-granted_date', '-id'], name='access_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-reviewed_at', '-created_at', '-id'], name='review_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['reviewer', '-reviewed_at', '-created_at', '-id'], name='review_reviewer_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+from condaura.search import SearchIndex
+
+# Champs indexés à la date de la migration
+INDEXES = (
+    ('access_search', 'Access', (
+        'resource_name', 'user__first_name', 'user__last_name', 'user__department'
+    )),
+    ('review_search', 'Review', (
+        'access__resource_name', 'access__user__first_name', 'access__user__last_name',
+        'access__user__department', 'comment'
+    )),
+)
+
+
+def search_indexes(apps):
+    return [SearchIndex(table, apps.get_model('access', model_name), fields) for table, model_name, fields in INDEXES]
+
+
+def create_search_indexes(apps, schema_editor):
+    for index in search_indexes(apps):
+        index.create(schema_editor.connection)
+        index.rebuild(using=schema_editor.connection.alias)
+
+
+def drop_search_indexes(apps, schema_editor):
+    for index in search_indexes(apps):
+        index.drop(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access', '0007_keyset_indexes'),
+        ('users', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,37 @@
+import hashlib
+
+from django.db import migrations
+
+
+def hash_content(user_pk, resource_name, layer, profile, granted_date, last_used):
+    """Empreinte des champs importés, telle que calculée par Access.hash_content"""
+    values = [user_pk, resource_name, layer, profile, granted_date, last_used or '']
+    return hashlib.sha256('\x1f'.join(str(value) for value in values).encode('utf-8')).hexdigest()
+
+
+def backfill_content_hash(apps, schema_editor):
+    """Calcule l'empreinte des accès créés avant son introduction"""
+    Access = apps.get_model('access', 'Access')
+    accesses = Access.objects.using(schema_editor.connection.alias).filter(content_hash='').only(
+        'id', 'user_id', 'resource_name', 'layer', 'profile', 'granted_date', 'last_used'
+    )
+    batch = []
+    for access in accesses.iterator(chunk_size=1000):
+        access.content_hash = hash_content(access.user_id, access.resource_name, access.layer,
+                                           access.profile, access.granted_date, access.last_used)
+        batch.append(access)
+        if len(batch) == 1000:
+            Access.objects.using(schema_editor.connection.alias).bulk_update(batch, ['content_hash'])
+            batch = []
+    Access.objects.using(schema_editor.connection.alias).bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
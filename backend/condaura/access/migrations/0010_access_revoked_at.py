@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access', '0009_backfill_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='access',
+            name='revoked_at',
+            field=models.DateTimeField(blank=True, help_text="Retrait du référentiel par un import sync; l'accès est conservé pour ses revues décidées", null=True),
+        ),
+    ]
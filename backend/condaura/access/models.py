@@ -1,5 +1,92 @@
-from django.db import models
+import hashlib
+from collections import Counter, namedtuple
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.db.models import (
+    Case, CharField, Count, DateTimeField, DurationField, ExpressionWrapper, F, IntegerField, Max, Value, When
+)
 from users.models import User
+from campaigns.latency import LATENCY_BUCKETS, latency_bucket
+from condaura.search import SearchIndex
+from condaura.tracking import changed_fields
+
+class AccessQuerySet(models.QuerySet):
+    """
+    Les écritures en masse tiennent à jour l'index de recherche des accès
+    et celui des revues, dont les documents reprennent les champs de l'accès,
+    ainsi que les statistiques des revues, groupées par layer, profile et
+    département du titulaire de l'accès
+    """
+    SEARCH_FIELDS = {'resource_name', 'user', 'user_id'}
+    ROLLUP_FIELDS = {'layer', 'profile', 'user', 'user_id'}
+    # Autres champs repris dans les rapports de campagne
+    REPORT_FIELDS = {'access_id', 'granted_date', 'last_used'}
+    
+    def refresh_search(self, access_ids, bump=True):
+        """
+        Réindexe les accès et leurs revues, dont les campagnes changent de
+        révision (sauf `bump=False`, si l'appelant l'a déjà fait)
+        """
+        reviews = Review.objects.using(self.db).filter(access_id__in=access_ids)
+        ACCESS_SEARCH_INDEX.refresh(self.model.objects.using(self.db).filter(pk__in=access_ids))
+        REVIEW_SEARCH_INDEX.refresh(reviews)
+        if bump:
+            Review.objects.all().campaign_model.bump_revision(reviews.values('campaign_id'))
+    
+    def tracked_write(self, access_ids, fields, write):
+        """
+        Exécute `write`, une écriture des champs `fields` des accès
+        `access_ids`, puis réindexe ces accès et déplace les comptes de
+        leurs revues vers leurs nouveaux layer, profile et département.
+        Les campagnes de ces revues changent de révision.
+        """
+        reviews = Review.objects.using(self.db).filter(access_id__in=access_ids)
+        if self.ROLLUP_FIELDS & fields:
+            rows = reviews.moving_rollup(write)
+        else:
+            rows = write()
+        if self.SEARCH_FIELDS & fields:
+            # Le déplacement des statistiques a déjà changé la révision
+            self.refresh_search(access_ids, bump=not self.ROLLUP_FIELDS & fields)
+        elif self.REPORT_FIELDS & fields:
+            reviews.campaign_model.bump_revision(reviews.values('campaign_id'))
+        return rows
+    
+    def update(self, **kwargs):
+        # bulk_update() écrit par des update(), un par lot
+        if not (self.SEARCH_FIELDS | self.ROLLUP_FIELDS | self.REPORT_FIELDS) & kwargs.keys():
+            return super().update(**kwargs)
+        
+        with transaction.atomic(using=self.db, savepoint=False):
+            access_ids = list(self.values_list('pk', flat=True))
+            return self.tracked_write(access_ids, set(kwargs), lambda: super(AccessQuerySet, self).update(**kwargs))
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            created = super().bulk_create(objs, *args, **kwargs)
+            if all(obj.pk for obj in objs):
+                ACCESS_SEARCH_INDEX.refresh(
+                    self.model.objects.using(self.db).filter(pk__in=[obj.pk for obj in objs]),
+                    created=not (kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'))
+                )
+            else:
+                # Clés primaires non renvoyées (ignore_conflicts...)
+                ACCESS_SEARCH_INDEX.refresh(self.model.objects.using(self.db).filter(
+                    access_id__in=[obj.access_id for obj in objs]
+                ))
+            return created
+    
+    def delete(self):
+        # Supprimer les revues par ReviewQuerySet.delete plutôt que par
+        # la cascade, pour tenir à jour les compteurs des campagnes
+        with transaction.atomic(using=self.db):
+            Review.objects.filter(access__in=self.values('pk')).delete()
+            ACCESS_SEARCH_INDEX.remove(self)
+            return super().delete()
 
 class Access(models.Model):
     access_id = models.CharField(max_length=50, unique=True)
@@ -9,16 +96,364 @@ class Access(models.Model):
     profile = models.CharField(max_length=50)
     granted_date = models.DateField()
     last_used = models.DateField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, help_text="Empreinte du contenu, utilisée par l'import en mode sync")
+    revoked_at = models.DateTimeField(null=True, blank=True, help_text="Retrait du référentiel par un import sync; l'accès est conservé pour ses revues décidées")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = AccessQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.user.username} - {self.resource_name} ({self.profile})"
     
+    @staticmethod
+    def hash_content(user_pk, resource_name, layer, profile, granted_date, last_used):
+        """Empreinte SHA-256 des champs importés d'un accès"""
+        values = [user_pk, resource_name, layer, profile, granted_date, last_used or '']
+        return hashlib.sha256('\x1f'.join(str(value) for value in values).encode('utf-8')).hexdigest()
+    
+    def compute_content_hash(self):
+        return self.hash_content(self.user_id, self.resource_name, self.layer,
+                                 self.profile, self.granted_date, self.last_used)
+    
+    def save(self, *args, **kwargs):
+        self.content_hash = self.compute_content_hash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content_hash' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['content_hash']
+        
+        if self._state.adding:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                ACCESS_SEARCH_INDEX.refresh(Access.objects.filter(pk=self.pk), created=True)
+            return
+        
+        # Champs indexés, groupant les statistiques ou repris dans les
+        # rapports qui changent vraiment
+        tracked = AccessQuerySet.SEARCH_FIELDS | AccessQuerySet.ROLLUP_FIELDS | AccessQuerySet.REPORT_FIELDS
+        changed = changed_fields(self, tracked - {'user_id'}, kwargs.get('update_fields'))
+        if not changed:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            Access.objects.tracked_write([self.pk], changed, lambda: super(Access, self).save(*args, **kwargs))
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            self.reviews.all().delete()
+            ACCESS_SEARCH_INDEX.remove(Access.objects.filter(pk=self.pk))
+            return super().delete(*args, **kwargs)
+    
     class Meta:
         verbose_name = 'Access'
         verbose_name_plural = 'Accesses'
         ordering = ['-granted_date']
+        indexes = [
+            # Pagination par clé de la liste des accès
+            models.Index(fields=['-granted_date', '-id'], name='access_keyset_idx'),
+        ]
+
+class ResourceOwner(models.Model):
+    """Owner of a resource, who reviews its accesses with the resource_owner assignment method"""
+    resource_name = models.CharField(max_length=200, unique=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='owned_resources')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.resource_name} ({self.owner.email})"
+    
+    class Meta:
+        verbose_name = 'Resource Owner'
+        verbose_name_plural = 'Resource Owners'
+        ordering = ['resource_name']
+
+# État d'une revue tel que le voient les statistiques: clé de CampaignStat
+# (les cinq premiers champs) et de ReviewerStat
+ReviewState = namedtuple('ReviewState', [
+    'campaign_id', 'department', 'layer', 'profile', 'decision',
+    'reviewer_id', 'reviewed_at', 'created_at', 'access_id'
+])
+
+class ReviewQuerySet(models.QuerySet):
+    """
+    Les écritures en masse (update, delete, bulk_create) tiennent à jour,
+    dans la même transaction, les compteurs de décision des campagnes et
+    la table de statistiques CampaignStat. Les variations sont calculées
+    par clé (campagne, département, layer, profile, décision).
+    Les campagnes concernées sont verrouillées avant de lire les décisions,
+    ce qui sérialise les écritures concurrentes sur une même campagne.
+    
+    Les statistiques par réviseur (ReviewerStat) sont tenues à jour de la
+    même façon, par clé (campagne, réviseur, décision, tranche de délai),
+    ainsi que l'index de recherche des revues.
+    """
+    COUNTED_FIELDS = {'decision', 'campaign', 'campaign_id', 'access', 'access_id'}
+    REVIEWER_FIELDS = {'reviewer', 'reviewer_id', 'reviewed_at'}
+    SEARCH_FIELDS = {'comment', 'access', 'access_id'}
+    ROLLUP_FIELDS = ('campaign_id', 'access__user__department', 'access__layer', 'access__profile', 'decision')
+    STATE_FIELDS = ROLLUP_FIELDS + ('reviewer_id', 'reviewed_at', 'created_at', 'access_id')
+    
+    def visible_to(self, user):
+        """Toutes les revues pour un administrateur, sinon celles du réviseur"""
+        if user.is_staff or user.role == 'admin':
+            return self.all()
+        return self.filter(reviewer=user)
+    
+    @property
+    def campaign_model(self):
+        return self.model._meta.get_field('campaign').related_model
+    
+    def lock_campaigns(self, campaign_ids):
+        """Verrouille les campagnes (SELECT ... FOR UPDATE), dans l'ordre des id"""
+        return set(
+            self.campaign_model.objects.using(self.db).select_for_update()
+            .filter(id__in=campaign_ids).order_by('id').values_list('id', flat=True)
+        )
+    
+    def moving_rollup(self, write, **dimensions):
+        """
+        Exécute `write`, une écriture qui change le département, le layer
+        ou le profile des revues du queryset (par leur accès), et reporte
+        leurs comptes des anciennes clés de statistiques vers les nouvelles.
+        Le queryset doit désigner les mêmes revues avant et après l'écriture.
+        
+        Si la nouvelle valeur est commune à toutes les revues (`dimensions`,
+        par exemple department='Finance'), les nouvelles clés se déduisent
+        des anciennes, sans recompter après l'écriture.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            self.lock_campaigns(self.values('campaign_id'))
+            before = self.rollup_counts()
+            result = write()
+            if before:
+                if dimensions:
+                    positions = {'department': 1, 'layer': 2, 'profile': 3}
+                    deltas = Counter()
+                    for key, count in before.items():
+                        moved = list(key)
+                        for name, value in dimensions.items():
+                            moved[positions[name]] = value
+                        deltas[key] -= count
+                        deltas[tuple(moved)] += count
+                else:
+                    deltas = Counter(self.rollup_counts())
+                    deltas.subtract(before)
+                self.campaign_model.apply_review_deltas(deltas)
+            return result
+    
+    def rollup_counts(self):
+        """{(campaign_id, department, layer, profile, decision): nombre de revues} du queryset"""
+        return {
+            row[:-1]: row[-1]
+            for row in self.order_by().values_list(*self.ROLLUP_FIELDS).annotate(count=Count('id'))
+        }
+    
+    def reviewer_counts(self, **changes):
+        """
+        {(campaign_id, reviewer_id, decision, tranche de délai): (nombre, dernier reviewed_at)}
+        des revues du queryset, ou de ce qu'elles seraient après update(**changes):
+        les valeurs de l'UPDATE sont évaluées sur les lignes avant écriture
+        """
+        state = {
+            'stat_reviewer': (changes.get('reviewer_id', changes.get('reviewer', F('reviewer_id'))), IntegerField()),
+            'stat_decision': (changes.get('decision', F('decision')), CharField()),
+            'stat_reviewed_at': (changes.get('reviewed_at', F('reviewed_at')), DateTimeField()),
+        }
+        annotations = {
+            name: value if hasattr(value, 'resolve_expression') else Value(getattr(value, 'pk', value), output_field=output_field)
+            for name, (value, output_field) in state.items()
+        }
+        bucket = Case(
+            When(stat_reviewed_at__isnull=True, then=Value(None)),
+            *(When(stat_latency__lt=timedelta(seconds=bound), then=Value(index))
+              for index, bound in enumerate(LATENCY_BUCKETS[1:])),
+            default=Value(len(LATENCY_BUCKETS) - 1),
+            output_field=IntegerField()
+        )
+        rows = (
+            self.order_by().annotate(**annotations)
+            .annotate(stat_latency=ExpressionWrapper(F('stat_reviewed_at') - F('created_at'), output_field=DurationField()))
+            .annotate(stat_bucket=bucket)
+            .values_list('campaign_id', 'stat_reviewer', 'stat_decision', 'stat_bucket')
+            .annotate(count=Count('id'), last=Max('stat_reviewed_at'))
+        )
+        return {row[:4]: (row[4], row[5]) for row in rows}
+    
+    def review_states(self):
+        """{id: ReviewState} des revues du queryset, en une requête"""
+        return {
+            row[0]: ReviewState(*row[1:])
+            for row in self.order_by().values_list('pk', *self.STATE_FIELDS)
+        }
+    
+    @staticmethod
+    def state_deltas(changes):
+        """
+        Variations des statistiques pour des couples (état avant, état après),
+        None pour une revue créée ou supprimée: (variations par clé de
+        CampaignStat, variations par clé de ReviewerStat)
+        """
+        deltas = Counter()
+        reviewer_deltas = {}
+        for before, after in changes:
+            for state, sign in ((before, -1), (after, 1)):
+                if state is None:
+                    continue
+                deltas[state[:5]] += sign
+                latency = state.reviewed_at - state.created_at if state.reviewed_at else None
+                key = (state.campaign_id, state.reviewer_id, state.decision, latency_bucket(latency))
+                count, last = reviewer_deltas.get(key, (0, None))
+                if sign > 0:
+                    last = max(filter(None, (last, state.reviewed_at)), default=None)
+                reviewer_deltas[key] = (count + sign, last)
+        return deltas, reviewer_deltas
+    
+    @staticmethod
+    def reviewer_deltas(before, after=None):
+        """Variations {clé: (delta, dernier reviewed_at)} des comptes `before` aux comptes `after`"""
+        deltas = {key: (-count, None) for key, (count, _) in before.items()}
+        for key, (count, last) in (after or {}).items():
+            deltas[key] = (deltas.get(key, (0, None))[0] + count, last)
+        return deltas
+    
+    def update(self, **kwargs):
+        if not self.SEARCH_FIELDS & kwargs.keys():
+            return self.counted_update(**kwargs)
+        
+        # Les documents des revues modifiées sont recalculés après l'UPDATE
+        with transaction.atomic(using=self.db):
+            review_ids = list(self.values_list('pk', flat=True))
+            rows = self.counted_update(**kwargs)
+            reviews = self.model.objects.using(self.db).filter(pk__in=review_ids)
+            REVIEW_SEARCH_INDEX.refresh(reviews)
+            if not (self.COUNTED_FIELDS | self.REVIEWER_FIELDS) & kwargs.keys():
+                # Sinon déjà fait par la mise à jour des compteurs
+                self.campaign_model.bump_revision(reviews.values('campaign_id'))
+            return rows
+    
+    def counted_updates(self, updates):
+        """
+        Plusieurs UPDATE [(ids, valeurs)] des revues du queryset en un seul
+        passage: les campagnes sont verrouillées et l'état des revues lu une
+        fois avant écriture, puis les variations des compteurs et
+        statistiques, calculées en mémoire, sont appliquées ensemble.
+        Les id des différents UPDATE sont distincts; décision, réviseur et
+        reviewed_at reçoivent des constantes, campagne et accès ne changent pas.
+        Renvoie les id des revues modifiées.
+        """
+        if any((self.COUNTED_FIELDS - {'decision'}) & values.keys() for _, values in updates):
+            raise ValueError("counted_updates() cannot change the campaign or the access of a review")
+        
+        with transaction.atomic(using=self.db):
+            targets = self.filter(pk__in=[review_id for ids, _ in updates for review_id in ids])
+            self.lock_campaigns(targets.values('campaign_id'))
+            states = targets.review_states()
+            
+            changes = []
+            search = False
+            for ids, values in updates:
+                ids = [review_id for review_id in ids if review_id in states]
+                if not ids:
+                    continue
+                super(ReviewQuerySet, self.model.objects.using(self.db).filter(pk__in=ids)).update(**values)
+                new_state = {
+                    'reviewer_id' if name == 'reviewer' else name: getattr(value, 'pk', value)
+                    for name, value in values.items()
+                    if name in ('decision', 'reviewer', 'reviewer_id', 'reviewed_at')
+                }
+                changes.extend((states[review_id], states[review_id]._replace(**new_state)) for review_id in ids)
+                search = search or bool(self.SEARCH_FIELDS & values.keys())
+            
+            if changes:
+                self.campaign_model.apply_review_deltas(*self.state_deltas(changes))
+            if search:
+                REVIEW_SEARCH_INDEX.refresh(self.model.objects.using(self.db).filter(pk__in=list(states)))
+            return set(states)
+    
+    def counted_update(self, **kwargs):
+        """UPDATE avec mise à jour des compteurs et statistiques"""
+        if not (self.COUNTED_FIELDS | self.REVIEWER_FIELDS) & kwargs.keys():
+            return super().update(**kwargs)
+        
+        with transaction.atomic(using=self.db):
+            campaign_ids = self.lock_campaigns(self.values('campaign_id'))
+            decision = kwargs.get('decision')
+            
+            if (decision is None or isinstance(decision, str)) and not (self.COUNTED_FIELDS - {'decision'}) & kwargs.keys():
+                # Cas courant (bulk_approve, réattribution...): toutes les
+                # revues passent à la même décision, les variations se
+                # déduisent des comptes lus avant l'UPDATE
+                before = self.rollup_counts() if decision is not None else {}
+                reviewer_deltas = self.reviewer_deltas(self.reviewer_counts(), self.reviewer_counts(**kwargs))
+                rows = super().update(**kwargs)
+                deltas = Counter()
+                for key, count in before.items():
+                    deltas[key] -= count
+                    deltas[key[:-1] + (decision,)] += count
+                self.campaign_model.apply_review_deltas(deltas, reviewer_deltas)
+                return rows
+            
+            # Changement de campagne, d'accès ou expression: recompte des
+            # campagnes touchées
+            target = kwargs.get('campaign_id', kwargs.get('campaign'))
+            if target is not None:
+                campaign_ids |= self.lock_campaigns([getattr(target, 'pk', target)])
+            rows = super().update(**kwargs)
+            self.campaign_model.refresh_review_counts(campaign_ids)
+            return rows
+    
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            self.lock_campaigns(self.values('campaign_id'))
+            before = self.rollup_counts()
+            reviewer_deltas = self.reviewer_deltas(self.reviewer_counts())
+            REVIEW_SEARCH_INDEX.remove(self)
+            result = super().delete()
+            self.campaign_model.apply_review_deltas(
+                {key: -count for key, count in before.items()},
+                reviewer_deltas
+            )
+            return result
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        campaign_ids = {obj.campaign_id for obj in objs}
+        
+        with transaction.atomic(using=self.db):
+            self.lock_campaigns(campaign_ids)
+            created = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+                # On ne sait pas quelles lignes ont été écrites
+                self.campaign_model.refresh_review_counts(campaign_ids)
+            else:
+                dimensions = {
+                    access_id: (department, layer, profile)
+                    for access_id, department, layer, profile in Access.objects.using(self.db).filter(
+                        id__in={obj.access_id for obj in objs}
+                    ).values_list('id', 'user__department', 'layer', 'profile')
+                }
+                reviewer_deltas = {}
+                for obj in objs:
+                    latency = obj.reviewed_at - obj.created_at if obj.reviewed_at else None
+                    key = (obj.campaign_id, obj.reviewer_id, obj.decision, latency_bucket(latency))
+                    count, last = reviewer_deltas.get(key, (0, None))
+                    reviewer_deltas[key] = (count + 1, max(filter(None, (last, obj.reviewed_at)), default=None))
+                self.campaign_model.apply_review_deltas(Counter(
+                    (obj.campaign_id, *dimensions[obj.access_id], obj.decision) for obj in objs
+                ), reviewer_deltas)
+            
+            if all(obj.pk for obj in objs):
+                REVIEW_SEARCH_INDEX.refresh(
+                    self.model.objects.using(self.db).filter(pk__in=[obj.pk for obj in objs]),
+                    created=not (kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'))
+                )
+            else:
+                # Clés primaires non renvoyées: les revues des mêmes campagnes
+                # et accès, un sur-ensemble sans conséquence
+                REVIEW_SEARCH_INDEX.refresh(self.model.objects.using(self.db).filter(
+                    campaign_id__in=campaign_ids,
+                    access_id__in={obj.access_id for obj in objs}
+                ))
+            return created
 
 class Review(models.Model):
     DECISION_CHOICES = (
@@ -39,10 +474,116 @@ class Review(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
     
+    objects = ReviewQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.access} - {self.decision}"
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not ReviewQuerySet.SEARCH_FIELDS & set(update_fields):
+            return self.counted_save(*args, **kwargs)
+        
+        with transaction.atomic():
+            self.counted_save(*args, **kwargs)
+            REVIEW_SEARCH_INDEX.refresh(Review.objects.filter(pk=self.pk))
+            tracked_fields = ReviewQuerySet.COUNTED_FIELDS | ReviewQuerySet.REVIEWER_FIELDS
+            if update_fields is not None and not tracked_fields & set(update_fields):
+                # Sans compteur modifié, la révision de la campagne n'a pas changé
+                Review.objects.all().campaign_model.bump_revision([self.campaign_id])
+    
+    def counted_save(self, *args, **kwargs):
+        """
+        save() avec mise à jour des compteurs et statistiques: l'état de la
+        revue est lu en une requête avant écriture, l'état après écriture
+        se déduit des valeurs de l'instance
+        """
+        update_fields = kwargs.get('update_fields')
+        tracked_fields = ReviewQuerySet.COUNTED_FIELDS | ReviewQuerySet.REVIEWER_FIELDS
+        if update_fields is not None and not tracked_fields & set(update_fields):
+            return super().save(*args, **kwargs)
+        
+        queryset = Review.objects.all()
+        with transaction.atomic():
+            queryset.lock_campaigns([self.campaign_id])
+            before = None
+            if not self._state.adding and self.pk:
+                before = Review.objects.filter(pk=self.pk).review_states().get(self.pk)
+                if before is not None and before.campaign_id != self.campaign_id:
+                    queryset.lock_campaigns([before.campaign_id])
+            
+            super().save(*args, **kwargs)
+            
+            # Champs écrits par save(): update_fields, ou les champs chargés
+            written = set(update_fields) if update_fields is not None else None
+            deferred = self.get_deferred_fields()
+            values = {}
+            for name in ('campaign', 'access', 'decision', 'reviewer', 'reviewed_at'):
+                attname = self._meta.get_field(name).attname
+                if before is None or (
+                    (written is None or name in written or attname in written) and attname not in deferred
+                ):
+                    values['reviewer_id' if name == 'reviewer' else attname] = getattr(self, attname)
+            if before is None:
+                after = ReviewState(
+                    department=None, layer=None, profile=None, created_at=self.created_at, **values
+                )
+            else:
+                after = before._replace(**values)
+            if before is None or after.access_id != before.access_id:
+                after = after._replace(**dict(zip(
+                    ('department', 'layer', 'profile'),
+                    Access.objects.filter(pk=after.access_id).values_list('user__department', 'layer', 'profile').get()
+                )))
+            
+            queryset.campaign_model.apply_review_deltas(*queryset.state_deltas([(before, after)]))
+    
+    def delete(self, *args, **kwargs):
+        queryset = Review.objects.all()
+        with transaction.atomic():
+            queryset.lock_campaigns([self.campaign_id])
+            before = Review.objects.filter(pk=self.pk).rollup_counts()
+            reviewer_deltas = queryset.reviewer_deltas(Review.objects.filter(pk=self.pk).reviewer_counts())
+            REVIEW_SEARCH_INDEX.remove(Review.objects.filter(pk=self.pk))
+            result = super().delete(*args, **kwargs)
+            queryset.campaign_model.apply_review_deltas(
+                {key: -count for key, count in before.items()},
+                reviewer_deltas
+            )
+            return result
+    
     class Meta:
         verbose_name = 'Review'
         verbose_name_plural = 'Reviews'
         ordering = ['-reviewed_at', '-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'access'], name='unique_review_per_campaign_access'),
+        ]
+        indexes = [
+            # Pagination par clé des listes de revues, globale et par réviseur
+            models.Index(fields=['-reviewed_at', '-created_at', '-id'], name='review_keyset_idx'),
+            models.Index(fields=['reviewer', '-reviewed_at', '-created_at', '-id'], name='review_reviewer_keyset_idx'),
+        ]
+
+# Index de recherche plein texte (voir condaura.search), créés par la
+# migration 0008_search_index
+ACCESS_SEARCH_INDEX = SearchIndex('access_search', Access, (
+    'resource_name', 'user__first_name', 'user__last_name', 'user__department'
+))
+REVIEW_SEARCH_INDEX = SearchIndex('review_search', Review, (
+    'access__resource_name', 'access__user__first_name', 'access__user__last_name',
+    'access__user__department', 'comment'
+))
+
+# La cascade du collecteur de Django n'appelle ni AccessQuerySet.delete ni
+# ReviewQuerySet.delete: les accès et revues d'un parent supprimé le sont
+# d'abord par ces méthodes, qui tiennent à jour compteurs, statistiques
+# et index de recherche
+@receiver(pre_delete, sender=User)
+def delete_user_reviews(sender, instance, using, **kwargs):
+    Review.objects.using(using).filter(reviewer=instance).delete()
+    Access.objects.using(using).filter(user=instance).delete()
+
+@receiver(pre_delete, sender='campaigns.Campaign')
+def delete_campaign_reviews(sender, instance, using, **kwargs):
+    Review.objects.using(using).filter(campaign=instance).delete()
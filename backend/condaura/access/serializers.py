@@ -2,16 +2,24 @@ from rest_framework import serializers
 from .models import Access, Review
 from users.serializers import UserSerializer
 from campaigns.serializers import CampaignSerializer
+from condaura.serializers import SparseFieldsetMixin
 
-class AccessSerializer(serializers.ModelSerializer):
+class AccessSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_name = serializers.SerializerMethodField()
     
+    field_columns = {
+        'user_name': ('user__first_name', 'user__last_name'),
+    }
+    expandable_fields = {
+        'user': UserSerializer,
+    }
+    
     class Meta:
         model = Access
         fields = ['id', 'access_id', 'user', 'user_name', 'resource_name', 
                   'layer', 'profile', 'granted_date', 'last_used',
-                  'created_at', 'updated_at']
-        read_only_fields = ['created_at', 'updated_at']
+                  'revoked_at', 'created_at', 'updated_at']
+        read_only_fields = ['revoked_at', 'created_at', 'updated_at']
     
     def get_user_name(self, obj):
         return f"{obj.user.first_name} {obj.user.last_name}"
@@ -23,13 +31,24 @@ class AccessDetailSerializer(serializers.ModelSerializer):
         model = Access
         fields = ['id', 'access_id', 'user', 'resource_name', 
                   'layer', 'profile', 'granted_date', 'last_used',
-                  'created_at', 'updated_at']
-        read_only_fields = ['created_at', 'updated_at']
+                  'revoked_at', 'created_at', 'updated_at']
+        read_only_fields = ['revoked_at', 'created_at', 'updated_at']
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     reviewer_name = serializers.SerializerMethodField()
     access_details = serializers.SerializerMethodField()
     
+    field_columns = {
+        'reviewer_name': ('reviewer__first_name', 'reviewer__last_name'),
+        'access_details': ('access__resource_name', 'access__layer', 'access__profile',
+                           'access__user__first_name', 'access__user__last_name'),
+    }
+    expandable_fields = {
+        'campaign': CampaignSerializer,
+        'access': AccessSerializer,
+        'reviewer': UserSerializer,
+    }
+    
     class Meta:
         model = Review
         fields = ['id', 'campaign', 'access', 'access_details', 'reviewer', 'reviewer_name',
@@ -0,0 +1,91 @@
+from django.utils import timezone
+from django.db.models import Case, CharField, Value, When
+
+from .models import Review
+
+class ReviewService:
+    # Décisions acceptées par bulk_decide
+    BULK_DECISIONS = ('approved', 'rejected', 'deferred')
+    # Nombre maximal d'id par UPDATE
+    BULK_BATCH_SIZE = 5000
+
+    @staticmethod
+    def bulk_decide(user, items, ip_address=None, user_agent=''):
+        """
+        Enregistre en masse les décisions {id, decision, comment} d'un réviseur
+
+        Les éléments sont regroupés par décision: un UPDATE par décision
+        (et par lot de BULK_BATCH_SIZE id), le commentaire de chaque ligne
+        étant choisi par un CASE. reviewed_at, ip_address et user_agent sont
+        renseignés comme lors d'une décision unitaire; les compteurs des
+        campagnes sont tenus à jour une fois pour tous les lots par
+        ReviewQuerySet.counted_updates.
+        Renvoie le résultat de chaque id, dans l'ordre des éléments.
+        """
+        if not isinstance(items, list) or not items:
+            return False, "Aucune décision fournie"
+
+        results = []
+        valid = {}  # id -> (décision, commentaire)
+        for item in items:
+            review_id = item.get('id') if isinstance(item, dict) else None
+            try:
+                if isinstance(review_id, (bool, float)):
+                    raise TypeError
+                review_id = int(review_id)
+            except (TypeError, ValueError):
+                results.append({'id': review_id, 'status': 'error', 'error': 'Invalid review ID'})
+                continue
+            decision = item.get('decision')
+            if decision not in ReviewService.BULK_DECISIONS:
+                results.append({'id': review_id, 'status': 'error', 'error': f'Invalid decision: {decision}'})
+                continue
+            if review_id in valid:
+                results.append({'id': review_id, 'status': 'error', 'error': 'Duplicate review ID'})
+                continue
+            valid[review_id] = (decision, str(item.get('comment') or ''))
+            results.append({'id': review_id, 'status': 'updated', 'decision': decision})
+
+        by_decision = {}
+        for review_id, (decision, comment) in valid.items():
+            by_decision.setdefault(decision, {})[review_id] = comment
+
+        now = timezone.now()
+        updates = []
+        for decision, comments in by_decision.items():
+            review_ids = list(comments)
+            for start in range(0, len(review_ids), ReviewService.BULK_BATCH_SIZE):
+                batch = review_ids[start:start + ReviewService.BULK_BATCH_SIZE]
+                updates.append((batch, {
+                    'decision': decision,
+                    'comment': ReviewService.comment_expression({review_id: comments[review_id] for review_id in batch}),
+                    'reviewed_at': now,
+                    'ip_address': ip_address,
+                    'user_agent': user_agent,
+                }))
+
+        # Seules les revues assignées à l'utilisateur peuvent être décidées
+        found = Review.objects.filter(reviewer=user).counted_updates(updates) if updates else set()
+
+        for result in results:
+            if result['status'] == 'updated' and result['id'] not in found:
+                result.update({'status': 'error', 'error': 'Review not found'})
+                del result['decision']
+
+        return True, {
+            'updated_count': sum(result['status'] == 'updated' for result in results),
+            'results': results
+        }
+
+    @staticmethod
+    def comment_expression(comments):
+        """Commentaire de chaque id: une valeur si tous sont identiques, sinon un CASE par commentaire"""
+        ids_by_comment = {}
+        for review_id, comment in comments.items():
+            ids_by_comment.setdefault(comment, []).append(review_id)
+        if len(ids_by_comment) == 1:
+            return next(iter(ids_by_comment))
+        return Case(
+            *(When(id__in=review_ids, then=Value(comment)) for comment, review_ids in ids_by_comment.items()),
+            output_field=CharField()
+        )
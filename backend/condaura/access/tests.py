@@ -4,12 +4,17 @@ from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
 import datetime
+import importlib
 import io
 import csv
+from types import SimpleNamespace
 
 from .models import Access, Review
-from campaigns.models import Campaign
+from campaigns.models import Campaign, CampaignStat, ReviewerStat
 
 User = get_user_model()
 
@@ -219,7 +224,7 @@ class AccessAPITests(TestCase):
     
     def test_import_csv(self):
         """Test l'importation d'accès depuis un CSV"""
-        url = reverse('access-import-csv')
+        url = reverse('access-import-csv') + '?sync=true'
         
         # Créer un fichier CSV en mémoire
         csv_file = io.StringIO()
@@ -413,3 +418,962 @@ class ReviewAPITests(TestCase):
         other_review.refresh_from_db()
         self.assertEqual(other_review.decision, 'pending')
         self.assertEqual(other_review.comment, '')
+
+class AccessImportTests(TestCase):
+    """Tests pour l'import en masse des accès"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        self.user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            first_name='Test',
+            last_name='User',
+            user_id='USER001',
+            department='IT'
+        )
+        
+        Access.objects.create(
+            access_id='ACCESS001',
+            user=self.user,
+            resource_name='Existing Resource',
+            layer='Application',
+            profile='Read',
+            granted_date=timezone.now().date()
+        )
+        
+        self.client.force_authenticate(user=self.admin)
+    
+    def build_csv(self, rows, header=None):
+        csv_file = io.StringIO()
+        writer = csv.writer(csv_file)
+        writer.writerow(header or ['access_id', 'user_id', 'resource_name', 'layer', 'profile', 'granted_date', 'last_used'])
+        writer.writerows(rows)
+        upload = io.BytesIO(csv_file.getvalue().encode('utf-8'))
+        upload.name = 'accesses.csv'
+        return upload
+    
+    def test_import_creates_accesses_and_reports_errors(self):
+        """Test l'import: création, doublons et utilisateurs inconnus"""
+        today = timezone.now().date().isoformat()
+        upload = self.build_csv([
+            ['ACCESS002', 'USER001', 'Resource 2', 'Application', 'Read', today, ''],
+            ['ACCESS003', 'USER001', 'Resource 3', 'Database', 'Write', today, today],
+            ['ACCESS001', 'USER001', 'Duplicate', 'Application', 'Read', today, ''],
+            ['ACCESS002', 'USER001', 'Duplicate in file', 'Application', 'Read', today, ''],
+            ['ACCESS004', 'UNKNOWN', 'Resource 4', 'Application', 'Read', today, ''],
+            ['ACCESS005', 'USER001', '', 'Application', 'Read', today, ''],
+            ['ACCESS006', 'USER001', 'Resource 6', 'Application', 'Read', 'not-a-date', ''],
+        ])
+        
+        response = self.client.post(reverse('access-import-csv') + '?sync=true', {'file': upload}, format='multipart')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['access_created'], 2)
+        self.assertEqual(len(response.data['errors']), 5)
+        self.assertIn('Access with ID ACCESS001 already exists', response.data['errors'])
+        self.assertIn('User with ID UNKNOWN not found', response.data['errors'])
+        self.assertEqual(Access.objects.count(), 3)
+        self.assertEqual(Access.objects.get(access_id='ACCESS002').resource_name, 'Resource 2')
+    
+    def test_import_accepts_legacy_columns(self):
+        """Test l'import avec les anciennes colonnes resource_type / access_level"""
+        upload = self.build_csv(
+            [['ACCESS010', 'USER001', 'Legacy', 'Application', 'Read', timezone.now().date().isoformat()]],
+            header=['access_id', 'user_id', 'resource_name', 'resource_type', 'access_level', 'granted_date']
+        )
+        
+        response = self.client.post(reverse('access-import-csv') + '?sync=true', {'file': upload}, format='multipart')
+        
+        self.assertEqual(response.data['access_created'], 1)
+        access = Access.objects.get(access_id='ACCESS010')
+        self.assertEqual(access.layer, 'Application')
+        self.assertEqual(access.profile, 'Read')
+    
+    def test_import_query_count_is_per_chunk(self):
+        """Test que le nombre de requêtes ne dépend pas du nombre de lignes"""
+        today = timezone.now().date().isoformat()
+        rows = [[f'BULK{i:04d}', 'USER001', f'Resource {i}', 'Application', 'Read', today, ''] for i in range(100)]
+        
+        from .imports import AccessImporter
+        # 2 lots de 50 lignes: 2 requêtes IN + savepoint/insert/release
+        # chacun, et l'insertion dans l'index de recherche
+        with self.assertNumQueries(12):
+            result = AccessImporter(chunk_size=50, batch_size=50).run(self.build_csv(rows))
+        
+        self.assertEqual(result['access_created'], 100)
+        self.assertEqual(result['errors'], [])
+
+class AccessSyncImportTests(TestCase):
+    """Tests pour l'import des accès en mode sync"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            user_id='USER001'
+        )
+        self.other_user = User.objects.create_user(
+            username='other@example.com',
+            email='other@example.com',
+            password='password123',
+            user_id='USER002'
+        )
+        
+        self.granted = datetime.date(2024, 1, 15)
+        for access_id, resource_name in [('ACCESS001', 'Unchanged'), ('ACCESS002', 'Changed'), ('ACCESS003', 'Gone')]:
+            Access.objects.create(
+                access_id=access_id,
+                user=self.user,
+                resource_name=resource_name,
+                layer='Application',
+                profile='Read',
+                granted_date=self.granted
+            )
+    
+    def build_csv(self, rows):
+        lines = ['access_id,user_id,resource_name,layer,profile,granted_date']
+        lines += [','.join(row) for row in rows]
+        return io.BytesIO(('\n'.join(lines) + '\n').encode('utf-8'))
+    
+    def test_content_hash_is_kept_on_save(self):
+        """Test que l'empreinte est calculée à l'enregistrement"""
+        access = Access.objects.get(access_id='ACCESS001')
+        self.assertEqual(len(access.content_hash), 64)
+        
+        access.profile = 'Write'
+        access.save(update_fields=['profile'])
+        access.refresh_from_db()
+        self.assertEqual(access.content_hash, access.compute_content_hash())
+    
+    def test_sync_writes_only_the_diff(self):
+        """Test le mode sync: créé, modifié, inchangé et supprimé"""
+        from .imports import AccessImporter
+        granted = self.granted.isoformat()
+        upload = self.build_csv([
+            ['ACCESS001', 'USER001', 'Unchanged', 'Application', 'Read', granted],
+            ['ACCESS002', 'USER002', 'Changed', 'Application', 'Admin', granted],
+            ['ACCESS004', 'USER001', 'New', 'Database', 'Read', granted],
+        ])
+        unchanged_before = Access.objects.get(access_id='ACCESS001').updated_at
+        
+        result = AccessImporter(mode='sync').run(upload)
+        
+        self.assertEqual(result['access_created'], 1)
+        self.assertEqual(result['access_updated'], 1)
+        self.assertEqual(result['access_unchanged'], 1)
+        self.assertEqual(result['access_deleted'], 1)
+        self.assertEqual(result['errors'], [])
+        
+        self.assertEqual(Access.objects.get(access_id='ACCESS001').updated_at, unchanged_before)
+        changed = Access.objects.get(access_id='ACCESS002')
+        self.assertEqual(changed.user, self.other_user)
+        self.assertEqual(changed.profile, 'Admin')
+        self.assertEqual(changed.content_hash, changed.compute_content_hash())
+        self.assertFalse(Access.objects.filter(access_id='ACCESS003').exists())
+        self.assertTrue(Access.objects.filter(access_id='ACCESS004').exists())
+    
+    def test_sync_keeps_rows_in_error(self):
+        """Test qu'une ligne en erreur ne provoque pas de suppression"""
+        from .imports import AccessImporter
+        granted = self.granted.isoformat()
+        upload = self.build_csv([
+            ['ACCESS001', 'USER001', 'Unchanged', 'Application', 'Read', granted],
+            ['ACCESS002', 'UNKNOWN', 'Changed', 'Application', 'Read', granted],
+            ['ACCESS003', 'USER001', 'Gone', 'Application', 'Read', granted],
+        ])
+        
+        result = AccessImporter(mode='sync').run(upload)
+        
+        self.assertEqual(result['access_deleted'], 0)
+        self.assertEqual(len(result['errors']), 1)
+        self.assertEqual(Access.objects.count(), 3)
+    
+    def test_sync_keeps_rows_missing_required_fields(self):
+        """Test qu'une ligne incomplète ne provoque pas la suppression de son accès"""
+        from .imports import AccessImporter
+        granted = self.granted.isoformat()
+        upload = self.build_csv([
+            ['ACCESS001', 'USER001', 'Unchanged', 'Application', 'Read', granted],
+            ['ACCESS002', 'USER001', '', 'Application', 'Read', granted],
+        ])
+        
+        result = AccessImporter(mode='sync').run(upload)
+        
+        self.assertEqual(result['access_deleted'], 1)
+        self.assertEqual(len(result['errors']), 1)
+        self.assertTrue(Access.objects.filter(access_id='ACCESS002').exists())
+        self.assertFalse(Access.objects.filter(access_id='ACCESS003').exists())
+    
+    def test_sync_revokes_accesses_with_decided_reviews(self):
+        """Test qu'une revue décidée survit à un sync qui retire son accès"""
+        from .imports import AccessImporter
+        campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            status='active',
+            created_by=self.other_user
+        )
+        gone = Access.objects.get(access_id='ACCESS003')
+        approved = Review.objects.create(campaign=campaign, access=gone, reviewer=self.other_user, decision='approved')
+        Review.objects.create(campaign=campaign, access=Access.objects.get(access_id='ACCESS002'), reviewer=self.other_user)
+        upload = lambda: self.build_csv([
+            ['ACCESS001', 'USER001', 'Unchanged', 'Application', 'Read', self.granted.isoformat()],
+        ])
+        
+        result = AccessImporter(mode='sync', dry_run=True).run(upload())
+        self.assertEqual(
+            (result['access_deleted'], result['access_revoked'], result['reviews_deleted'], result['reviews_kept']),
+            (1, 1, 1, 1)
+        )
+        self.assertEqual(Review.objects.count(), 2)
+        
+        result = AccessImporter(mode='sync').run(upload())
+        self.assertEqual(
+            (result['access_deleted'], result['access_revoked'], result['reviews_deleted'], result['reviews_kept']),
+            (1, 1, 1, 1)
+        )
+        self.assertEqual(list(Review.objects.all()), [approved])
+        gone.refresh_from_db()
+        self.assertIsNotNone(gone.revoked_at)
+        self.assertFalse(Access.objects.filter(access_id='ACCESS002').exists())
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.approved_count, campaign.pending_count), (1, 0))
+        
+        # Un accès retiré qui réapparaît dans le fichier est rétabli
+        result = AccessImporter(mode='sync').run(self.build_csv([
+            ['ACCESS003', 'USER001', 'Gone', 'Application', 'Read', self.granted.isoformat()],
+        ]))
+        self.assertEqual(result['access_updated'], 1)
+        gone.refresh_from_db()
+        self.assertIsNone(gone.revoked_at)
+    
+    def test_content_hash_backfill(self):
+        """Test que la migration calcule l'empreinte des accès existants"""
+        from django.apps import apps
+        migration = importlib.import_module('access.migrations.0009_backfill_content_hash')
+        expected = dict(Access.objects.values_list('access_id', 'content_hash'))
+        Access.objects.update(content_hash='')
+        
+        migration.backfill_content_hash(apps, SimpleNamespace(connection=connection))
+        
+        self.assertEqual(dict(Access.objects.values_list('access_id', 'content_hash')), expected)
+    
+    def test_sync_without_valid_rows_deletes_nothing(self):
+        """Test qu'un fichier invalide ne vide pas la table"""
+        from .imports import AccessImporter
+        upload = io.BytesIO(b'access_id;user_id;resource_name\nACCESS009;USER001;Wrong separator\n')
+        
+        result = AccessImporter(mode='sync').run(upload)
+        
+        self.assertEqual(result['access_deleted'], 0)
+        self.assertEqual(Access.objects.count(), 3)
+
+class AccessImportValidationTests(TestCase):
+    """Tests pour la validation des imports et les formats XLSX / Parquet"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        self.user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            user_id='USER001'
+        )
+        
+        self.client.force_authenticate(user=self.admin)
+        
+        self.header = ['access_id', 'user_id', 'resource_name', 'layer', 'profile', 'granted_date']
+        self.rows = [
+            ['ACCESS001', 'USER001', 'Resource 1', 'Application', 'Read', datetime.date(2024, 1, 15)],
+            ['ACCESS002', 'USER001', 'Resource 2', 'Database', 'Write', datetime.date(2024, 2, 1)],
+            ['ACCESS002', 'USER001', 'Duplicate', 'Database', 'Write', datetime.date(2024, 2, 1)],
+            ['ACCESS003', 'UNKNOWN', 'Resource 3', 'Database', 'Write', datetime.date(2024, 2, 1)],
+        ]
+    
+    def post(self, upload, query=''):
+        return self.client.post(reverse('access-import-csv') + '?sync=true' + query, {'file': upload}, format='multipart')
+    
+    def test_import_xlsx(self):
+        """Test l'import d'un fichier Excel"""
+        from openpyxl import Workbook
+        workbook = Workbook()
+        workbook.active.append(self.header)
+        for row in self.rows:
+            workbook.active.append(row)
+        upload = io.BytesIO()
+        workbook.save(upload)
+        upload.seek(0)
+        upload.name = 'accesses.xlsx'
+        
+        response = self.post(upload)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['access_created'], 2)
+        self.assertEqual(response.data['errors'], [
+            'Access with ID ACCESS002 already exists',
+            'User with ID UNKNOWN not found',
+        ])
+        self.assertEqual(Access.objects.get(access_id='ACCESS001').granted_date, datetime.date(2024, 1, 15))
+    
+    def test_import_parquet(self):
+        """Test l'import d'un fichier Parquet"""
+        import pandas as pd
+        upload = io.BytesIO()
+        pd.DataFrame(self.rows, columns=self.header).to_parquet(upload, index=False)
+        upload.seek(0)
+        upload.name = 'accesses.parquet'
+        
+        response = self.post(upload)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['access_created'], 2)
+        self.assertEqual(len(response.data['errors']), 2)
+    
+    def test_dry_run_writes_nothing(self):
+        """Test que dry_run renvoie le rapport de validation sans écrire"""
+        lines = [','.join(self.header)] + [','.join(str(value) for value in row) for row in self.rows]
+        lines.append('ACCESS004,USER001,Resource 4,Database,Write,2024-02-30')
+        upload = io.BytesIO('\n'.join(lines).encode('utf-8'))
+        upload.name = 'accesses.csv'
+        
+        response = self.post(upload, '&dry_run=true')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['dry_run'])
+        self.assertEqual(response.data['access_created'], 2)
+        self.assertEqual(response.data['errors'][-1], 'Error processing row: invalid date for access ACCESS004')
+        self.assertEqual(Access.objects.count(), 0)
+    
+    def test_missing_columns_are_reported_per_row(self):
+        """Test le contrôle vectorisé des colonnes obligatoires"""
+        upload = io.BytesIO(b'access_id,user_id,resource_name\nACCESS001,USER001,Resource 1\n')
+        upload.name = 'accesses.csv'
+        
+        response = self.post(upload)
+        
+        self.assertEqual(response.data['access_created'], 0)
+        self.assertEqual(response.data['errors'], ['Row missing required fields: layer, profile'])
+    
+    def test_trailing_commas_do_not_shift_columns(self):
+        """Test qu'une virgule finale sur chaque ligne ne décale pas les colonnes"""
+        upload = io.BytesIO(
+            b'access_id,user_id,resource_name,layer,profile,granted_date\n'
+            b'T1,USER001,R,App,Read,2024-01-01,\n'
+        )
+        upload.name = 'accesses.csv'
+        
+        response = self.post(upload)
+        
+        self.assertEqual(response.data['access_created'], 1)
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(Access.objects.get().access_id, 'T1')
+    
+    def test_ragged_row_is_reported(self):
+        """Test qu'une ligne avec trop de champs est une erreur d'import"""
+        for chunk_size in (1, 5000):
+            from .imports import AccessImporter
+            upload = io.BytesIO(
+                b'access_id,user_id,resource_name,layer,profile,granted_date\n'
+                b'T1,USER001,R,App,Read,2024-01-01\n'
+                b'T2,USER001,R,App,Read,2024-01-01,x,y\n'
+            )
+            
+            importer = AccessImporter(chunk_size=chunk_size, dry_run=True)
+            result = importer.run(upload)
+            
+            self.assertTrue(importer.read_failed)
+            self.assertEqual(len(result['errors']), 1)
+            self.assertTrue(result['errors'][0].startswith('Error reading file:'))
+    
+    def test_empty_file_is_reported(self):
+        """Test qu'un fichier vide est une erreur d'import"""
+        upload = io.BytesIO(b'')
+        upload.name = 'accesses.csv'
+        
+        response = self.post(upload)
+        
+        self.assertEqual(response.data['access_created'], 0)
+        self.assertEqual(response.data['errors'], ['Error reading file: No columns to parse from file'])
+    
+    def test_unsupported_format_is_rejected(self):
+        """Test le refus des formats non pris en charge"""
+        upload = io.BytesIO(b'{}')
+        upload.name = 'accesses.json'
+        
+        response = self.post(upload)
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class ReviewListQueryTests(TestCase):
+    """Tests pour les requêtes des listes de revues (nombre, colonnes, jointures)"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        self.reviewer = User.objects.create_user(
+            username='reviewer@example.com',
+            email='reviewer@example.com',
+            password='password123',
+            first_name='Test',
+            last_name='Reviewer',
+            user_id='REVIEWER001'
+        )
+        
+        self.campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            status='active',
+            created_by=self.admin
+        )
+        self.created = 0
+    
+    def add_reviews(self, count):
+        """Crée `count` revues, chacune sur l'accès d'un utilisateur différent"""
+        for _ in range(count):
+            self.created += 1
+            user = User.objects.create_user(
+                username=f'user{self.created}@example.com',
+                email=f'user{self.created}@example.com',
+                password='password123',
+                first_name='User',
+                last_name=str(self.created),
+                user_id=f'USER{self.created:03d}'
+            )
+            access = Access.objects.create(
+                access_id=f'ACCESS{self.created:03d}',
+                user=user,
+                resource_name=f'Resource {self.created}',
+                layer='Application',
+                profile='Read',
+                granted_date=timezone.now().date()
+            )
+            Review.objects.create(campaign=self.campaign, access=access, reviewer=self.reviewer)
+    
+    def test_query_count_does_not_depend_on_page_size(self):
+        """Test qu'une page de revues coûte le même nombre de requêtes quel que soit le nombre de lignes"""
+        urls = [
+            (self.admin, '/api/reviews/'),
+            (self.reviewer, '/api/reviews/my_reviews/'),
+            (self.admin, '/api/access_review/reviews/?page=1'),
+        ]
+        
+        self.add_reviews(2)
+        for user, url in urls:
+            self.client.force_authenticate(user=user)
+            # nombre total, page de revues avec réviseur, accès et utilisateur
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(len(response.data['results']), 2)
+        
+        self.add_reviews(10)
+        for user, url in urls:
+            self.client.force_authenticate(user=user)
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(len(response.data['results']), 10)
+        
+        row = response.data['results'][0]
+        self.assertEqual(row['reviewer_name'], 'Test Reviewer')
+        self.assertEqual(row['access_details']['user_name'], f"User {row['access_details']['resource_name'].split()[-1]}")
+    
+    def get_page(self, url, params):
+        self.client.force_authenticate(user=self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results'], [query['sql'] for query in queries.captured_queries]
+    
+    def test_fields_limit_columns_and_joins(self):
+        """Test que ?fields= ne charge que les colonnes et jointures demandées"""
+        self.add_reviews(3)
+        
+        for url in ('/api/reviews/', '/api/access_review/reviews/'):
+            rows, queries = self.get_page(url, {'fields': 'id,decision,reviewed_at'})
+            self.assertEqual(len(queries), 2)
+            self.assertEqual(set(rows[0]), {'id', 'decision', 'reviewed_at'})
+            self.assertNotIn('JOIN', queries[-1])
+            self.assertNotIn('"comment"', queries[-1])
+        
+        rows, queries = self.get_page('/api/reviews/', {'fields': 'id,reviewer_name'})
+        self.assertEqual(rows[0]['reviewer_name'], 'Test Reviewer')
+        self.assertIn('"users_user"', queries[-1])
+        self.assertNotIn('"access_access"', queries[-1])
+    
+    def test_expand_nests_relations_without_extra_queries(self):
+        """Test que ?expand= déplie les relations dans la même requête"""
+        self.add_reviews(2)
+        rows, queries = self.get_page('/api/reviews/', {'expand': 'campaign,access,reviewer'})
+        self.assertEqual(len(queries), 2)
+        
+        self.add_reviews(8)
+        rows, queries = self.get_page('/api/reviews/', {'expand': 'campaign,access,reviewer'})
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(rows[0]['campaign']['name'], 'Test Campaign')
+        self.assertEqual(rows[0]['campaign']['created_by_name'], ' ')
+        self.assertEqual(rows[0]['reviewer']['email'], 'reviewer@example.com')
+        self.assertEqual(rows[0]['access']['layer'], 'Application')
+        self.assertIn('access_details', rows[0])
+        
+        rows, queries = self.get_page('/api/reviews/', {'fields': 'id,access', 'expand': 'access,unknown'})
+        self.assertEqual(set(rows[0]), {'id', 'access'})
+        self.assertTrue({'resource_name', 'user_name'} <= set(rows[0]['access']))
+    
+    def test_access_list_fields(self):
+        """Test ?fields= et ?expand= sur la liste des accès"""
+        self.add_reviews(3)
+        self.client.force_authenticate(user=self.admin)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/access/', {'expand': 'user'})
+        self.assertEqual(response.data['results'][0]['user']['first_name'], 'User')
+        
+        response = self.client.get('/api/access/', {'fields': 'access_id,user_name'})
+        self.assertEqual(set(response.data['results'][0]), {'access_id', 'user_name'})
+
+class ReviewKeysetPaginationTests(TestCase):
+    """Tests pour la pagination par clé des revues et des accès"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        self.client.force_authenticate(user=self.admin)
+        
+        user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            user_id='USER001'
+        )
+        
+        campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            status='active',
+            created_by=self.admin
+        )
+        
+        # 25 revues: des décisions à des dates parfois identiques et des
+        # revues en attente (reviewed_at NULL)
+        now = timezone.now()
+        for i in range(25):
+            access = Access.objects.create(
+                access_id=f'ACCESS{i:03d}',
+                user=user,
+                resource_name=f'Resource {i}',
+                layer='Application',
+                profile='Read',
+                granted_date=timezone.now().date() - datetime.timedelta(days=i % 4)
+            )
+            Review.objects.create(
+                campaign=campaign,
+                access=access,
+                reviewer=self.admin,
+                decision='pending' if i % 3 == 0 else 'approved',
+                reviewed_at=None if i % 3 == 0 else now - datetime.timedelta(hours=i % 5)
+            )
+    
+    def walk(self, url):
+        """Parcourt toutes les pages en suivant les liens next puis previous"""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([row['id'] for row in response.data['results']])
+            url = response.data['next']
+        
+        backwards = []
+        url = response.data['previous']
+        while url:
+            response = self.client.get(url)
+            backwards.insert(0, [row['id'] for row in response.data['results']])
+            url = response.data['previous']
+        self.assertEqual(backwards, pages[:-1])
+        return [review_id for page in pages for review_id in page]
+    
+    def test_cursor_walk_matches_ordering(self):
+        """Test que les curseurs parcourent toutes les revues dans l'ordre, sans doublon"""
+        reviews = sorted(
+            Review.objects.all(),
+            key=lambda review: (review.reviewed_at is None, review.reviewed_at, review.created_at, review.id),
+            reverse=True
+        )
+        expected = [review.id for review in reviews]
+        
+        self.assertEqual(self.walk('/api/reviews/'), expected)
+        self.assertEqual(self.walk('/api/access_review/reviews/'), expected)
+        
+        accesses = Access.objects.order_by('-granted_date', '-id').values_list('id', flat=True)
+        self.assertEqual(self.walk('/api/access/'), list(accesses))
+    
+    def test_count_is_optional(self):
+        """Test que ?count=false évite le COUNT"""
+        response = self.client.get('/api/reviews/')
+        self.assertEqual(response.data['count'], 25)
+        
+        # page de revues seulement
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/reviews/', {'count': 'false'})
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIn('cursor=', response.data['next'])
+    
+    def test_page_parameter_is_still_accepted(self):
+        """Test le paramètre page des clients existants et les erreurs de pagination"""
+        first = self.client.get('/api/reviews/').data
+        second = self.client.get('/api/reviews/', {'page': 2}).data
+        from_cursor = self.client.get(first['next']).data
+        self.assertEqual(second['results'], from_cursor['results'])
+        self.assertIn('cursor=', second['previous'])
+        self.assertNotIn('page=', second['next'])
+        
+        self.assertEqual(self.client.get('/api/reviews/', {'page': 'x'}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/reviews/', {'cursor': 'bad'}).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ReviewBulkDecideTests(TestCase):
+    """Tests pour les décisions en masse (bulk_decide)"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        self.reviewer = User.objects.create_user(
+            username='reviewer@example.com',
+            email='reviewer@example.com',
+            password='password123',
+            user_id='REVIEWER001'
+        )
+        self.other = User.objects.create_user(
+            username='other@example.com',
+            email='other@example.com',
+            password='password123',
+            user_id='OTHER001'
+        )
+        self.client.force_authenticate(user=self.reviewer)
+        
+        self.campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            status='active',
+            created_by=admin
+        )
+        self.created = 0
+    
+    def add_reviews(self, count, reviewer=None):
+        reviews = []
+        for _ in range(count):
+            self.created += 1
+            access = Access.objects.create(
+                access_id=f'ACCESS{self.created:03d}',
+                user=self.other,
+                resource_name=f'Resource {self.created}',
+                layer='Application',
+                profile='Read',
+                granted_date=timezone.now().date()
+            )
+            reviews.append(Review.objects.create(
+                campaign=self.campaign,
+                access=access,
+                reviewer=reviewer or self.reviewer
+            ))
+        return reviews
+    
+    def decide(self, items):
+        return self.client.post(
+            '/api/reviews/bulk_decide/',
+            {'items': items},
+            format='json',
+            HTTP_USER_AGENT='BulkClient/1.0',
+            REMOTE_ADDR='10.0.0.7'
+        )
+    
+    def count_queries(self, count):
+        reviews = self.add_reviews(count)
+        decisions = ('approved', 'rejected', 'deferred')
+        items = [
+            {'id': review.id, 'decision': decisions[i % 3], 'comment': f'Comment {i % 2}'}
+            for i, review in enumerate(reviews)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.decide(items)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated_count'], count)
+        return len(queries)
+    
+    def test_query_count_independent_of_item_count(self):
+        """Le nombre de requêtes dépend des décisions, pas du nombre d'éléments"""
+        # Premier appel: création des lignes de statistiques
+        self.count_queries(3)
+        self.assertEqual(self.count_queries(6), self.count_queries(30))
+    
+    def test_query_count_per_decision_group(self):
+        """Un seul verrouillage et une seule lecture pour tous les groupes: un UPDATE de plus par décision"""
+        self.count_queries(3)
+        reviews = self.add_reviews(3)
+        with CaptureQueriesContext(connection) as queries:
+            Review.objects.filter(reviewer=self.reviewer).counted_updates([
+                ([review.id], {'decision': decision, 'reviewed_at': timezone.now()})
+                for review, decision in zip(reviews, ('approved', 'rejected', 'deferred'))
+            ])
+        # savepoint/release, verrou, lecture de l'état, 3 UPDATE, compteurs
+        # de la campagne, 2 requêtes par table de statistiques
+        self.assertEqual(len(queries), 12, '\n'.join(query['sql'] for query in queries))
+        self.assertEqual(sum(query['sql'].startswith('UPDATE "access_review"') for query in queries), 3)
+    
+    def test_decisions_comments_and_audit(self):
+        """Chaque revue reçoit sa décision, son commentaire et les métadonnées d'audit"""
+        first, second, third = self.add_reviews(3)
+        response = self.decide([
+            {'id': first.id, 'decision': 'approved', 'comment': 'Still needed'},
+            {'id': second.id, 'decision': 'rejected', 'comment': 'Left the team'},
+            {'id': third.id, 'decision': 'approved'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated_count'], 3)
+        
+        expected = {first.id: ('approved', 'Still needed'), second.id: ('rejected', 'Left the team'), third.id: ('approved', '')}
+        for review in Review.objects.filter(id__in=expected):
+            self.assertEqual((review.decision, review.comment), expected[review.id])
+            self.assertIsNotNone(review.reviewed_at)
+            self.assertEqual(review.ip_address, '10.0.0.7')
+            self.assertEqual(review.user_agent, 'BulkClient/1.0')
+        
+        # Compteurs et statistiques tenus à jour
+        self.campaign.refresh_from_db()
+        self.assertEqual(
+            (self.campaign.pending_count, self.campaign.approved_count, self.campaign.rejected_count),
+            (0, 2, 1)
+        )
+        self.assertEqual(CampaignStat.breakdown('decision', campaign=self.campaign), {'approved': 2, 'rejected': 1})
+        stat = ReviewerStat.objects.get(campaign=self.campaign, reviewer=self.reviewer)
+        self.assertEqual((stat.pending_count, stat.completed_count), (0, 3))
+    
+    def test_per_id_errors(self):
+        """Les éléments invalides sont signalés un par un, les autres sont enregistrés"""
+        review, = self.add_reviews(1)
+        foreign, = self.add_reviews(1, reviewer=self.other)
+        response = self.decide([
+            {'id': review.id, 'decision': 'approved'},
+            {'id': review.id, 'decision': 'rejected'},
+            {'id': foreign.id, 'decision': 'approved'},
+            {'id': 999999, 'decision': 'approved'},
+            {'id': review.id + 1000, 'decision': 'maybe'},
+            {'decision': 'approved'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated_count'], 1)
+        self.assertEqual(
+            [(result['id'], result['status']) for result in response.data['results']],
+            [(review.id, 'updated'), (review.id, 'error'), (foreign.id, 'error'),
+             (999999, 'error'), (review.id + 1000, 'error'), (None, 'error')]
+        )
+        self.assertEqual(response.data['results'][2]['error'], 'Review not found')
+        
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.decision, 'pending')
+        review.refresh_from_db()
+        self.assertEqual(review.decision, 'approved')
+    
+    def test_empty_payload(self):
+        """Une requête sans décision est refusée"""
+        response = self.decide([])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+    
+    def test_bulk_approve_records_audit(self):
+        """bulk_approve passe par le même chemin et renseigne l'audit"""
+        reviews = self.add_reviews(2)
+        response = self.client.post(
+            '/api/reviews/bulk_approve/',
+            {'review_ids': [review.id for review in reviews]},
+            format='json',
+            HTTP_USER_AGENT='BulkClient/1.0'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'updated_count': 2})
+        for review in Review.objects.filter(campaign=self.campaign):
+            self.assertEqual((review.decision, review.comment, review.user_agent), ('approved', 'Bulk approval', 'BulkClient/1.0'))
+
+
+class FullTextSearchTests(TestCase):
+    """Tests pour l'index de recherche plein texte des accès et des revues"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        self.client.force_authenticate(user=self.admin)
+        
+        self.alice = User.objects.create_user(
+            username='alice@example.com',
+            email='alice@example.com',
+            password='password123',
+            first_name='Alice',
+            last_name='Lefèvre',
+            department='Finance',
+            user_id='USER001'
+        )
+        self.bob = User.objects.create_user(
+            username='bob@example.com',
+            email='bob@example.com',
+            password='password123',
+            first_name='Bob',
+            last_name='Martin',
+            department='Marketing',
+            user_id='USER002'
+        )
+        
+        self.campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            status='active',
+            created_by=self.admin
+        )
+        self.ledger = self.add_access('ACCESS001', self.alice, 'General Ledger')
+        self.crm = self.add_access('ACCESS002', self.bob, 'CRM Suite')
+        self.ledger_review = Review.objects.create(
+            campaign=self.campaign, access=self.ledger, reviewer=self.admin, comment='Accès toujours nécessaire'
+        )
+        self.crm_review = Review.objects.create(campaign=self.campaign, access=self.crm, reviewer=self.admin)
+    
+    def add_access(self, access_id, user, resource_name):
+        return Access.objects.create(
+            access_id=access_id,
+            user=user,
+            resource_name=resource_name,
+            layer='Application',
+            profile='Read',
+            granted_date=timezone.now().date()
+        )
+    
+    def search(self, url, text):
+        response = self.client.get(url, {'search': text})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row['id'] for row in response.data['results']}
+    
+    def test_search_accesses(self):
+        """Nom de ressource, noms et département, en préfixe et sans accents"""
+        self.assertEqual(self.search('/api/access/', 'ledger'), {self.ledger.id})
+        self.assertEqual(self.search('/api/access/', 'lefevre'), {self.ledger.id})
+        self.assertEqual(self.search('/api/access/', 'mark'), {self.crm.id})
+        self.assertEqual(self.search('/api/access/', 'crm bob'), {self.crm.id})
+        self.assertEqual(self.search('/api/access/', 'crm alice'), set())
+        self.assertEqual(self.search('/api/access/', '"*('), {self.ledger.id, self.crm.id})
+    
+    def test_search_reviews(self):
+        """Les revues sont cherchées dans leur commentaire et dans les champs de l'accès"""
+        self.assertEqual(self.search('/api/reviews/', 'nécessaire'), {self.ledger_review.id})
+        self.assertEqual(self.search('/api/reviews/', 'suite'), {self.crm_review.id})
+        self.assertEqual(self.search('/api/reviews/', 'finance'), {self.ledger_review.id})
+    
+    def test_index_follows_writes(self):
+        """Les écritures unitaires et en masse tiennent l'index à jour"""
+        Review.objects.filter(pk=self.crm_review.pk).update(comment='Doublon du compte principal')
+        self.assertEqual(self.search('/api/reviews/', 'doublon'), {self.crm_review.id})
+        
+        self.alice.last_name = 'Durand'
+        self.alice.save()
+        self.assertEqual(self.search('/api/access/', 'durand'), {self.ledger.id})
+        self.assertEqual(self.search('/api/reviews/', 'durand'), {self.ledger_review.id})
+        self.assertEqual(self.search('/api/access/', 'lefevre'), set())
+        
+        self.crm.resource_name = 'Sales Portal'
+        Access.objects.bulk_update([self.crm], ['resource_name'])
+        self.assertEqual(self.search('/api/reviews/', 'portal'), {self.crm_review.id})
+        
+        created = Access.objects.bulk_create([
+            Access(access_id='ACCESS003', user=self.bob, resource_name='Payroll', layer='Application',
+                   profile='Read', granted_date=timezone.now().date())
+        ])
+        self.assertEqual(self.search('/api/access/', 'payroll'), {created[0].id})
+        
+        self.ledger.delete()
+        self.assertEqual(self.search('/api/access/', 'ledger'), set())
+        self.assertEqual(self.search('/api/reviews/', 'ledger'), set())
+    
+    def test_user_save_reindexes_only_on_change(self):
+        """Un save() sans changement des champs indexés ne réindexe rien"""
+        self.campaign.refresh_from_db()
+        revision = self.campaign.revision
+        
+        self.alice.set_password('new-password')
+        # lecture des champs indexés, UPDATE de l'utilisateur
+        with self.assertNumQueries(2):
+            self.alice.save()
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.revision, revision)
+        
+        self.alice.department = 'Audit'
+        self.alice.save()
+        self.campaign.refresh_from_db()
+        self.assertGreater(self.campaign.revision, revision)
+        self.assertEqual(self.search('/api/access/', 'audit'), {self.ledger.id})
+    
+    def test_reindex_command(self):
+        """reindex_search reconstruit les index depuis les tables"""
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM access_search')
+        self.assertEqual(self.search('/api/access/', 'ledger'), set())
+        
+        out = io.StringIO()
+        call_command('reindex_search', stdout=out)
+        self.assertIn('accesses: 2 document(s)', out.getvalue())
+        self.assertEqual(self.search('/api/access/', 'ledger'), {self.ledger.id})
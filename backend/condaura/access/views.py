@@ -4,11 +4,10 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
 from django.db.models import Q, Count
-import csv
-import io
 import pandas as pd
+from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import Access, Review
+from .models import Access, Review, ACCESS_SEARCH_INDEX, REVIEW_SEARCH_INDEX
 from .serializers import (
     AccessSerializer,
     AccessDetailSerializer,
@@ -16,14 +15,32 @@ from .serializers import (
     ReviewDetailSerializer,
     ReviewCreateSerializer
 )
+from .imports import AccessImporter
+from .services import ReviewService
+from imports.views import import_flag, queue_import, wants_sync_import
 from users.models import User
+from campaigns.models import CampaignStat
+from condaura.pagination import KeysetPagination
+from condaura.search import FullTextSearchFilter
 
 class AccessViewSet(viewsets.ModelViewSet):
     queryset = Access.objects.all()
     serializer_class = AccessSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_fields = ['layer', 'profile', 'user__department']
-    search_fields = ['resource_name', 'user__first_name', 'user__last_name']
+    # ?search= in resource name, user names and department
+    search_index = ACCESS_SEARCH_INDEX
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-granted_date', '-id')
+    
+    def get_queryset(self):
+        queryset = Access.objects.all()
+        if self.action == 'list':
+            queryset = AccessSerializer.optimize_queryset(queryset, self.request)
+        elif self.action == 'retrieve':
+            queryset = queryset.select_related('user__manager')
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -32,89 +49,51 @@ class AccessViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def import_csv(self, request):
-        """Import accesses from CSV file"""
+        """
+        Import accesses from a CSV, XLSX or Parquet file.
+        
+        mode=sync treats the file as the full reference feed, dry_run=true
+        only validates it and reports what would be written.
+        """
         if 'file' not in request.FILES:
             return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
         
-        csv_file = request.FILES['file']
-        if not csv_file.name.endswith('.csv'):
-            return Response({'error': 'File is not CSV'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        decoded_file = csv_file.read().decode('utf-8')
-        csv_data = csv.DictReader(io.StringIO(decoded_file))
-        
-        accesses_created = 0
-        errors = []
-        
-        for row in csv_data:
-            try:
-                # Check for required fields
-                required_fields = ['access_id', 'user_id', 'resource_name', 'layer', 'profile']
-                missing_fields = [field for field in required_fields if field not in row or not row[field]]
-                
-                # Backward compatibility for older CSV formats
-                if 'resource_type' in row and 'layer' not in row:
-                    row['layer'] = row['resource_type']
-                if 'access_level' in row and 'profile' not in row:
-                    row['profile'] = row['access_level']
-                
-                if missing_fields:
-                    errors.append(f"Row missing required fields: {', '.join(missing_fields)}")
-                    continue
-                
-                # Check if access already exists
-                if Access.objects.filter(access_id=row['access_id']).exists():
-                    errors.append(f"Access with ID {row['access_id']} already exists")
-                    continue
-                
-                # Find user
-                try:
-                    user = User.objects.get(user_id=row['user_id'])
-                except User.DoesNotExist:
-                    errors.append(f"User with ID {row['user_id']} not found")
-                    continue
-                
-                # Parse dates
-                granted_date = row.get('granted_date')
-                last_used = row.get('last_used')
-                
-                # Create access
-                Access.objects.create(
-                    access_id=row['access_id'],
-                    user=user,
-                    resource_name=row['resource_name'],
-                    layer=row['layer'],
-                    profile=row['profile'],
-                    granted_date=granted_date,
-                    last_used=last_used if last_used else None
-                )
-                
-                accesses_created += 1
-                
-            except Exception as e:
-                errors.append(f"Error processing row: {str(e)}")
+        upload = request.FILES['file']
+        if not AccessImporter.file_format(upload.name):
+            return Response({'error': 'File must be CSV, XLSX or Parquet'}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'access_created': accesses_created,
-            'errors': errors
-        }, status=status.HTTP_200_OK)
+        # mode=sync: the file is the full reference feed, only the diff is written
+        mode = request.query_params.get('mode') or request.data.get('mode') or 'create'
+        if mode not in AccessImporter.MODES:
+            return Response({'error': f"Unknown import mode: {mode}"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        options = {'mode': mode, 'dry_run': import_flag(request, 'dry_run')}
+        
+        if wants_sync_import(request):
+            result = AccessImporter(**options).run(upload)
+            return Response(result, status=status.HTTP_200_OK)
+        
+        return queue_import(request, 'access', upload, options)
 
 class ReviewViewSet(viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_fields = ['decision', 'campaign', 'reviewer']
-    search_fields = ['access__resource_name', 'comment']
+    # ?search= in resource name, access user names, department and comment
+    search_index = REVIEW_SEARCH_INDEX
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-reviewed_at', '-created_at', '-id')
     
     def get_queryset(self):
-        user = self.request.user
-        
-        # Admin users can see all reviews
-        if user.is_staff or user.role == 'admin':
-            queryset = Review.objects.all()
-        else:
-            # Reviewers can only see their assigned reviews
-            queryset = Review.objects.filter(reviewer=user)
+        # Admin users can see all reviews, reviewers only their assigned reviews
+        queryset = Review.objects.visible_to(self.request.user)
+        if self.action == 'list':
+            # Only the columns and joins of the requested ?fields= / ?expand=
+            queryset = ReviewSerializer.optimize_queryset(queryset, self.request)
+        elif self.action == 'retrieve':
+            queryset = queryset.select_related('campaign__created_by', 'access__user', 'reviewer__manager')
         
         # Handle decision filter case-insensitive
         decision = self.request.query_params.get('decision', None)
@@ -152,7 +131,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
     def my_reviews(self, request):
         """Get reviews assigned to the current user"""
         user = request.user
-        reviews = Review.objects.filter(reviewer=user)
+        reviews = ReviewSerializer.optimize_queryset(Review.objects.filter(reviewer=user), request)
         
         # Filter by campaign if provided
         campaign_id = request.query_params.get('campaign')
@@ -181,12 +160,19 @@ class ReviewViewSet(viewsets.ModelViewSet):
         campaign_id = request.query_params.get('campaign')
         campaign_filter = Q(campaign_id=campaign_id) if campaign_id else Q()
         
-        # For admin users, show all stats
+        # For admin users, show all stats, read from the statistics rollup
         if user.is_staff or user.role == 'admin':
-            reviews = Review.objects.filter(campaign_filter)
-        else:
-            # For regular users, only show their reviews
-            reviews = Review.objects.filter(campaign_filter, reviewer=user)
+            filters = {'campaign_id': campaign_id} if campaign_id else {}
+            by_decision = CampaignStat.breakdown('decision', **filters)
+            by_layer = CampaignStat.breakdown('layer', **filters)
+            return Response({
+                'total': sum(by_decision.values()),
+                'by_decision': [{'decision': decision, 'count': count} for decision, count in by_decision.items()],
+                'by_resource_type': [{'access__layer': layer, 'count': count} for layer, count in by_layer.items()]
+            }, status=status.HTTP_200_OK)
+        
+        # For regular users, only show their reviews
+        reviews = Review.objects.filter(campaign_filter, reviewer=user)
         
         # Count by decision using Django's Count aggregation
         decision_counts = list(reviews.values('decision')
@@ -211,15 +197,31 @@ class ReviewViewSet(viewsets.ModelViewSet):
         if not review_ids:
             return Response({'error': 'No review IDs provided'}, status=status.HTTP_400_BAD_REQUEST)
         
-        user = request.user
-        reviews = Review.objects.filter(id__in=review_ids, reviewer=user)
-        
-        updated_count = reviews.update(
-            decision='approved',
-            reviewed_at=timezone.now(),
-            comment=request.data.get('comment', 'Bulk approval')
+        comment = request.data.get('comment', 'Bulk approval')
+        success, result = ReviewService.bulk_decide(
+            request.user,
+            [{'id': review_id, 'decision': 'approved', 'comment': comment} for review_id in review_ids],
+            ip_address=request.META.get('REMOTE_ADDR'),
+            user_agent=request.META.get('HTTP_USER_AGENT', '')
         )
+        if not success:
+            return Response({'error': result}, status=status.HTTP_400_BAD_REQUEST)
         
         return Response({
-            'updated_count': updated_count
+            'updated_count': result['updated_count']
         }, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_decide(self, request):
+        """Record many decisions at once: a list of {id, decision, comment}"""
+        items = request.data if isinstance(request.data, list) else request.data.get('items')
+        success, result = ReviewService.bulk_decide(
+            request.user,
+            items,
+            ip_address=request.META.get('REMOTE_ADDR'),
+            user_agent=request.META.get('HTTP_USER_AGENT', '')
+        )
+        if not success:
+            return Response({'error': result}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(result, status=status.HTTP_200_OK)
@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from campaigns.views import CampaignViewSet
 from access.views import ReviewViewSet
+from condaura.pagination import KeysetPagination
 
 # Create a router for campaigns
 campaign_router = DefaultRouter()
@@ -52,10 +53,8 @@ def review_list(request):
     
     # Get reviews based on user role
     from access.models import Review
-    if user.is_staff or user.role == 'admin':
-        reviews = Review.objects.all()
-    else:
-        reviews = Review.objects.filter(reviewer=user)
+    from access.serializers import ReviewSerializer
+    reviews = ReviewSerializer.optimize_queryset(Review.objects.visible_to(user), request)
     
     # Filter by decision if provided
     decision = request.query_params.get('decision')
@@ -72,39 +71,15 @@ def review_list(request):
     if campaign_id:
         reviews = reviews.filter(campaign_id=campaign_id)
     
-    # Count total for pagination
-    total_count = reviews.count()
-    
-    # Handle pagination
-    page = request.query_params.get('page')
-    page_size = 10  # Default page size
-    
-    if page:
-        try:
-            page = int(page)
-            start = (page - 1) * page_size
-            end = start + page_size
-            reviews = reviews[start:end]
-        except ValueError:
-            pass
+    # Keyset pagination, same ordering as the reviews API
+    paginator = KeysetPagination(ordering=ReviewViewSet.keyset_ordering)
+    page = paginator.paginate_queryset(reviews, request)
     
     # Format the response as expected by frontend
-    from access.serializers import ReviewSerializer
-    serializer = ReviewSerializer(reviews, many=True)
+    serializer = ReviewSerializer(page, many=True, context={'request': request})
     
     # Return a paginated response structure
-    response_data = {
-        'results': serializer.data,
-        'count': total_count,
-        'next': None if (page * page_size >= total_count) else f"?page={page + 1}",
-        'previous': None if page <= 1 else f"?page={page - 1}"
-    }
-    
-    # If no reviews, ensure we return an empty array for results
-    if not reviews:
-        response_data['results'] = []
-    
-    return Response(response_data)
+    return paginator.get_paginated_response(serializer.data)
 
 urlpatterns = [
     path('campaigns/', campaign_list, name='campaign-list'),
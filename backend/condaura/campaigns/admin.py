@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Campaign, CampaignScope
+from .models import Campaign, CampaignScope, CampaignSnapshot, ReviewerStat, ReportJob
 
 class CampaignScopeInline(admin.TabularInline):
     model = CampaignScope
@@ -10,13 +10,18 @@ class CampaignAdmin(admin.ModelAdmin):
     list_display = ('name', 'status', 'start_date', 'end_date', 'created_by', 'progress')
     list_filter = ('status', 'created_at')
     search_fields = ('name', 'description')
-    readonly_fields = ('created_at', 'updated_at', 'progress')
+    list_select_related = ('created_by',)
+    readonly_fields = ('created_at', 'updated_at', 'progress',
+                       'pending_count', 'approved_count', 'rejected_count', 'deferred_count')
     inlines = [CampaignScopeInline]
+    filter_horizontal = ('reviewers',)
     
     fieldsets = (
         (None, {'fields': ('name', 'description', 'status')}),
         ('Timeline', {'fields': ('start_date', 'end_date', 'reminder_days')}),
+        ('Assignment', {'fields': ('assignment_method', 'reviewers')}),
         ('Details', {'fields': ('created_by', 'created_at', 'updated_at', 'progress')}),
+        ('Reviews', {'fields': ('pending_count', 'approved_count', 'rejected_count', 'deferred_count')}),
     )
 
 @admin.register(CampaignScope)
@@ -24,3 +29,27 @@ class CampaignScopeAdmin(admin.ModelAdmin):
     list_display = ('campaign', 'scope_type', 'scope_value')
     list_filter = ('scope_type', 'campaign')
     search_fields = ('scope_value', 'campaign__name')
+
+@admin.register(CampaignSnapshot)
+class CampaignSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('campaign', 'taken_at', 'pending', 'approved', 'rejected', 'deferred')
+    list_filter = ('campaign',)
+    list_select_related = ('campaign',)
+    date_hierarchy = 'taken_at'
+
+@admin.register(ReviewerStat)
+class ReviewerStatAdmin(admin.ModelAdmin):
+    list_display = ('campaign', 'reviewer', 'pending_count', 'completed_count',
+                    'median_latency', 'p90_latency', 'last_activity')
+    list_filter = ('campaign',)
+    search_fields = ('reviewer__email', 'campaign__name')
+    list_select_related = ('campaign', 'reviewer')
+    readonly_fields = ('latency_histogram',)
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'campaign', 'format', 'revision', 'status', 'file_size', 'created_by', 'created_at', 'last_accessed_at')
+    list_filter = ('format', 'status', 'created_at')
+    search_fields = ('campaign__name', 'created_by__email')
+    list_select_related = ('campaign', 'created_by')
+    readonly_fields = ('revision', 'file_size', 'created_at', 'started_at', 'finished_at', 'last_accessed_at')
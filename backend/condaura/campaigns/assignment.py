@@ -0,0 +1,171 @@
+import heapq
+from itertools import cycle
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from access.models import Review, ResourceOwner
+
+# Méthode d'attribution -> classe de stratégie
+ASSIGNMENT_STRATEGIES = {}
+
+
+def register_strategy(name):
+    """Enregistre une stratégie d'attribution sous le nom de la méthode"""
+    def decorator(strategy_class):
+        strategy_class.name = name
+        ASSIGNMENT_STRATEGIES[name] = strategy_class
+        return strategy_class
+    return decorator
+
+
+def get_strategy(campaign):
+    """Stratégie correspondant à l'assignment_method de la campagne"""
+    try:
+        strategy_class = ASSIGNMENT_STRATEGIES[campaign.assignment_method]
+    except KeyError:
+        raise ValueError(f"Méthode d'attribution inconnue: {campaign.assignment_method}")
+    return strategy_class(campaign)
+
+
+class AssignmentStrategy:
+    """
+    Choisit le réviseur des accès d'une campagne.
+
+    Une stratégie fournit soit une expression SQL évaluée pour chaque accès
+    (`reviewer_expression`), ce qui permet de créer les revues par un seul
+    INSERT ... SELECT, soit une attribution en Python par lots
+    (`assign`), qui reçoit les id des accès d'un lot et renvoie les id des
+    réviseurs dans le même ordre. Aucune des deux ne fait de requête par accès.
+    """
+    name = None
+
+    def __init__(self, campaign):
+        self.campaign = campaign
+
+    def fallback_expression(self):
+        """Manager de l'utilisateur, à défaut le créateur de la campagne"""
+        return Coalesce('user__manager_id', Value(self.campaign.created_by_id), output_field=IntegerField())
+
+    def reviewer_expression(self):
+        return None
+
+    def assign(self, access_ids):
+        raise NotImplementedError
+
+    def preview(self, accesses):
+        """
+        Nombre de revues que recevrait chaque réviseur, sans rien écrire
+        Par défaut, un GROUP BY sur l'expression du réviseur
+        """
+        return dict(
+            accesses.order_by()
+            .annotate(review_reviewer=self.reviewer_expression())
+            .values('review_reviewer')
+            .annotate(count=Count('id'))
+            .values_list('review_reviewer', 'count')
+        )
+
+
+@register_strategy('manager')
+class ManagerStrategy(AssignmentStrategy):
+    """Le manager de l'utilisateur, à défaut le créateur de la campagne"""
+
+    def reviewer_expression(self):
+        return self.fallback_expression()
+
+
+@register_strategy('resource_owner')
+class ResourceOwnerStrategy(AssignmentStrategy):
+    """Le propriétaire de la ressource, à défaut le manager puis le créateur"""
+
+    def reviewer_expression(self):
+        owner = ResourceOwner.objects.filter(resource_name=OuterRef('resource_name')).values('owner_id')[:1]
+        return Coalesce(
+            Subquery(owner),
+            'user__manager_id',
+            Value(self.campaign.created_by_id),
+            output_field=IntegerField()
+        )
+
+
+class PoolStrategy(AssignmentStrategy):
+    """Base des stratégies qui répartissent les accès entre les réviseurs de la campagne"""
+
+    def __init__(self, campaign):
+        super().__init__(campaign)
+        self.pool = list(campaign.reviewers.order_by('id').values_list('id', flat=True))
+        if not self.pool:
+            raise ValueError(f"La méthode d'attribution '{self.name}' nécessite au moins un réviseur")
+
+
+@register_strategy('manual')
+class RoundRobinStrategy(PoolStrategy):
+    """Les réviseurs de la campagne, à tour de rôle"""
+
+    def __init__(self, campaign):
+        super().__init__(campaign)
+        self._reviewers = cycle(self.pool)
+
+    def assign(self, access_ids):
+        return [next(self._reviewers) for _ in access_ids]
+
+    def preview(self, accesses):
+        total = accesses.count()
+        share, remainder = divmod(total, len(self.pool))
+        loads = {reviewer_id: share + (index < remainder) for index, reviewer_id in enumerate(self.pool)}
+        return {reviewer_id: count for reviewer_id, count in loads.items() if count}
+
+
+@register_strategy('least_loaded')
+class LeastLoadedStrategy(PoolStrategy):
+    """
+    Le réviseur de la campagne qui a le moins de revues en attente,
+    toutes campagnes confondues. Les charges sont lues en une seule
+    requête d'agrégat puis tenues à jour en mémoire.
+    """
+
+    def __init__(self, campaign):
+        super().__init__(campaign)
+        loads = dict(
+            Review.objects.filter(reviewer_id__in=self.pool, decision='pending')
+            .values('reviewer_id')
+            .annotate(count=Count('id'))
+            .values_list('reviewer_id', 'count')
+        )
+        self._heap = [(loads.get(reviewer_id, 0), reviewer_id) for reviewer_id in self.pool]
+        heapq.heapify(self._heap)
+
+    def assign(self, access_ids):
+        reviewers = []
+        for _ in access_ids:
+            load, reviewer_id = self._heap[0]
+            heapq.heapreplace(self._heap, (load + 1, reviewer_id))
+            reviewers.append(reviewer_id)
+        return reviewers
+
+    def preview(self, accesses):
+        """
+        Simule la répartition sans parcourir les accès: les réviseurs les
+        moins chargés sont remplis jusqu'au niveau du suivant
+        """
+        remaining = accesses.count()
+        loads = sorted(self._heap)
+        assigned = {reviewer_id: 0 for _, reviewer_id in loads}
+
+        level = loads[0][0]
+        while remaining:
+            filling = [reviewer_id for load, reviewer_id in loads if load <= level]
+            next_level = min((load for load, _ in loads if load > level), default=None)
+            if next_level is None or (next_level - level) * len(filling) >= remaining:
+                # Le reste tient avant le niveau suivant: partage équitable
+                per_reviewer, remainder = divmod(remaining, len(filling))
+                for index, reviewer_id in enumerate(filling):
+                    assigned[reviewer_id] += per_reviewer + (index < remainder)
+                break
+            for reviewer_id in filling:
+                assigned[reviewer_id] += next_level - level
+            remaining -= (next_level - level) * len(filling)
+            level = next_level
+
+        return {reviewer_id: count for reviewer_id, count in assigned.items() if count}
@@ -0,0 +1,70 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+# Version des données du tableau de bord: changer la version rend
+# obsolètes toutes les entrées en cache sans avoir à les énumérer
+VERSION_KEY = 'campaigns:dashboard:version'
+
+DECISIONS = ('approved', 'rejected', 'pending')
+CAMPAIGN_STATUSES = ('active', 'completed', 'draft')
+
+
+def invalidate_dashboard():
+    """Invalide le cache du tableau de bord après le commit de la transaction courante"""
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, time.time_ns(), None))
+
+
+def cache_key(user):
+    """Une entrée partagée par les administrateurs, une par réviseur"""
+    version = cache.get_or_set(VERSION_KEY, time.time_ns, None)
+    scope = 'admin' if user.is_staff or user.role == 'admin' else f'user:{user.pk}'
+    return f'campaigns:dashboard:{version}:{scope}'
+
+
+def compute_dashboard(user):
+    """
+    Statistiques du tableau de bord par agrégation conditionnelle:
+    une requête sur les campagnes, une sur les revues (ou sur la table
+    CampaignStat pour les administrateurs)
+    """
+    # Import local: models.py importe ce module pour invalider le cache
+    from .models import Campaign, CampaignStat
+    from access.models import Review
+
+    campaign_stats = Campaign.objects.aggregate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status in CAMPAIGN_STATUSES}
+    )
+
+    if user.is_staff or user.role == 'admin':
+        # Admin sees all reviews, read from the statistics rollup
+        review_stats = CampaignStat.objects.aggregate(
+            total=Sum('count'),
+            **{decision: Sum('count', filter=Q(decision=decision)) for decision in DECISIONS}
+        )
+        review_stats = {key: value or 0 for key, value in review_stats.items()}
+    else:
+        # Regular users see only their reviews
+        review_stats = Review.objects.filter(reviewer=user).aggregate(
+            total=Count('id'),
+            **{decision: Count('id', filter=Q(decision=decision)) for decision in DECISIONS}
+        )
+
+    return {
+        'campaign_stats': campaign_stats,
+        'review_stats': review_stats
+    }
+
+
+def get_dashboard(user):
+    """Tableau de bord mis en cache DASHBOARD_CACHE_TIMEOUT secondes"""
+    key = cache_key(user)
+    data = cache.get(key)
+    if data is None:
+        data = compute_dashboard(user)
+        cache.set(key, data, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 30))
+    return data
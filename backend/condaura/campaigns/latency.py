@@ -0,0 +1,43 @@
+from bisect import bisect_right
+from datetime import timedelta
+
+# Bornes inférieures, en secondes, des tranches de délai de décision
+# (de created_at à reviewed_at). La dernière tranche n'a pas de borne
+# supérieure. Les centiles sont estimés à partir du nombre de décisions
+# par tranche, ce qui permet de les tenir à jour par simples additions.
+LATENCY_BUCKETS = (
+    0, 60, 5 * 60, 15 * 60, 30 * 60,
+    3600, 2 * 3600, 4 * 3600, 8 * 3600, 12 * 3600,
+    86400, 2 * 86400, 3 * 86400, 5 * 86400, 7 * 86400,
+    10 * 86400, 14 * 86400, 21 * 86400, 30 * 86400, 45 * 86400,
+    60 * 86400, 90 * 86400,
+)
+
+
+def latency_bucket(latency):
+    """Tranche d'un délai (timedelta), None si la revue n'a pas de date de décision"""
+    if latency is None:
+        return None
+    return max(bisect_right(LATENCY_BUCKETS, latency.total_seconds()) - 1, 0)
+
+
+def latency_percentile(histogram, fraction):
+    """
+    Délai au centile `fraction` (0.5 pour la médiane) d'un histogramme
+    de décisions par tranche, interpolé dans la tranche qui le contient
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+
+    rank = fraction * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS[index]
+            if index + 1 == len(LATENCY_BUCKETS):
+                return timedelta(seconds=lower)
+            upper = LATENCY_BUCKETS[index + 1]
+            return timedelta(seconds=lower + (upper - lower) * (rank - seen) / count)
+        seen += count
+    return None
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from campaigns.services import ReportJobService
+
+
+class Command(BaseCommand):
+    help = "Génère les rapports en attente et évince les rapports périmés du cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Continuer à interroger la file d'attente")
+        parser.add_argument('--interval', type=float, default=5, help="Délai entre deux interrogations, en secondes")
+        parser.add_argument('--limit', type=int, default=None, help="Nombre maximum de jobs par passage")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = ReportJobService.process_queued(limit=options['limit'])
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f"{processed} rapport(s) généré(s)"))
+            evicted = ReportJobService.evict()
+            if evicted:
+                self.stdout.write(f"{evicted} rapport(s) évincé(s) du cache")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from campaigns.models import Campaign, CampaignStat, ReviewerStat
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les tables CampaignStat et ReviewerStat et les compteurs de décision depuis la table des revues"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--campaign', type=int, action='append', dest='campaigns',
+                            help="Campagne à reconstruire (répétable); toutes par défaut")
+
+    def handle(self, *args, **options):
+        Campaign.reconcile_counters(options['campaigns'])
+        CampaignStat.rebuild(options['campaigns'])
+        ReviewerStat.rebuild(options['campaigns'])
+        groups = CampaignStat.objects.all()
+        if options['campaigns']:
+            groups = groups.filter(campaign_id__in=options['campaigns'])
+        self.stdout.write(self.style.SUCCESS(f"{groups.count()} groupe(s) de statistiques reconstruit(s)"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from campaigns.models import Campaign
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs de décision des campagnes depuis la table des revues"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--campaign', type=int, action='append', dest='campaigns',
+                            help="Campagne à recalculer (répétable); toutes par défaut")
+
+    def handle(self, *args, **options):
+        fixed = Campaign.reconcile_counters(options['campaigns'])
+        self.stdout.write(self.style.SUCCESS(f"{fixed} campagne(s) corrigée(s)"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from campaigns.models import CampaignSnapshot
+
+
+class Command(BaseCommand):
+    help = "Enregistre un instantané des compteurs des campagnes actives, pour les courbes d'avancement"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--campaign', type=int, action='append', dest='campaigns',
+                            help="Campagne à photographier (répétable); campagnes actives par défaut")
+        parser.add_argument('--force', action='store_true',
+                            help="Enregistrer même si les compteurs n'ont pas changé depuis le dernier instantané")
+
+    def handle(self, *args, **options):
+        created = CampaignSnapshot.take(options['campaigns'], force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f"{created} instantané(s) enregistré(s)"))
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0003_alter_campaignscope_scope_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='assignment_method',
+            field=models.CharField(choices=[('manager', 'Manager'), ('manual', 'Reviewer pool (round-robin)'), ('least_loaded', 'Reviewer pool (least loaded)'), ('resource_owner', 'Resource owner')], default='manager', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='reviewers',
+            field=models.ManyToManyField(blank=True, help_text='Reviewer pool for the manual and least_loaded assignment methods', related_name='reviewer_pool_campaigns', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
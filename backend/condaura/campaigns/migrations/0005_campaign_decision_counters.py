@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:46
+
+from django.db import migrations, models
+
+
+def fill_decision_counters(apps, schema_editor):
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    Review = apps.get_model('access', 'Review')
+    fields = {decision: f'{decision}_count' for decision in ('pending', 'approved', 'rejected', 'deferred')}
+
+    counts = {}
+    for campaign_id, decision, count in (
+        Review.objects.order_by().values_list('campaign_id', 'decision').annotate(count=models.Count('id'))
+    ):
+        if decision in fields:
+            counts.setdefault(campaign_id, {})[fields[decision]] = count
+
+    for campaign_id, campaign_counts in counts.items():
+        Campaign.objects.filter(id=campaign_id).update(**campaign_counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access', '0006_review_unique_campaign_access'),
+        ('campaigns', '0004_campaign_assignment_method_campaign_reviewers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='approved_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='deferred_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='rejected_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_decision_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-17 18:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_campaign_stats(apps, schema_editor):
+    CampaignStat = apps.get_model('campaigns', 'CampaignStat')
+    Review = apps.get_model('access', 'Review')
+    groups = Review.objects.order_by().values_list(
+        'campaign_id', 'access__user__department', 'access__layer', 'access__profile', 'decision'
+    ).annotate(count=models.Count('id'))
+    CampaignStat.objects.bulk_create([
+        CampaignStat(campaign_id=campaign_id, department=department or '', layer=layer,
+                     profile=profile, decision=decision, count=count)
+        for campaign_id, department, layer, profile, decision, count in groups
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0005_campaign_decision_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(blank=True, max_length=100)),
+                ('layer', models.CharField(max_length=50)),
+                ('profile', models.CharField(max_length=50)),
+                ('decision', models.CharField(max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='campaigns.campaign')),
+            ],
+            options={
+                'verbose_name': 'Campaign Stat',
+                'verbose_name_plural': 'Campaign Stats',
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'department', 'layer', 'profile', 'decision'), name='unique_campaign_stat_group')],
+            },
+        ),
+        migrations.RunPython(fill_campaign_stats, migrations.RunPython.noop),
+    ]
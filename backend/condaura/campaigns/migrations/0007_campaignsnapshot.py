@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-17 19:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0006_campaignstat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('pending', models.PositiveIntegerField(default=0)),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('deferred', models.PositiveIntegerField(default=0)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='campaigns.campaign')),
+            ],
+            options={
+                'verbose_name': 'Campaign Snapshot',
+                'verbose_name_plural': 'Campaign Snapshots',
+                'ordering': ['campaign', 'taken_at'],
+                'indexes': [models.Index(fields=['campaign', 'taken_at'], name='campaign_snapshot_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.1 on 2026-10-17 19:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from campaigns.latency import LATENCY_BUCKETS, latency_bucket, latency_percentile
+
+
+def fill_reviewer_stats(apps, schema_editor):
+    ReviewerStat = apps.get_model('campaigns', 'ReviewerStat')
+    Review = apps.get_model('access', 'Review')
+    stats = {}
+    for campaign_id, reviewer_id, decision, created_at, reviewed_at in Review.objects.order_by().values_list(
+        'campaign_id', 'reviewer_id', 'decision', 'created_at', 'reviewed_at'
+    ).iterator(chunk_size=5000):
+        stat = stats.get((campaign_id, reviewer_id))
+        if stat is None:
+            stat = stats[(campaign_id, reviewer_id)] = ReviewerStat(
+                campaign_id=campaign_id, reviewer_id=reviewer_id, latency_histogram=[0] * len(LATENCY_BUCKETS)
+            )
+        if decision == 'pending':
+            stat.pending_count += 1
+            continue
+        stat.completed_count += 1
+        if reviewed_at is not None:
+            stat.latency_histogram[latency_bucket(reviewed_at - created_at)] += 1
+            if stat.last_activity is None or reviewed_at > stat.last_activity:
+                stat.last_activity = reviewed_at
+
+    for stat in stats.values():
+        stat.median_latency = latency_percentile(stat.latency_histogram, 0.5)
+        stat.p90_latency = latency_percentile(stat.latency_histogram, 0.9)
+    ReviewerStat.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0007_campaignsnapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewerStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('latency_histogram', models.JSONField(blank=True, default=list)),
+                ('median_latency', models.DurationField(blank=True, null=True)),
+                ('p90_latency', models.DurationField(blank=True, null=True)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviewer_stats', to='campaigns.campaign')),
+                ('reviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviewer_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Reviewer Stat',
+                'verbose_name_plural': 'Reviewer Stats',
+                'ordering': ['-pending_count', 'reviewer_id'],
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'reviewer'), name='unique_reviewer_stat')],
+            },
+        ),
+        migrations.RunPython(fill_reviewer_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0009_report_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='format',
+            field=models.CharField(choices=[('pdf', 'PDF'), ('pdf_summary', 'PDF summary'), ('excel', 'Excel'), ('csv', 'CSV')], max_length=20),
+        ),
+    ]
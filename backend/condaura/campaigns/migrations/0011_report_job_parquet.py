@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0010_report_job_pdf_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='format',
+            field=models.CharField(choices=[('pdf', 'PDF'), ('pdf_summary', 'PDF summary'), ('excel', 'Excel'), ('csv', 'CSV'), ('parquet', 'Parquet')], max_length=20),
+        ),
+    ]
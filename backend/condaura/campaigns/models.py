@@ -1,5 +1,11 @@
-from django.db import models
+from collections import Counter
+
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.utils import timezone
 from users.models import User
+from .dashboard import invalidate_dashboard
+from .latency import LATENCY_BUCKETS, latency_percentile
 
 class Campaign(models.Model):
     STATUS_CHOICES = (
@@ -9,6 +15,13 @@ class Campaign(models.Model):
         ('archived', 'Archived'),
     )
     
+    ASSIGNMENT_METHOD_CHOICES = (
+        ('manager', 'Manager'),
+        ('manual', 'Reviewer pool (round-robin)'),
+        ('least_loaded', 'Reviewer pool (least loaded)'),
+        ('resource_owner', 'Resource owner'),
+    )
+    
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     start_date = models.DateTimeField()
@@ -18,6 +31,27 @@ class Campaign(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     reminder_days = models.PositiveIntegerField(default=3, help_text="Days before deadline to send reminders")
+    assignment_method = models.CharField(max_length=20, choices=ASSIGNMENT_METHOD_CHOICES, default='manager')
+    reviewers = models.ManyToManyField(User, blank=True, related_name='reviewer_pool_campaigns',
+                                       help_text="Reviewer pool for the manual and least_loaded assignment methods")
+    
+    # Compteurs de revues par décision, tenus à jour par Review et ReviewQuerySet
+    pending_count = models.PositiveIntegerField(default=0)
+    approved_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+    deferred_count = models.PositiveIntegerField(default=0)
+    
+    # Révision des données de la campagne, incrémentée à chaque écriture
+    # (campagne, revues, accès revus): clé des rapports mis en cache
+    revision = models.PositiveBigIntegerField(default=0)
+    
+    # Décision de revue -> colonne compteur
+    DECISION_COUNTERS = {
+        'pending': 'pending_count',
+        'approved': 'approved_count',
+        'rejected': 'rejected_count',
+        'deferred': 'deferred_count',
+    }
     
     def __str__(self):
         return self.name
@@ -31,15 +65,387 @@ class Campaign(models.Model):
     def is_active(self):
         return self.status == 'active'
     
+    def save(self, *args, **kwargs):
+        # Les compteurs ne sont modifiés que par des UPDATE relatifs: une
+        # instance chargée avant un changement de décision ne doit pas les
+        # écraser avec des valeurs périmées
+        adding = self._state.adding
+        if not adding and kwargs.get('update_fields') is None:
+            counters = set(self.DECISION_COUNTERS.values()) | {'revision'}
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in counters
+            ]
+        super().save(*args, **kwargs)
+        if not adding:
+            Campaign.bump_revision([self.pk])
+        invalidate_dashboard()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_dashboard()
+        return result
+    
+    @property
+    def total_reviews(self):
+        return self.pending_count + self.approved_count + self.rejected_count + self.deferred_count
+    
     @property
     def progress(self):
         """Calculate campaign progress percentage"""
-        from access.models import Review
-        total_reviews = self.reviews.count()
+        total_reviews = self.total_reviews
         if total_reviews == 0:
             return 0
-        completed_reviews = self.reviews.exclude(decision='pending').count()
+        completed_reviews = total_reviews - self.pending_count
         return int((completed_reviews / total_reviews) * 100)
+    
+    @classmethod
+    def apply_review_deltas(cls, deltas, reviewer_deltas=None):
+        """
+        Applique des variations de nombre de revues, par clé
+        (campaign_id, department, layer, profile, decision), aux compteurs
+        des campagnes et à la table CampaignStat, et les variations par
+        réviseur (voir ReviewQuerySet.reviewer_counts) à la table ReviewerStat
+        """
+        decision_deltas = {}
+        for (campaign_id, _, _, _, decision), delta in deltas.items():
+            decision_deltas[(campaign_id, decision)] = decision_deltas.get((campaign_id, decision), 0) + delta
+        touched = {key[0] for key in deltas} | {key[0] for key in reviewer_deltas or ()}
+        cls.apply_decision_deltas(decision_deltas, touched)
+        CampaignStat.apply_deltas(deltas)
+        if reviewer_deltas:
+            ReviewerStat.apply_deltas(reviewer_deltas)
+        invalidate_dashboard()
+    
+    @classmethod
+    def refresh_review_counts(cls, campaign_ids):
+        """Recalcule compteurs et statistiques des campagnes depuis la table des revues"""
+        cls.reconcile_counters(campaign_ids)
+        CampaignStat.rebuild(campaign_ids)
+        ReviewerStat.rebuild(campaign_ids)
+        cls.bump_revision(campaign_ids)
+        invalidate_dashboard()
+    
+    @classmethod
+    def bump_revision(cls, campaign_ids):
+        """Signale une écriture sur les campagnes: les rapports en cache deviennent périmés"""
+        cls.objects.filter(id__in=campaign_ids).update(revision=F('revision') + 1)
+    
+    @classmethod
+    def apply_decision_deltas(cls, deltas, touched=()):
+        """
+        Applique des variations de compteurs {(campaign_id, decision): delta}
+        avec des UPDATE ... SET x = x + delta, une requête par campagne, et
+        incrémente la révision de ces campagnes et des campagnes `touched`
+        """
+        changes = {}
+        for (campaign_id, decision), delta in deltas.items():
+            field = cls.DECISION_COUNTERS.get(decision)
+            if field and delta:
+                campaign_changes = changes.setdefault(campaign_id, {})
+                campaign_changes[field] = campaign_changes.get(field, 0) + delta
+        
+        for campaign_id, campaign_changes in changes.items():
+            cls.objects.filter(id=campaign_id).update(
+                revision=F('revision') + 1,
+                **{field: F(field) + delta for field, delta in campaign_changes.items() if delta}
+            )
+        # Campagnes modifiées sans variation de compteur (réviseur, date...)
+        unchanged = set(touched) - changes.keys()
+        if unchanged:
+            cls.bump_revision(unchanged)
+    
+    @classmethod
+    def reconcile_counters(cls, campaign_ids=None):
+        """
+        Recalcule les compteurs depuis la table des revues
+        Renvoie le nombre de campagnes dont les compteurs étaient faux
+        """
+        from access.models import Review
+        
+        campaigns = cls.objects.all()
+        reviews = Review.objects.all()
+        if campaign_ids is not None:
+            campaigns = campaigns.filter(id__in=campaign_ids)
+            reviews = reviews.filter(campaign_id__in=campaign_ids)
+        
+        counts = {}
+        for campaign_id, decision, count in (
+            reviews.order_by().values_list('campaign_id', 'decision').annotate(count=Count('id'))
+        ):
+            field = cls.DECISION_COUNTERS.get(decision)
+            if field:
+                counts.setdefault(campaign_id, {})[field] = count
+        
+        fields = list(cls.DECISION_COUNTERS.values())
+        drifted = []
+        for campaign in campaigns.only('id', *fields):
+            expected = {field: counts.get(campaign.id, {}).get(field, 0) for field in fields}
+            if any(getattr(campaign, field) != value for field, value in expected.items()):
+                for field, value in expected.items():
+                    setattr(campaign, field, value)
+                drifted.append(campaign)
+        
+        cls.objects.bulk_update(drifted, fields, batch_size=1000)
+        return len(drifted)
+
+class CampaignStat(models.Model):
+    """
+    Review counts per campaign, department, layer, profile and decision.
+    Maintained by Review writes; rebuilt by the rebuild_campaign_stats command.
+    """
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='stats')
+    department = models.CharField(max_length=100, blank=True)
+    layer = models.CharField(max_length=50)
+    profile = models.CharField(max_length=50)
+    decision = models.CharField(max_length=20)
+    count = models.PositiveIntegerField(default=0)
+    
+    DIMENSIONS = ('department', 'layer', 'profile', 'decision')
+    
+    def __str__(self):
+        return f"{self.campaign_id} {self.department}/{self.layer}/{self.profile}/{self.decision}: {self.count}"
+    
+    class Meta:
+        verbose_name = 'Campaign Stat'
+        verbose_name_plural = 'Campaign Stats'
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'department', 'layer', 'profile', 'decision'],
+                                    name='unique_campaign_stat_group'),
+        ]
+    
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Applique des variations {(campaign_id, department, layer, profile, decision): delta}
+        en trois requêtes au plus: lecture des groupes, bulk_update, bulk_create.
+        Les campagnes concernées doivent être verrouillées par l'appelant.
+        """
+        deltas = {
+            (campaign_id, department or '', layer, profile, decision): delta
+            for (campaign_id, department, layer, profile, decision), delta in deltas.items()
+            if delta
+        }
+        if not deltas:
+            return
+        
+        existing = {
+            (stat.campaign_id, stat.department, stat.layer, stat.profile, stat.decision): stat
+            for stat in cls.objects.filter(campaign_id__in={key[0] for key in deltas})
+        }
+        to_update = []
+        to_create = []
+        for key, delta in deltas.items():
+            stat = existing.get(key)
+            if stat is not None:
+                stat.count = max(stat.count + delta, 0)
+                to_update.append(stat)
+            elif delta > 0:
+                campaign_id, department, layer, profile, decision = key
+                to_create.append(cls(campaign_id=campaign_id, department=department, layer=layer,
+                                     profile=profile, decision=decision, count=delta))
+        
+        cls.objects.bulk_update(to_update, ['count'], batch_size=1000)
+        cls.objects.bulk_create(to_create, batch_size=1000)
+    
+    @classmethod
+    def rebuild(cls, campaign_ids=None):
+        """Reconstruit les statistiques depuis la table des revues"""
+        from access.models import Review
+        
+        stats = cls.objects.all()
+        reviews = Review.objects.all()
+        if campaign_ids is not None:
+            stats = stats.filter(campaign_id__in=campaign_ids)
+            reviews = reviews.filter(campaign_id__in=campaign_ids)
+        
+        with transaction.atomic():
+            stats.delete()
+            cls.objects.bulk_create([
+                cls(campaign_id=campaign_id, department=department or '', layer=layer,
+                    profile=profile, decision=decision, count=count)
+                for (campaign_id, department, layer, profile, decision), count in reviews.rollup_counts().items()
+            ], batch_size=1000)
+    
+    @classmethod
+    def breakdown(cls, dimension, **filters):
+        """{valeur: nombre de revues} pour une dimension, sur les groupes filtrés"""
+        return {
+            value: total
+            for value, total in cls.objects.filter(count__gt=0, **filters)
+            .values_list(dimension).annotate(total=Sum('count')).order_by(dimension)
+        }
+
+class ReviewerStat(models.Model):
+    """
+    Workload and decision latency of a reviewer in a campaign.
+    Maintained by Review writes; rebuilt by the rebuild_campaign_stats command.
+    """
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='reviewer_stats')
+    reviewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviewer_stats')
+    pending_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+    # Nombre de décisions par tranche de délai (voir latency.LATENCY_BUCKETS)
+    latency_histogram = models.JSONField(default=list, blank=True)
+    median_latency = models.DurationField(null=True, blank=True)
+    p90_latency = models.DurationField(null=True, blank=True)
+    last_activity = models.DateTimeField(null=True, blank=True)
+    
+    UPDATE_FIELDS = ['pending_count', 'completed_count', 'latency_histogram',
+                     'median_latency', 'p90_latency', 'last_activity']
+    
+    def __str__(self):
+        return f"{self.campaign_id} {self.reviewer_id}: {self.pending_count} pending, {self.completed_count} completed"
+    
+    class Meta:
+        verbose_name = 'Reviewer Stat'
+        verbose_name_plural = 'Reviewer Stats'
+        ordering = ['-pending_count', 'reviewer_id']
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'reviewer'], name='unique_reviewer_stat'),
+        ]
+    
+    @property
+    def is_late(self):
+        """Revues encore en attente après la date de fin de la campagne"""
+        return self.pending_count > 0 and self.campaign.end_date < timezone.now()
+    
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Applique des variations {(campaign_id, reviewer_id, decision, tranche): (delta, dernier reviewed_at)}
+        en trois requêtes au plus: lecture des lignes, bulk_update, bulk_create.
+        Médiane et 90e centile sont recalculés depuis l'histogramme des délais.
+        Les campagnes concernées doivent être verrouillées par l'appelant.
+        """
+        changes = {}
+        for (campaign_id, reviewer_id, decision, bucket), (delta, last) in deltas.items():
+            if not delta and last is None:
+                continue
+            change = changes.setdefault((campaign_id, reviewer_id), {
+                'pending': 0, 'completed': 0, 'histogram': Counter(), 'last': None
+            })
+            if decision == 'pending':
+                change['pending'] += delta
+            else:
+                change['completed'] += delta
+                if bucket is not None:
+                    change['histogram'][bucket] += delta
+            if last is not None and (change['last'] is None or last > change['last']):
+                change['last'] = last
+        if not changes:
+            return
+        
+        existing = {
+            (stat.campaign_id, stat.reviewer_id): stat
+            for stat in cls.objects.filter(
+                campaign_id__in={key[0] for key in changes},
+                reviewer_id__in={key[1] for key in changes}
+            ).order_by()
+        }
+        to_update = []
+        to_create = []
+        for (campaign_id, reviewer_id), change in changes.items():
+            stat = existing.get((campaign_id, reviewer_id))
+            if stat is not None:
+                to_update.append(stat)
+            elif change['pending'] > 0 or change['completed'] > 0:
+                stat = cls(campaign_id=campaign_id, reviewer_id=reviewer_id)
+                to_create.append(stat)
+            else:
+                continue
+            
+            stat.pending_count = max(stat.pending_count + change['pending'], 0)
+            stat.completed_count = max(stat.completed_count + change['completed'], 0)
+            histogram = list(stat.latency_histogram) + [0] * (len(LATENCY_BUCKETS) - len(stat.latency_histogram))
+            for bucket, delta in change['histogram'].items():
+                histogram[bucket] = max(histogram[bucket] + delta, 0)
+            stat.latency_histogram = histogram
+            stat.median_latency = latency_percentile(histogram, 0.5)
+            stat.p90_latency = latency_percentile(histogram, 0.9)
+            if change['last'] is not None and (stat.last_activity is None or change['last'] > stat.last_activity):
+                stat.last_activity = change['last']
+        
+        cls.objects.bulk_update(to_update, cls.UPDATE_FIELDS, batch_size=1000)
+        cls.objects.bulk_create(to_create, batch_size=1000)
+    
+    @classmethod
+    def rebuild(cls, campaign_ids=None):
+        """Reconstruit les statistiques par réviseur depuis la table des revues"""
+        from access.models import Review
+        
+        stats = cls.objects.all()
+        reviews = Review.objects.all()
+        if campaign_ids is not None:
+            stats = stats.filter(campaign_id__in=campaign_ids)
+            reviews = reviews.filter(campaign_id__in=campaign_ids)
+        
+        with transaction.atomic():
+            stats.delete()
+            cls.apply_deltas(reviews.reviewer_counts())
+
+class CampaignSnapshot(models.Model):
+    """
+    Review counts of a campaign at a point in time, for burndown charts.
+    Appended by the snapshot_campaigns command from the campaign counters.
+    """
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='snapshots')
+    taken_at = models.DateTimeField(default=timezone.now)
+    pending = models.PositiveIntegerField(default=0)
+    approved = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    deferred = models.PositiveIntegerField(default=0)
+    
+    # Champ de l'instantané -> compteur de la campagne
+    COUNTERS = {
+        'pending': 'pending_count',
+        'approved': 'approved_count',
+        'rejected': 'rejected_count',
+        'deferred': 'deferred_count',
+    }
+    
+    def __str__(self):
+        return f"{self.campaign_id} @ {self.taken_at:%Y-%m-%d %H:%M}"
+    
+    class Meta:
+        verbose_name = 'Campaign Snapshot'
+        verbose_name_plural = 'Campaign Snapshots'
+        ordering = ['campaign', 'taken_at']
+        indexes = [
+            models.Index(fields=['campaign', 'taken_at'], name='campaign_snapshot_time_idx'),
+        ]
+    
+    @classmethod
+    def take(cls, campaign_ids=None, force=False):
+        """
+        Ajoute un instantané par campagne (par défaut, les campagnes actives)
+        à partir des compteurs de la campagne, sans lire la table des revues.
+        Sauf avec `force`, une campagne dont les compteurs n'ont pas changé
+        depuis le dernier instantané est ignorée: la série ne contient que
+        les changements. Renvoie le nombre d'instantanés créés.
+        """
+        campaigns = Campaign.objects.all()
+        if campaign_ids is None:
+            campaigns = campaigns.filter(status='active')
+        else:
+            campaigns = campaigns.filter(id__in=campaign_ids)
+        
+        # Dernier instantané de chaque campagne, lu dans la même requête
+        latest = cls.objects.filter(campaign=OuterRef('pk')).order_by('-taken_at', '-id')
+        campaigns = campaigns.annotate(**{
+            f'last_{field}': Subquery(latest.values(field)[:1]) for field in cls.COUNTERS
+        }).only('id', *cls.COUNTERS.values())
+        
+        now = timezone.now()
+        snapshots = []
+        for campaign in campaigns:
+            counts = {field: getattr(campaign, counter) for field, counter in cls.COUNTERS.items()}
+            if not force and all(getattr(campaign, f'last_{field}') == value for field, value in counts.items()):
+                continue
+            snapshots.append(cls(campaign_id=campaign.id, taken_at=now, **counts))
+        
+        cls.objects.bulk_create(snapshots, batch_size=1000)
+        return len(snapshots)
 
 class CampaignScope(models.Model):
     """Define the scope of a campaign (which departments, resources, etc.)"""
@@ -63,3 +469,55 @@ class CampaignScope(models.Model):
         verbose_name = 'Campaign Scope'
         verbose_name_plural = 'Campaign Scopes'
         unique_together = ('campaign', 'scope_type', 'scope_value')
+
+class ReportJob(models.Model):
+    """
+    Campaign report generated in the background. The file is kept as a
+    cached artifact for the campaign revision it was generated from.
+    """
+    FORMAT_CHOICES = (
+        ('pdf', 'PDF'),
+        ('pdf_summary', 'PDF summary'),
+        ('excel', 'Excel'),
+        ('csv', 'CSV'),
+        ('parquet', 'Parquet'),
+    )
+    
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+    
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='report_jobs')
+    format = models.CharField(max_length=20, choices=FORMAT_CHOICES)
+    revision = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    file = models.FileField(upload_to='reports/%Y/%m/', blank=True)
+    file_size = models.PositiveBigIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='report_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_accessed_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.get_format_display()} report #{self.id} ({self.status})"
+    
+    class Meta:
+        verbose_name = 'Report Job'
+        verbose_name_plural = 'Report Jobs'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'format', 'revision'], name='unique_report_per_revision'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    @property
+    def is_current(self):
+        """Le rapport correspond-il à l'état actuel de la campagne"""
+        return self.revision == self.campaign.revision
@@ -1,129 +1,325 @@
 import io
 import csv
+from array import array
 import datetime
+import itertools
+import re
+import tempfile
+from xml.sax.saxutils import escape
 import pandas as pd
-from django.http import HttpResponse
-from django.template.loader import get_template
-from xhtml2pdf import pisa
+from django.db.models import Sum
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, NameObject, StreamObject, TextStringObject
+)
+from reportlab.graphics.charts.barcharts import HorizontalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import LongTable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# pyarrow n'est nécessaire que pour l'export Parquet
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 
-from .models import Campaign
+from .models import Campaign, CampaignStat
 from access.models import Review
 
+class PdfPartsWriter:
+    """
+    Concatène des PDF dans un fichier au fil de l'eau: les objets des
+    pages de chaque partie sont renumérotés et écrits aussitôt dans la
+    sortie; seuls leurs positions (pour la table xref) et les numéros des
+    pages restent en mémoire, dans des tableaux d'entiers. Une partie
+    n'est plus lue une fois ajoutée et peut être fermée.
+    """
+    CATALOG_ID, PAGES_ID, INFO_ID = 1, 2, 3
+    
+    def __init__(self, output):
+        self.output = output
+        self.start = output.tell()
+        # Position de chaque objet, indexée par numéro (0: entrée libre)
+        self.offsets = array('q', [0] * (self.INFO_ID + 1))
+        self.kids = array('q')
+        output.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    
+    def write_object(self, idnum, obj):
+        self.offsets[idnum] = self.output.tell() - self.start
+        self.output.write(f'{idnum} 0 obj\n'.encode())
+        obj.write_to_stream(self.output)
+        self.output.write(b'\nendobj\n')
+    
+    def append(self, part):
+        """Ajoute les pages du PDF `part` (fichier positionné au début)"""
+        reader = PdfReader(part)
+        ids = {}
+        queue = []
+        
+        def translate(obj):
+            if isinstance(obj, IndirectObject):
+                if obj.idnum not in ids:
+                    ids[obj.idnum] = len(self.offsets)
+                    self.offsets.append(0)
+                    queue.append(obj)
+                return IndirectObject(ids[obj.idnum], 0, None)
+            if isinstance(obj, StreamObject):
+                copy = obj.__class__()
+                copy._data = obj._data
+                copy.update({key: translate(value) for key, value in obj.items()})
+                return copy
+            if isinstance(obj, DictionaryObject):
+                return DictionaryObject({key: translate(value) for key, value in obj.items()})
+            if isinstance(obj, ArrayObject):
+                return ArrayObject(translate(value) for value in obj)
+            return obj
+        
+        for page in reader.pages:
+            self.kids.append(translate(page.indirect_reference).idnum)
+        while queue:
+            reference = queue.pop()
+            obj = reference.get_object()
+            if isinstance(obj, DictionaryObject) and obj.get('/Type') == '/Page':
+                # Les pages sont rattachées à l'arbre des pages de la sortie
+                obj = DictionaryObject({key: value for key, value in obj.items() if key != '/Parent'})
+                copy = translate(obj)
+                copy[NameObject('/Parent')] = IndirectObject(self.PAGES_ID, 0, None)
+            else:
+                copy = translate(obj)
+            self.write_object(ids[reference.idnum], copy)
+    
+    def close(self, title=''):
+        """Écrit l'arbre des pages, le catalogue, les métadonnées et la table xref"""
+        # Arbre des pages à un seul niveau, écrit page par page
+        self.offsets[self.PAGES_ID] = self.output.tell() - self.start
+        self.output.write(f'{self.PAGES_ID} 0 obj\n<< /Type /Pages /Count {len(self.kids)} /Kids ['.encode())
+        for idnum in self.kids:
+            self.output.write(f' {idnum} 0 R'.encode())
+        self.output.write(b' ] >>\nendobj\n')
+        self.write_object(self.CATALOG_ID, DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): IndirectObject(self.PAGES_ID, 0, None),
+        }))
+        self.write_object(self.INFO_ID, DictionaryObject({
+            NameObject('/Title'): TextStringObject(title),
+            NameObject('/Producer'): TextStringObject('Condaura'),
+        }))
+        
+        xref = self.output.tell() - self.start
+        size = len(self.offsets)
+        self.output.write(f'xref\n0 {size}\n0000000000 65535 f \n'.encode())
+        for offset in itertools.islice(self.offsets, 1, None):
+            self.output.write(f'{offset:010d} 00000 n \n'.encode())
+        self.output.write(
+            f'trailer\n<< /Size {size} /Root {self.CATALOG_ID} 0 R /Info {self.INFO_ID} 0 R >>\n'
+            f'startxref\n{xref}\n%%EOF\n'.encode()
+        )
+
 class ReportGenerator:
+    # Lignes lues par requête et envoyées par bloc dans les exports en flux
+    CSV_CHUNK_SIZE = 2000
+    # Taille au-delà de laquelle un rapport en préparation est écrit sur disque
+    SPOOL_SIZE = 10 * 1024 * 1024
+    # Lignes d'une feuille Excel
+    EXCEL_MAX_ROWS = 1048576
+    # Lignes par row group de l'export Parquet
+    PARQUET_ROW_GROUP_SIZE = 50000
+    # Revues rendues par partie du rapport PDF détaillé
+    PDF_CHUNK_SIZE = 1000
+    # Départements du graphique de la synthèse PDF
+    PDF_CHART_DEPARTMENTS = 15
+    # Décisions des rapports PDF, dans l'ordre des colonnes, et leurs couleurs
+    PDF_DECISIONS = (
+        ('approved', 'Approuvés'),
+        ('rejected', 'Rejetés'),
+        ('pending', 'En attente'),
+        ('deferred', 'Reportés'),
+    )
+    PDF_COLORS = (colors.HexColor('#66bb6a'), colors.HexColor('#ef5350'),
+                  colors.HexColor('#ffca28'), colors.HexColor('#90a4ae'))
+    # Format -> (type MIME, extension)
+    FORMATS = {
+        'pdf': ('application/pdf', 'pdf'),
+        'pdf_summary': ('application/pdf', 'pdf'),
+        'excel': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+        'csv': ('text/csv; charset=utf-8', 'csv'),
+        'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    }
+    
+    @staticmethod
+    def file_name(campaign, report_format):
+        return f'campagne_{campaign.id}_{datetime.date.today().isoformat()}.{ReportGenerator.FORMATS[report_format][1]}'
+    
+    @staticmethod
+    def file_response(output, campaign, report_format, gzip=False):
+        """Réponse HTTP envoyant le fichier `output` par blocs, compressés à la volée avec gzip=True"""
+        if not gzip:
+            return FileResponse(
+                output,
+                as_attachment=True,
+                filename=ReportGenerator.file_name(campaign, report_format),
+                content_type=ReportGenerator.FORMATS[report_format][0]
+            )
+        
+        def blocks():
+            with output:
+                yield from iter(lambda: output.read(FileResponse.block_size), b'')
+        
+        response = StreamingHttpResponse(compress_sequence(blocks()), content_type=ReportGenerator.FORMATS[report_format][0])
+        response['Content-Disposition'] = f'attachment; filename={ReportGenerator.file_name(campaign, report_format)}'
+        response['Content-Encoding'] = 'gzip'
+        return response
+    
+    @staticmethod
+    def write_report(campaign, report_format, output):
+        """Écrit le rapport d'une campagne au format `report_format` dans le fichier `output`"""
+        writers = {
+            'pdf': ReportGenerator.write_pdf_report,
+            'pdf_summary': ReportGenerator.write_pdf_summary_report,
+            'excel': ReportGenerator.write_excel_report,
+            'csv': ReportGenerator.write_csv_report,
+            'parquet': ReportGenerator.write_parquet_report,
+        }
+        writers[report_format](campaign, output)
+    
+    @staticmethod
+    def excel_cell(worksheet, value, **styles):
+        """Cellule mise en forme d'une feuille en écriture seule"""
+        cell = WriteOnlyCell(worksheet, value=value)
+        for name, style in styles.items():
+            setattr(cell, name, style)
+        return cell
+    
+    @staticmethod
+    def excel_review_sheet(workbook, campaign, part):
+        """Feuille des revues, avec l'en-tête de la campagne; `part` numérote les suites"""
+        worksheet = workbook.create_sheet("Campagne" if part == 1 else f"Campagne ({part})")
+        headers = ["Utilisateur", "Département", "Ressource", "Type", "Niveau d'accès", "Décision", "Commentaire", "Réviseur", "Date de revue"]
+        
+        # Largeur des colonnes et volets figés: en écriture seule, à
+        # renseigner avant la première ligne
+        for col_num, _ in enumerate(headers, 1):
+            worksheet.column_dimensions[get_column_letter(col_num)].width = 20
+        worksheet.freeze_panes = 'A6'
+        
+        # En-tête avec informations de la campagne
+        center = Alignment(horizontal='center')
+        for row_num, (text, font) in enumerate([
+            (f"Rapport de campagne: {campaign.name}", Font(bold=True, size=14)),
+            (f"Période: {campaign.start_date.strftime('%d/%m/%Y')} - {campaign.end_date.strftime('%d/%m/%Y')}", None),
+            (f"Statut: {campaign.status} - Progression: {campaign.progress}%", None),
+        ], 1):
+            styles = {'alignment': center, **({'font': font} if font else {})}
+            worksheet.append([ReportGenerator.excel_cell(worksheet, text, **styles)])
+            worksheet.merged_cells.add(f'A{row_num}:F{row_num}')
+        worksheet.append([])
+        
+        # En-tête du tableau des revues
+        fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
+        worksheet.append([
+            ReportGenerator.excel_cell(worksheet, header, font=Font(bold=True), fill=fill, alignment=center)
+            for header in headers
+        ])
+        return worksheet
+    
+    @staticmethod
+    def write_excel_report(campaign, output):
+        """
+        Écrit le rapport Excel d'une campagne dans le fichier `output`
+        
+        Le classeur est écrit en mode écriture seule (write_only): les
+        lignes, lues par un seul values_list parcouru par blocs, sont
+        écrites au fil de l'eau et ne restent pas en mémoire. Les
+        statistiques viennent des agrégats de CampaignStat.
+        """
+        # Créer un workbook en écriture seule
+        workbook = Workbook(write_only=True)
+        worksheet = ReportGenerator.excel_review_sheet(workbook, campaign, 1)
+        
+        # Contenu du tableau
+        decisions = dict(Review.DECISION_CHOICES)
+        rows = Review.objects.filter(campaign=campaign).order_by('id').values_list(
+            'access__user__first_name', 'access__user__last_name', 'access__user__department',
+            'access__resource_name', 'access__layer', 'access__profile', 'decision', 'comment',
+            'reviewer__first_name', 'reviewer__last_name', 'reviewed_at'
+        )
+        row_num = 5
+        part = 1
+        for (first_name, last_name, department, resource_name, layer, profile, decision, comment,
+             reviewer_first_name, reviewer_last_name, reviewed_at) in rows.iterator(
+                chunk_size=ReportGenerator.CSV_CHUNK_SIZE):
+            if row_num == ReportGenerator.EXCEL_MAX_ROWS:
+                # Limite de lignes d'une feuille Excel: suite dans une nouvelle feuille
+                part += 1
+                worksheet = ReportGenerator.excel_review_sheet(workbook, campaign, part)
+                row_num = 5
+            worksheet.append([
+                f"{first_name} {last_name}",
+                department,
+                resource_name,
+                layer,
+                profile,
+                decisions.get(decision, decision),
+                comment,
+                f"{reviewer_first_name} {reviewer_last_name}",
+                reviewed_at.strftime('%d/%m/%Y %H:%M') if reviewed_at else "Non revu"
+            ])
+            row_num += 1
+        
+        # Statistiques lues dans la table CampaignStat
+        worksheet = workbook.create_sheet("Statistiques")
+        worksheet.column_dimensions['A'].width = 30
+        worksheet.append([ReportGenerator.excel_cell(worksheet, "Statistiques", font=Font(bold=True, size=12))])
+        
+        decision_stats = {
+            decisions.get(decision, decision): count
+            for decision, count in CampaignStat.breakdown('decision', campaign=campaign).items()
+        }
+        total_reviews = sum(decision_stats.values())
+        
+        # Statistiques par type de ressource
+        resource_stats = CampaignStat.breakdown('layer', campaign=campaign)
+        
+        for title, stats in (("Décisions", decision_stats), ("Types de ressources", resource_stats)):
+            worksheet.append([])
+            worksheet.append([ReportGenerator.excel_cell(worksheet, title, font=Font(bold=True))])
+            for label, count in stats.items():
+                worksheet.append([label, count, f"{count / total_reviews * 100:.1f}%"])
+        
+        workbook.save(output)
+    
     @staticmethod
     def generate_excel_report(campaign_id):
         """
         Génère un rapport Excel pour une campagne
+        
+        Le fichier est assemblé dans un fichier temporaire, en mémoire
+        jusqu'à SPOOL_SIZE octets puis sur disque, et envoyé par blocs.
         """
         try:
             campaign = Campaign.objects.get(id=campaign_id)
             
-            # Créer un workbook et une feuille de calcul
-            workbook = Workbook()
-            worksheet = workbook.active
-            worksheet.title = "Campagne"
-            
-            # En-tête avec informations de la campagne
-            worksheet.merge_cells('A1:F1')
-            worksheet['A1'] = f"Rapport de campagne: {campaign.name}"
-            worksheet['A1'].font = Font(bold=True, size=14)
-            worksheet['A1'].alignment = Alignment(horizontal='center')
-            
-            worksheet.merge_cells('A2:F2')
-            worksheet['A2'] = f"Période: {campaign.start_date.strftime('%d/%m/%Y')} - {campaign.end_date.strftime('%d/%m/%Y')}"
-            worksheet['A2'].alignment = Alignment(horizontal='center')
-            
-            worksheet.merge_cells('A3:F3')
-            worksheet['A3'] = f"Statut: {campaign.status} - Progression: {campaign.progress}%"
-            worksheet['A3'].alignment = Alignment(horizontal='center')
-            
-            # En-tête du tableau des revues
-            headers = ["Utilisateur", "Département", "Ressource", "Type", "Niveau d'accès", "Décision", "Commentaire", "Réviseur", "Date de revue"]
-            for col_num, header in enumerate(headers, 1):
-                cell = worksheet.cell(row=5, column=col_num)
-                cell.value = header
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="DDDDDD", end_color="DDDDDD", fill_type="solid")
-                cell.alignment = Alignment(horizontal='center')
-            
-            # Contenu du tableau
-            reviews = Review.objects.filter(campaign=campaign).select_related('access', 'access__user', 'reviewer')
-            
-            for row_num, review in enumerate(reviews, 6):
-                worksheet.cell(row=row_num, column=1).value = f"{review.access.user.first_name} {review.access.user.last_name}"
-                worksheet.cell(row=row_num, column=2).value = review.access.user.department
-                worksheet.cell(row=row_num, column=3).value = review.access.resource_name
-                worksheet.cell(row=row_num, column=4).value = review.access.resource_type
-                worksheet.cell(row=row_num, column=5).value = review.access.access_level
-                worksheet.cell(row=row_num, column=6).value = review.get_decision_display()
-                worksheet.cell(row=row_num, column=7).value = review.comment
-                worksheet.cell(row=row_num, column=8).value = f"{review.reviewer.first_name} {review.reviewer.last_name}"
-                worksheet.cell(row=row_num, column=9).value = review.reviewed_at.strftime('%d/%m/%Y %H:%M') if review.reviewed_at else "Non revu"
-            
-            # Ajuster la largeur des colonnes
-            for col_num, _ in enumerate(headers, 1):
-                worksheet.column_dimensions[get_column_letter(col_num)].width = 20
-            
-            # Statistiques
-            row_num = len(reviews) + 8
-            
-            worksheet.merge_cells(f'A{row_num}:F{row_num}')
-            worksheet[f'A{row_num}'] = "Statistiques"
-            worksheet[f'A{row_num}'].font = Font(bold=True, size=12)
-            worksheet[f'A{row_num}'].alignment = Alignment(horizontal='center')
-            
-            # Statistiques par décision
-            decision_stats = {}
-            for review in reviews:
-                decision = review.get_decision_display()
-                if decision not in decision_stats:
-                    decision_stats[decision] = 0
-                decision_stats[decision] += 1
-            
-            row_num += 2
-            worksheet[f'A{row_num}'] = "Décisions"
-            worksheet[f'A{row_num}'].font = Font(bold=True)
-            
-            for decision, count in decision_stats.items():
-                row_num += 1
-                worksheet[f'A{row_num}'] = decision
-                worksheet[f'B{row_num}'] = count
-                worksheet[f'C{row_num}'] = f"{count / len(reviews) * 100:.1f}%"
-            
-            # Statistiques par type de ressource
-            resource_stats = {}
-            for review in reviews:
-                resource_type = review.access.resource_type
-                if resource_type not in resource_stats:
-                    resource_stats[resource_type] = 0
-                resource_stats[resource_type] += 1
-            
-            row_num += 2
-            worksheet[f'A{row_num}'] = "Types de ressources"
-            worksheet[f'A{row_num}'].font = Font(bold=True)
-            
-            for resource_type, count in resource_stats.items():
-                row_num += 1
-                worksheet[f'A{row_num}'] = resource_type
-                worksheet[f'B{row_num}'] = count
-                worksheet[f'C{row_num}'] = f"{count / len(reviews) * 100:.1f}%"
-            
-            # Créer le fichier en mémoire
-            output = io.BytesIO()
-            workbook.save(output)
+            # Créer le fichier: en mémoire, puis sur disque au-delà de SPOOL_SIZE
+            output = tempfile.SpooledTemporaryFile(max_size=ReportGenerator.SPOOL_SIZE)
+            ReportGenerator.write_excel_report(campaign, output)
             output.seek(0)
             
-            # Générer la réponse HTTP
-            response = HttpResponse(
-                output.read(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename=campagne_{campaign.id}_{datetime.date.today().isoformat()}.xlsx'
-            
-            return response
+            # Générer la réponse HTTP, envoyée par blocs
+            return ReportGenerator.file_response(output, campaign, 'excel')
         
         except Campaign.DoesNotExist:
             return None
@@ -132,66 +328,267 @@ class ReportGenerator:
             return None
     
     @staticmethod
-    def generate_pdf_report(campaign_id):
+    def pdf_styles():
+        """Styles des paragraphes des rapports PDF"""
+        styles = getSampleStyleSheet()
+        styles.add(ParagraphStyle('Cell', parent=styles['Normal'], fontSize=7, leading=8.5))
+        styles.add(ParagraphStyle('Info', parent=styles['Normal'], alignment=TA_CENTER, textColor=colors.HexColor('#666666')))
+        return styles
+    
+    @staticmethod
+    def pdf_table_style(header_rows=1):
+        return TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dddddd')),
+            ('BACKGROUND', (0, 0), (-1, header_rows - 1), colors.HexColor('#f2f2f2')),
+            ('FONTNAME', (0, 0), (-1, header_rows - 1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('ROWBACKGROUNDS', (0, header_rows), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ])
+    
+    @staticmethod
+    def pdf_document(output, campaign, first_page=1):
+        """
+        Document reportlab dont le pied de page numérote les pages à partir
+        de `first_page`, pour les parties assemblées d'un même rapport
+        """
+        generated = datetime.datetime.now().strftime('%d/%m/%Y %H:%M')
+        
+        def footer(canvas, document):
+            canvas.saveState()
+            canvas.setFont('Helvetica', 7)
+            canvas.setFillColor(colors.HexColor('#999999'))
+            canvas.drawCentredString(
+                document.pagesize[0] / 2, 1 * cm,
+                f"Condaura - {campaign.name} - Rapport confidentiel - {generated} - "
+                f"Page {first_page + canvas.getPageNumber() - 1}"
+            )
+            canvas.restoreState()
+        
+        document = SimpleDocTemplate(
+            output, pagesize=landscape(A4), title=f"Rapport de campagne - {campaign.name}",
+            leftMargin=1.5 * cm, rightMargin=1.5 * cm, topMargin=1.5 * cm, bottomMargin=1.8 * cm
+        )
+        return document, footer
+    
+    @staticmethod
+    def pdf_summary(campaign):
+        """
+        Agrégats du rapport, lus en une requête sur CampaignStat:
+        (total par décision, {type de ressource: {décision: nombre}},
+        {département: {décision: nombre}})
+        """
+        by_decision = {}
+        by_layer = {}
+        by_department = {}
+        for department, layer, decision, total in campaign.stats.filter(count__gt=0).values_list(
+                'department', 'layer', 'decision').annotate(total=Sum('count')).order_by():
+            by_decision[decision] = by_decision.get(decision, 0) + total
+            for groups, key in ((by_layer, layer), (by_department, department or 'Non renseigné')):
+                counts = groups.setdefault(key, {})
+                counts[decision] = counts.get(decision, 0) + total
+        return by_decision, by_layer, by_department
+    
+    @staticmethod
+    def pdf_breakdown_table(title, groups):
+        """Tableau {groupe: {décision: nombre}}, les groupes les plus gros en tête"""
+        header = [title, 'Total'] + [label for _, label in ReportGenerator.PDF_DECISIONS] + ['Progression']
+        rows = [header]
+        for group, counts in sorted(groups.items(), key=lambda item: (-sum(item[1].values()), item[0])):
+            total = sum(counts.values())
+            rows.append(
+                [group, total]
+                + [counts.get(decision, 0) for decision, _ in ReportGenerator.PDF_DECISIONS]
+                + [f"{(total - counts.get('pending', 0)) / total * 100:.0f}%"]
+            )
+        table = LongTable(rows, repeatRows=1, hAlign='LEFT')
+        table.setStyle(ReportGenerator.pdf_table_style())
+        return table
+    
+    @staticmethod
+    def pdf_decision_chart(by_decision):
+        """Camembert de la répartition des décisions"""
+        drawing = Drawing(12 * cm, 6 * cm)
+        decisions = [(label, by_decision.get(decision, 0), color)
+                     for (decision, label), color in zip(ReportGenerator.PDF_DECISIONS, ReportGenerator.PDF_COLORS)
+                     if by_decision.get(decision)]
+        if not decisions:
+            return drawing
+        pie = Pie()
+        pie.x, pie.y, pie.width, pie.height = 0.5 * cm, 0.5 * cm, 5 * cm, 5 * cm
+        pie.data = [count for _, count, _ in decisions]
+        pie.labels = [f"{count}" for _, count, _ in decisions]
+        for index, (_, _, color) in enumerate(decisions):
+            pie.slices[index].fillColor = color
+        legend = Legend()
+        legend.x, legend.y = 7 * cm, 4.5 * cm
+        legend.colorNamePairs = [(color, f"{label} ({count})") for label, count, color in decisions]
+        drawing.add(pie)
+        drawing.add(legend)
+        return drawing
+    
+    @staticmethod
+    def pdf_department_chart(by_department):
+        """Barres empilées des décisions des départements ayant le plus de revues"""
+        departments = sorted(by_department.items(), key=lambda item: (-sum(item[1].values()), item[0]))
+        departments = departments[:ReportGenerator.PDF_CHART_DEPARTMENTS]
+        drawing = Drawing(24 * cm, max(len(departments), 1) * 0.6 * cm + 2 * cm)
+        if not departments:
+            return drawing
+        chart = HorizontalBarChart()
+        chart.x, chart.y = 5 * cm, 1 * cm
+        chart.width, chart.height = 17 * cm, len(departments) * 0.6 * cm
+        # Premier département en haut du graphique
+        departments.reverse()
+        chart.data = [
+            [counts.get(decision, 0) for _, counts in departments]
+            for decision, _ in ReportGenerator.PDF_DECISIONS
+        ]
+        chart.categoryAxis.categoryNames = [department[:30] for department, _ in departments]
+        chart.categoryAxis.style = 'stacked'
+        chart.categoryAxis.labels.fontSize = 7
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.labels.fontSize = 7
+        for index, color in enumerate(ReportGenerator.PDF_COLORS):
+            chart.bars[index].fillColor = color
+        drawing.add(chart)
+        return drawing
+    
+    @staticmethod
+    def write_pdf_summary(campaign, output, first_page=1):
+        """
+        Écrit la synthèse PDF d'une campagne dans le fichier `output`
+        
+        La synthèse est construite avec reportlab à partir des seuls agrégats
+        de CampaignStat: son coût ne dépend pas du nombre de revues.
+        Renvoie le nombre de pages écrites.
+        """
+        styles = ReportGenerator.pdf_styles()
+        by_decision, by_layer, by_department = ReportGenerator.pdf_summary(campaign)
+        total_reviews = sum(by_decision.values())
+        
+        story = [
+            Paragraph(f"Rapport de campagne: {escape(campaign.name)}", styles['Title']),
+            Paragraph(
+                f"Période: {campaign.start_date:%d/%m/%Y} - {campaign.end_date:%d/%m/%Y}<br/>"
+                f"Statut: {campaign.get_status_display()} - Progression: {campaign.progress}%",
+                styles['Info']
+            ),
+            Spacer(1, 0.5 * cm),
+            Paragraph("Synthèse", styles['Heading2']),
+            Paragraph(f"Cette campagne contient <b>{total_reviews}</b> revues d'accès.", styles['Normal']),
+        ]
+        
+        summary = [['Décision', 'Nombre', 'Part']] + [
+            [label, by_decision.get(decision, 0),
+             f"{by_decision.get(decision, 0) / total_reviews * 100:.1f}%" if total_reviews else '0%']
+            for decision, label in ReportGenerator.PDF_DECISIONS
+        ]
+        summary_table = Table(summary, hAlign='LEFT')
+        summary_table.setStyle(ReportGenerator.pdf_table_style())
+        story.append(Table([[summary_table, ReportGenerator.pdf_decision_chart(by_decision)]], hAlign='LEFT'))
+        
+        story.append(Paragraph("Statistiques par type de ressource", styles['Heading2']))
+        story.append(ReportGenerator.pdf_breakdown_table('Type de ressource', by_layer))
+        
+        story.append(PageBreak())
+        story.append(Paragraph("Décisions par département", styles['Heading2']))
+        story.append(ReportGenerator.pdf_department_chart(by_department))
+        story.append(ReportGenerator.pdf_breakdown_table('Département', by_department))
+        
+        document, footer = ReportGenerator.pdf_document(output, campaign, first_page)
+        document.build(story, onFirstPage=footer, onLaterPages=footer)
+        return document.page
+    
+    @staticmethod
+    def write_pdf_detail_part(campaign, rows, output, first_page, first_part):
+        """Écrit une tranche du détail des revues; renvoie le nombre de pages écrites"""
+        styles = ReportGenerator.pdf_styles()
+        decisions = dict(ReportGenerator.PDF_DECISIONS)
+        cell = styles['Cell']
+        table_rows = [['Utilisateur', 'Département', 'Ressource', 'Type', 'Profil', 'Décision', 'Réviseur', 'Date de revue']]
+        for (first_name, last_name, department, resource_name, layer, profile, decision,
+             reviewer_first_name, reviewer_last_name, reviewed_at) in rows:
+            table_rows.append([
+                Paragraph(escape(f"{first_name} {last_name}"), cell),
+                Paragraph(escape(department), cell),
+                Paragraph(escape(resource_name), cell),
+                layer,
+                profile,
+                decisions.get(decision, decision),
+                Paragraph(escape(f"{reviewer_first_name} {reviewer_last_name}"), cell),
+                reviewed_at.strftime('%d/%m/%Y %H:%M') if reviewed_at else "Non revu",
+            ])
+        table = LongTable(
+            table_rows, repeatRows=1, hAlign='LEFT',
+            colWidths=[4.2 * cm, 3.2 * cm, 5.6 * cm, 2.4 * cm, 2.2 * cm, 2 * cm, 4 * cm, 2.6 * cm]
+        )
+        table.setStyle(ReportGenerator.pdf_table_style())
+        
+        story = [Paragraph("Détail des revues", styles['Heading2'])] if first_part else []
+        story.append(table)
+        document, footer = ReportGenerator.pdf_document(output, campaign, first_page)
+        document.build(story, onFirstPage=footer, onLaterPages=footer)
+        return document.page
+    
+    @staticmethod
+    def write_pdf_report(campaign, output):
+        """
+        Écrit le rapport PDF détaillé d'une campagne dans le fichier `output`
+        
+        La synthèse puis le détail des revues sont rendus séparément avec
+        reportlab, le détail par tranches de PDF_CHUNK_SIZE revues lues par
+        un seul values_list parcouru par blocs. Chaque partie est écrite
+        dans un fichier temporaire sur disque, recopiée aussitôt dans
+        `output` par PdfPartsWriter puis fermée: la mémoire utilisée ne
+        dépend pas du nombre de revues.
+        """
+        rows = Review.objects.filter(campaign=campaign).order_by('id').values_list(
+            'access__user__first_name', 'access__user__last_name', 'access__user__department',
+            'access__resource_name', 'access__layer', 'access__profile', 'decision',
+            'reviewer__first_name', 'reviewer__last_name', 'reviewed_at'
+        ).iterator(chunk_size=ReportGenerator.PDF_CHUNK_SIZE)
+        
+        writer = PdfPartsWriter(output)
+        with tempfile.TemporaryFile() as part:
+            pages = ReportGenerator.write_pdf_summary(campaign, part)
+            part.seek(0)
+            writer.append(part)
+        
+        first = True
+        while True:
+            chunk = list(itertools.islice(rows, ReportGenerator.PDF_CHUNK_SIZE))
+            if not chunk:
+                break
+            with tempfile.TemporaryFile() as part:
+                pages += ReportGenerator.write_pdf_detail_part(campaign, chunk, part, pages + 1, first)
+                part.seek(0)
+                writer.append(part)
+            first = False
+        
+        writer.close(title=f"Rapport de campagne - {campaign.name}")
+    
+    @staticmethod
+    def write_pdf_summary_report(campaign, output):
+        """Écrit la synthèse PDF d'une campagne dans le fichier `output`"""
+        ReportGenerator.write_pdf_summary(campaign, output)
+    
+    @staticmethod
+    def generate_pdf_report(campaign_id, mode='detail'):
         """
-        Génère un rapport PDF pour une campagne
+        Génère un rapport PDF pour une campagne: synthèse seule (`summary`)
+        ou synthèse suivie du détail des revues (`detail`)
         """
         try:
             campaign = Campaign.objects.get(id=campaign_id)
+            report_format = 'pdf_summary' if mode == 'summary' else 'pdf'
             
-            # Récupérer les revues
-            reviews = Review.objects.filter(campaign=campaign).select_related('access', 'access__user', 'reviewer')
-            
-            # Calcul des statistiques
-            total_reviews = len(reviews)
-            approved = sum(1 for r in reviews if r.decision == 'approved')
-            rejected = sum(1 for r in reviews if r.decision == 'rejected')
-            pending = sum(1 for r in reviews if r.decision == 'pending')
-            
-            # Statistiques par type de ressource
-            resource_stats = {}
-            for review in reviews:
-                resource_type = review.access.resource_type
-                if resource_type not in resource_stats:
-                    resource_stats[resource_type] = {
-                        'total': 0,
-                        'approved': 0,
-                        'rejected': 0,
-                        'pending': 0
-                    }
-                resource_stats[resource_type]['total'] += 1
-                resource_stats[resource_type][review.decision] += 1
-            
-            # Préparer le contexte pour le template
-            context = {
-                'campaign': campaign,
-                'reviews': reviews,
-                'total_reviews': total_reviews,
-                'approved': approved,
-                'rejected': rejected,
-                'pending': pending,
-                'approved_percent': round(approved / total_reviews * 100, 1) if total_reviews else 0,
-                'rejected_percent': round(rejected / total_reviews * 100, 1) if total_reviews else 0,
-                'pending_percent': round(pending / total_reviews * 100, 1) if total_reviews else 0,
-                'resource_stats': resource_stats,
-                'date_generated': datetime.datetime.now().strftime('%d/%m/%Y %H:%M')
-            }
-            
-            # Rendre le template HTML
-            template = get_template('campaign_report.html')
-            html = template.render(context)
-            
-            # Créer le PDF
-            result = io.BytesIO()
-            pdf = pisa.pisaDocument(io.BytesIO(html.encode("UTF-8")), result)
-            
-            if not pdf.err:
-                # Générer la réponse HTTP
-                response = HttpResponse(result.getvalue(), content_type='application/pdf')
-                response['Content-Disposition'] = f'attachment; filename=campagne_{campaign.id}_{datetime.date.today().isoformat()}.pdf'
-                return response
+            output = tempfile.SpooledTemporaryFile(max_size=ReportGenerator.SPOOL_SIZE)
+            ReportGenerator.write_report(campaign, report_format, output)
+            output.seek(0)
             
-            return None
+            # Générer la réponse HTTP
+            return ReportGenerator.file_response(output, campaign, report_format)
         
         except Campaign.DoesNotExist:
             return None
@@ -200,49 +597,167 @@ class ReportGenerator:
             return None
     
     @staticmethod
-    def generate_csv_report(campaign_id):
+    def accepts_gzip(request):
+        """Le client accepte-t-il une réponse compressée en gzip (Accept-Encoding)"""
+        return bool(re.search(r'\bgzip\b', request.META.get('HTTP_ACCEPT_ENCODING', '')))
+    
+    @staticmethod
+    def csv_rows(campaign):
+        """
+        Lignes du rapport CSV, lues par un seul values_list parcouru par
+        blocs de CSV_CHUNK_SIZE: la mémoire ne dépend pas de la taille
+        de la campagne
+        """
+        decisions = dict(Review.DECISION_CHOICES)
+        yield [
+            'Utilisateur', 'Email', 'Département', 'Ressource', 'Type', 'Niveau d\'accès',
+            'Décision', 'Commentaire', 'Réviseur', 'Date de revue'
+        ]
+        rows = Review.objects.filter(campaign=campaign).order_by('id').values_list(
+            'access__user__first_name', 'access__user__last_name', 'access__user__email',
+            'access__user__department', 'access__resource_name', 'access__layer', 'access__profile',
+            'decision', 'comment', 'reviewer__first_name', 'reviewer__last_name', 'reviewed_at'
+        )
+        for (first_name, last_name, email, department, resource_name, layer, profile,
+             decision, comment, reviewer_first_name, reviewer_last_name, reviewed_at) in rows.iterator(
+                chunk_size=ReportGenerator.CSV_CHUNK_SIZE):
+            yield [
+                f"{first_name} {last_name}",
+                email,
+                department,
+                resource_name,
+                layer,
+                profile,
+                decisions.get(decision, decision),
+                comment,
+                f"{reviewer_first_name} {reviewer_last_name}",
+                reviewed_at.strftime('%d/%m/%Y %H:%M') if reviewed_at else "Non revu"
+            ]
+    
+    @staticmethod
+    def csv_content(campaign):
+        """Contenu CSV encodé, par blocs de CSV_CHUNK_SIZE lignes"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row_num, row in enumerate(ReportGenerator.csv_rows(campaign), 1):
+            writer.writerow(row)
+            if row_num % ReportGenerator.CSV_CHUNK_SIZE == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+    
+    @staticmethod
+    def write_csv_report(campaign, output):
+        """Écrit le rapport CSV d'une campagne dans le fichier `output`"""
+        for block in ReportGenerator.csv_content(campaign):
+            output.write(block)
+    
+    @staticmethod
+    def generate_csv_report(campaign_id, gzip=False):
         """
         Génère un rapport CSV pour une campagne
+        
+        Le fichier est envoyé au fil de la lecture des revues
+        (StreamingHttpResponse): le téléchargement commence tout de suite
+        et la mémoire reste constante. Avec gzip=True, il est compressé
+        à la volée.
+        """
+        try:
+            campaign = Campaign.objects.get(id=campaign_id)
+        except Campaign.DoesNotExist:
+            return None
+        
+        content = ReportGenerator.csv_content(campaign)
+        if gzip:
+            content = compress_sequence(content)
+        
+        # Générer la réponse HTTP
+        response = StreamingHttpResponse(content, content_type=ReportGenerator.FORMATS['csv'][0])
+        response['Content-Disposition'] = f'attachment; filename={ReportGenerator.file_name(campaign, "csv")}'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if gzip:
+            response['Content-Encoding'] = 'gzip'
+        
+        return response
+    
+    @staticmethod
+    def parquet_columns():
+        """(colonne, chemin ORM, type Arrow) de l'export Parquet"""
+        timestamp = pa.timestamp('us', tz='UTC')
+        category = pa.dictionary(pa.int32(), pa.string())
+        return (
+            ('review_id', 'id', pa.int64()),
+            ('campaign_id', 'campaign_id', pa.int64()),
+            ('access_pk', 'access_id', pa.int64()),
+            ('access_id', 'access__access_id', pa.string()),
+            ('user_pk', 'access__user_id', pa.int64()),
+            ('user_id', 'access__user__user_id', pa.string()),
+            ('user_email', 'access__user__email', pa.string()),
+            ('department', 'access__user__department', category),
+            ('resource_name', 'access__resource_name', pa.string()),
+            ('layer', 'access__layer', category),
+            ('profile', 'access__profile', category),
+            ('granted_date', 'access__granted_date', pa.date32()),
+            ('last_used', 'access__last_used', pa.date32()),
+            ('decision', 'decision', category),
+            ('comment', 'comment', pa.string()),
+            ('reviewer_pk', 'reviewer_id', pa.int64()),
+            ('reviewer_id', 'reviewer__user_id', pa.string()),
+            ('reviewed_at', 'reviewed_at', timestamp),
+            ('created_at', 'created_at', timestamp),
+            ('updated_at', 'updated_at', timestamp),
+        )
+    
+    @staticmethod
+    def write_parquet_report(campaign, output):
+        """
+        Écrit l'export Parquet d'une campagne dans le fichier `output`
+        
+        Les colonnes sont typées (identifiants entiers, dates et horodatages
+        UTC, décision, type, profil et département en catégories) et les
+        valeurs brutes, sans mise en forme. Les revues sont lues par un
+        seul values_list parcouru par blocs de PARQUET_ROW_GROUP_SIZE
+        lignes, chaque bloc étant écrit comme un row group.
+        """
+        if pq is None:
+            raise ImportError("pyarrow is required to export Parquet files")
+        
+        columns = ReportGenerator.parquet_columns()
+        schema = pa.schema([(name, arrow_type) for name, _, arrow_type in columns])
+        rows = Review.objects.filter(campaign=campaign).order_by('id').values_list(
+            *(path for _, path, _ in columns)
+        ).iterator(chunk_size=ReportGenerator.PARQUET_ROW_GROUP_SIZE)
+        
+        with pq.ParquetWriter(output, schema, compression='zstd') as writer:
+            while True:
+                chunk = list(itertools.islice(rows, ReportGenerator.PARQUET_ROW_GROUP_SIZE))
+                if not chunk:
+                    break
+                arrays = []
+                for (_, _, arrow_type), values in zip(columns, zip(*chunk)):
+                    if pa.types.is_dictionary(arrow_type):
+                        arrays.append(pa.array(values, type=arrow_type.value_type).dictionary_encode())
+                    else:
+                        arrays.append(pa.array(values, type=arrow_type))
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    
+    @staticmethod
+    def generate_parquet_report(campaign_id):
+        """
+        Génère l'export Parquet d'une campagne
         """
         try:
             campaign = Campaign.objects.get(id=campaign_id)
             
-            # Récupérer les revues
-            reviews = Review.objects.filter(campaign=campaign).select_related('access', 'access__user', 'reviewer')
-            
-            # Créer le fichier CSV en mémoire
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # En-tête
-            writer.writerow([
-                'Utilisateur', 'Email', 'Département', 'Ressource', 'Type', 'Niveau d\'accès',
-                'Décision', 'Commentaire', 'Réviseur', 'Date de revue'
-            ])
-            
-            # Contenu
-            for review in reviews:
-                writer.writerow([
-                    f"{review.access.user.first_name} {review.access.user.last_name}",
-                    review.access.user.email,
-                    review.access.user.department,
-                    review.access.resource_name,
-                    review.access.resource_type,
-                    review.access.access_level,
-                    review.get_decision_display(),
-                    review.comment,
-                    f"{review.reviewer.first_name} {review.reviewer.last_name}",
-                    review.reviewed_at.strftime('%d/%m/%Y %H:%M') if review.reviewed_at else "Non revu"
-                ])
-            
-            # Générer la réponse HTTP
-            response = HttpResponse(output.getvalue(), content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename=campagne_{campaign.id}_{datetime.date.today().isoformat()}.csv'
+            output = tempfile.SpooledTemporaryFile(max_size=ReportGenerator.SPOOL_SIZE)
+            ReportGenerator.write_parquet_report(campaign, output)
+            output.seek(0)
             
-            return response
+            return ReportGenerator.file_response(output, campaign, 'parquet')
         
         except Campaign.DoesNotExist:
             return None
         except Exception as e:
-            print(f"Error generating CSV report: {str(e)}")
-            return None
\ No newline at end of file
+            print(f"Error generating Parquet report: {str(e)}")
+            return None
@@ -1,21 +1,58 @@
+from django.db.models import Q
 from rest_framework import serializers
-from .models import Campaign, CampaignScope
+from django.urls import reverse
+from .models import Campaign, CampaignScope, ReportJob, ReviewerStat
+from users.models import User
 from users.serializers import UserSerializer
+from condaura.serializers import SparseFieldsetMixin
 
 class CampaignScopeSerializer(serializers.ModelSerializer):
     class Meta:
         model = CampaignScope
         fields = ['id', 'scope_type', 'scope_value', 'created_at']
 
-class CampaignSerializer(serializers.ModelSerializer):
+class ReviewerStatSerializer(serializers.ModelSerializer):
+    reviewer_email = serializers.EmailField(source='reviewer.email', read_only=True)
+    reviewer_name = serializers.SerializerMethodField()
+    is_late = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = ReviewerStat
+        fields = ['reviewer', 'reviewer_email', 'reviewer_name', 'pending_count', 'completed_count',
+                  'median_latency', 'p90_latency', 'last_activity', 'is_late']
+    
+    def get_reviewer_name(self, obj):
+        return f"{obj.reviewer.first_name} {obj.reviewer.last_name}"
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    is_current = serializers.BooleanField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ReportJob
+        fields = ['id', 'campaign', 'format', 'revision', 'is_current', 'status', 'file_size',
+                  'error_message', 'download_url', 'created_by', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        if obj.status != 'completed':
+            return None
+        return reverse('reportjob-download', args=[obj.id])
+
+class CampaignSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     created_by_name = serializers.SerializerMethodField()
     progress = serializers.IntegerField(read_only=True)
     
+    field_columns = {
+        'created_by_name': ('created_by__first_name', 'created_by__last_name'),
+        'progress': tuple(Campaign.DECISION_COUNTERS.values()),
+    }
+    
     class Meta:
         model = Campaign
         fields = ['id', 'name', 'description', 'start_date', 'end_date', 
                   'status', 'created_by', 'created_by_name', 'created_at', 
-                  'updated_at', 'reminder_days', 'progress']
+                  'updated_at', 'reminder_days', 'assignment_method', 'progress']
         read_only_fields = ['created_at', 'updated_at']
     
     def get_created_by_name(self, obj):
@@ -30,7 +67,7 @@ class CampaignDetailSerializer(serializers.ModelSerializer):
         model = Campaign
         fields = ['id', 'name', 'description', 'start_date', 'end_date', 
                   'status', 'created_by', 'created_at', 'updated_at', 
-                  'reminder_days', 'scopes', 'progress']
+                  'reminder_days', 'assignment_method', 'reviewers', 'scopes', 'progress']
         read_only_fields = ['created_at', 'updated_at']
 
 class CampaignCreateSerializer(serializers.ModelSerializer):
@@ -43,7 +80,14 @@ class CampaignCreateSerializer(serializers.ModelSerializer):
         required=False,
         write_only=True
     )
-    assignment_method = serializers.CharField(required=False, write_only=True)
+    assignment_method = serializers.ChoiceField(
+        choices=Campaign.ASSIGNMENT_METHOD_CHOICES,
+        required=False,
+        write_only=True
+    )
+    
+    # Méthodes qui répartissent les revues entre les réviseurs choisis
+    POOL_METHODS = ('manual', 'least_loaded')
     
     class Meta:
         model = Campaign
@@ -51,6 +95,25 @@ class CampaignCreateSerializer(serializers.ModelSerializer):
                   'status', 'reminder_days', 'department', 'layer', 
                   'profile', 'role', 'reviewers', 'assignment_method']
     
+    def validate_reviewers(self, value):
+        """Les réviseurs sont donnés par id ou par email"""
+        ids = {item for item in value if item.isdigit()}
+        emails = set(value) - ids
+        users = list(User.objects.filter(Q(id__in=ids) | Q(email__in=emails)))
+        
+        found = {str(user.id) for user in users} | {user.email for user in users}
+        unknown = [item for item in value if item not in found]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown reviewers: {', '.join(unknown)}")
+        return users
+    
+    def validate(self, attrs):
+        if attrs.get('assignment_method') in self.POOL_METHODS and not attrs.get('reviewers'):
+            raise serializers.ValidationError({
+                'reviewers': 'At least one reviewer is required for this assignment method.'
+            })
+        return attrs
+    
     def create(self, validated_data):
         # Extraire les données de scope et reviewers
         department = validated_data.pop('department', None)
@@ -58,10 +121,12 @@ class CampaignCreateSerializer(serializers.ModelSerializer):
         profile = validated_data.pop('profile', None)
         role = validated_data.pop('role', None)
         reviewers = validated_data.pop('reviewers', [])
-        assignment_method = validated_data.pop('assignment_method', 'manual')
+        assignment_method = validated_data.pop('assignment_method', 'manager')
         
         # Créer la campagne
-        campaign = Campaign.objects.create(**validated_data)
+        campaign = Campaign.objects.create(assignment_method=assignment_method, **validated_data)
+        if reviewers:
+            campaign.reviewers.set(reviewers)
         
         # Créer les scopes si présents
         scopes_to_create = []
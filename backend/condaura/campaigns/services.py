@@ -1,14 +1,139 @@
+import tempfile
+import threading
+
 from django.utils import timezone
-from django.db.models import Q, Count
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Q, Count, F, Value, CharField, DateTimeField, Exists, OuterRef
+from django.db.models.functions import Coalesce
+from django.core.files import File
+from django.utils.cache import patch_vary_headers
 from django.core.mail import send_mail
 from django.conf import settings
 from datetime import timedelta
+from collections import Counter
 
-from .models import Campaign, CampaignScope
-from access.models import Access, Review
+from .assignment import get_strategy
+from .models import Campaign, CampaignScope, CampaignSnapshot, CampaignStat, ReportJob
+from .reports import ReportGenerator
+from access.models import Access, Review, REVIEW_SEARCH_INDEX
 from users.models import User
 
 class CampaignService:
+    # Taille des lots de la création de revues en Python (repli SQLite)
+    REVIEW_BATCH_SIZE = 5000
+    
+    @staticmethod
+    def get_scope_queryset(campaign):
+        """
+        Accès couverts par le périmètre d'une campagne
+        Les périmètres sont combinés en OU; sans périmètre, tous les accès.
+        Les accès retirés par un import sync (revoked_at) n'en font pas partie.
+        """
+        access_query = Q()
+        
+        for scope in campaign.scopes.all():
+            if scope.scope_type == 'department':
+                access_query |= Q(user__department=scope.scope_value)
+            elif scope.scope_type == 'layer':
+                access_query |= Q(layer=scope.scope_value)
+            elif scope.scope_type == 'profile':
+                access_query |= Q(profile=scope.scope_value)
+            elif scope.scope_type == 'user':
+                access_query |= Q(user__email=scope.scope_value)
+            elif scope.scope_type == 'role':
+                access_query |= Q(user__role=scope.scope_value)
+        
+        return Access.objects.filter(access_query, revoked_at__isnull=True)
+    
+    @staticmethod
+    def create_reviews(campaign, accesses, set_based=None, strategy=None):
+        """
+        Crée une revue en attente pour chaque accès du queryset
+        Le réviseur est choisi par la stratégie d'attribution de la campagne
+        (par défaut le manager de l'utilisateur, à défaut le créateur:
+        COALESCE(user.manager_id, campaign.created_by_id))
+        
+        Si la stratégie fournit une expression SQL, les revues sont créées
+        dans la base par un seul INSERT ... SELECT; sous SQLite, ou si
+        l'attribution se fait en Python, par lots avec bulk_create.
+        Renvoie le nombre de revues créées.
+        """
+        if strategy is None:
+            strategy = get_strategy(campaign)
+        if set_based is None:
+            set_based = connection.vendor != 'sqlite'
+        
+        reviewer = strategy.reviewer_expression()
+        
+        if set_based and reviewer is not None:
+            now = timezone.now()
+            # Colonnes de access_review -> expression calculée par le SELECT
+            columns = {
+                'campaign': Value(campaign.id),
+                'access': F('id'),
+                'reviewer': reviewer,
+                'decision': Value('pending', output_field=CharField()),
+                'comment': Value('', output_field=CharField()),
+                'user_agent': Value('', output_field=CharField()),
+                'created_at': Value(now, output_field=DateTimeField()),
+                'updated_at': Value(now, output_field=DateTimeField()),
+            }
+            select = accesses.order_by().annotate(
+                **{f'review_{name}': expression for name, expression in columns.items()}
+            ).values_list(*(f'review_{name}' for name in columns))
+            select_sql, params = select.query.sql_with_params()
+            
+            quote = connection.ops.quote_name
+            column_names = ', '.join(quote(Review._meta.get_field(name).column) for name in columns)
+            with transaction.atomic(), connection.cursor() as cursor:
+                # L'INSERT brut contourne ReviewQuerySet: compteurs et
+                # statistiques sont calculés sur la source, avant l'insertion
+                deltas = Counter()
+                reviewer_deltas = Counter()
+                for department, layer, profile, reviewer_id, count in accesses.order_by().annotate(
+                    review_reviewer=reviewer
+                ).values_list('user__department', 'layer', 'profile', 'review_reviewer').annotate(count=Count('id')):
+                    deltas[(campaign.id, department, layer, profile, 'pending')] += count
+                    reviewer_deltas[(campaign.id, reviewer_id, 'pending', None)] += count
+                cursor.execute(
+                    f'INSERT INTO {quote(Review._meta.db_table)} ({column_names}) {select_sql}',
+                    params
+                )
+                Campaign.apply_review_deltas(deltas, {
+                    key: (count, None) for key, count in reviewer_deltas.items()
+                })
+                created = cursor.rowcount
+                REVIEW_SEARCH_INDEX.refresh(Review.objects.filter(campaign=campaign, created_at=now), created=True)
+                return created
+        
+        if reviewer is not None:
+            rows = accesses.order_by('id').annotate(review_reviewer=reviewer).values_list('id', 'review_reviewer')
+        else:
+            rows = accesses.order_by('id').values_list('id', flat=True)
+        
+        created = 0
+        batch = []
+        
+        def flush(batch):
+            if reviewer is not None:
+                access_ids, reviewer_ids = zip(*batch)
+            else:
+                access_ids, reviewer_ids = batch, strategy.assign(batch)
+            Review.objects.bulk_create([
+                Review(campaign=campaign, access_id=access_id, reviewer_id=reviewer_id, decision='pending')
+                for access_id, reviewer_id in zip(access_ids, reviewer_ids)
+            ])
+            return len(batch)
+        
+        for row in rows.iterator(chunk_size=CampaignService.REVIEW_BATCH_SIZE):
+            batch.append(row)
+            if len(batch) == CampaignService.REVIEW_BATCH_SIZE:
+                created += flush(batch)
+                batch = []
+        if batch:
+            created += flush(batch)
+        return created
+    
     @staticmethod
     def start_campaign(campaign_id):
         """
@@ -16,66 +141,128 @@ class CampaignService:
         1. Changeant son statut à 'active'
         2. Attribuant les accès à réviser aux réviseurs appropriés
         3. Créant les enregistrements de revue
+        
+        Le tout dans une seule transaction: une erreur en cours de route
+        laisse la campagne à l'état brouillon, sans revue.
         """
         try:
-            campaign = Campaign.objects.get(id=campaign_id)
-            
-            # Vérifier si la campagne peut être démarrée
-            if campaign.status != 'draft':
-                return False, "La campagne n'est pas à l'état brouillon"
-            
-            # Mise à jour du statut
-            campaign.status = 'active'
-            campaign.save()
+            with transaction.atomic():
+                campaign = Campaign.objects.select_for_update().get(id=campaign_id)
+                
+                # Vérifier si la campagne peut être démarrée
+                if campaign.status != 'draft':
+                    return False, "La campagne n'est pas à l'état brouillon"
+                
+                # Mise à jour du statut
+                campaign.status = 'active'
+                campaign.save()
+                
+                # Créer les revues des accès du périmètre
+                accesses = CampaignService.get_scope_queryset(campaign)
+                reviews_created = CampaignService.create_reviews(campaign, accesses)
+                
+                # Point de départ de la courbe d'avancement
+                CampaignSnapshot.take([campaign.id])
+                
+            return True, f"Campagne démarrée avec {reviews_created} revues créées"
             
-            # Récupérer le périmètre de la campagne
-            scopes = campaign.scopes.all()
-            
-            # Construire la requête pour les accès concernés
-            access_query = Q()
-            
-            for scope in scopes:
-                if scope.scope_type == 'department':
-                    access_query |= Q(user__department=scope.scope_value)
-                elif scope.scope_type == 'layer':
-                    access_query |= Q(layer=scope.scope_value)
-                elif scope.scope_type == 'profile':
-                    access_query |= Q(profile=scope.scope_value)
-                elif scope.scope_type == 'user':
-                    user = User.objects.filter(email=scope.scope_value).first()
-                    if user:
-                        access_query |= Q(user=user)
-                elif scope.scope_type == 'role':
-                    access_query |= Q(user__role=scope.scope_value)
-            
-            # Obtenir les accès concernés
-            accesses = Access.objects.filter(access_query)
-            
-            # Créer les revues pour chaque accès
-            reviews_to_create = []
-            
-            for access in accesses:
-                # Par défaut, on assigne au manager de l'utilisateur
-                reviewer = access.user.manager
+        except Campaign.DoesNotExist:
+            return False, "Campagne non trouvée"
+        except Exception as e:
+            return False, str(e)
+    
+    @staticmethod
+    def rescope(campaign_id, prune=False):
+        """
+        Met à jour les revues d'une campagne active après un import:
+        crée les revues des accès du périmètre qui n'en ont pas encore
+        (anti-jointure NOT EXISTS) et clôt les revues en attente des accès
+        retirés par un import sync (revoked_at). Avec `prune`, supprime
+        aussi les revues en attente dont l'accès est sorti du périmètre.
+        Les revues déjà décidées sont conservées; celles qui portent sur un
+        accès retiré sont comptées dans `reviews_revoked`.
+        
+        Relancer l'opération ne crée rien de plus: la contrainte
+        (campaign, access) garantit une revue par accès.
+        """
+        try:
+            with transaction.atomic():
+                campaign = Campaign.objects.select_for_update().get(id=campaign_id)
                 
-                # Si pas de manager, on assigne au créateur de la campagne
-                if not reviewer:
-                    reviewer = campaign.created_by
+                if campaign.status != 'active':
+                    return False, "La campagne n'est pas active"
                 
-                # Créer la revue
-                review = Review(
-                    campaign=campaign,
-                    access=access,
-                    reviewer=reviewer,
-                    decision='pending'
+                in_scope = CampaignService.get_scope_queryset(campaign)
+                missing = in_scope.filter(
+                    ~Exists(Review.objects.filter(campaign=campaign, access=OuterRef('pk')))
                 )
-                reviews_to_create.append(review)
-            
-            # Création en masse des revues
-            if reviews_to_create:
-                Review.objects.bulk_create(reviews_to_create)
+                reviews_created = CampaignService.create_reviews(campaign, missing)
                 
-            return True, f"Campagne démarrée avec {len(reviews_to_create)} revues créées"
+                pending = Review.objects.filter(campaign=campaign, decision='pending')
+                if not prune:
+                    pending = pending.filter(access__revoked_at__isnull=False)
+                reviews_removed, _ = pending.exclude(access__in=in_scope.values('pk')).delete()
+                
+                reviews_revoked = Review.objects.filter(
+                    campaign=campaign,
+                    access__revoked_at__isnull=False
+                ).count()
+                
+            return True, {
+                'reviews_created': reviews_created,
+                'reviews_removed': reviews_removed,
+                'reviews_revoked': reviews_revoked
+            }
+            
+        except Campaign.DoesNotExist:
+            return False, "Campagne non trouvée"
+        except Exception as e:
+            return False, str(e)
+    
+    @staticmethod
+    def get_scope_preview(campaign_id):
+        """
+        Aperçu du périmètre d'une campagne avant son démarrage: nombre
+        d'accès par département, layer, profile et charge de chaque
+        réviseur. Quelques GROUP BY, aucune revue n'est créée.
+        """
+        try:
+            campaign = Campaign.objects.get(id=campaign_id)
+            accesses = CampaignService.get_scope_queryset(campaign).order_by()
+            
+            totals = accesses.aggregate(
+                total_accesses=Count('id'),
+                total_users=Count('user', distinct=True)
+            )
+            
+            def group_by(field):
+                return {
+                    item[field]: item['count']
+                    for item in accesses.values(field).annotate(count=Count('id'))
+                }
+            
+            loads = get_strategy(campaign).preview(accesses)
+            reviewers = User.objects.in_bulk(loads.keys())
+            by_reviewer = [
+                {
+                    'reviewer': reviewer_id,
+                    'reviewer_email': reviewers[reviewer_id].email if reviewer_id in reviewers else None,
+                    'reviewer_name': (f"{reviewers[reviewer_id].first_name} {reviewers[reviewer_id].last_name}"
+                                      if reviewer_id in reviewers else None),
+                    'count': count
+                }
+                for reviewer_id, count in sorted(loads.items(), key=lambda item: -item[1])
+            ]
+            
+            return True, {
+                'campaign': campaign.id,
+                'assignment_method': campaign.assignment_method,
+                **totals,
+                'by_department': group_by('user__department'),
+                'by_layer': group_by('layer'),
+                'by_profile': group_by('profile'),
+                'by_reviewer': by_reviewer
+            }
             
         except Campaign.DoesNotExist:
             return False, "Campagne non trouvée"
@@ -120,41 +307,28 @@ class CampaignService:
     def get_campaign_stats(campaign_id):
         """
         Récupère les statistiques d'une campagne
+        Lues dans la table CampaignStat: O(groupes) et non O(revues)
         """
         try:
             campaign = Campaign.objects.get(id=campaign_id)
             
-            # Nombre total de revues
-            total_reviews = Review.objects.filter(campaign=campaign).count()
-            
-            # Répartition par décision
-            decision_stats = Review.objects.filter(campaign=campaign).values(
-                'decision'
-            ).annotate(count=Count('decision'))
-            
-            # Répartition par layer (anciennement resource_type)
-            layer_stats = Review.objects.filter(campaign=campaign).values(
-                'access__layer'
-            ).annotate(count=Count('access__layer'))
-            
-            # Répartition par profile (anciennement access_level)
-            profile_stats = Review.objects.filter(campaign=campaign).values(
-                'access__profile'
-            ).annotate(count=Count('access__profile'))
-            
-            # Répartition par département
-            department_stats = Review.objects.filter(campaign=campaign).values(
-                'access__user__department'
-            ).annotate(count=Count('access__user__department'))
+            # Une seule lecture des groupes, ventilée ensuite en mémoire
+            breakdowns = {dimension: {} for dimension in CampaignStat.DIMENSIONS}
+            total_reviews = 0
+            for row in campaign.stats.filter(count__gt=0).values(*CampaignStat.DIMENSIONS, 'count'):
+                total_reviews += row['count']
+                for dimension in CampaignStat.DIMENSIONS:
+                    value = row[dimension]
+                    breakdowns[dimension][value] = breakdowns[dimension].get(value, 0) + row['count']
             
             # Construire le résultat
             stats = {
                 'total_reviews': total_reviews,
                 'progress': campaign.progress,
-                'by_decision': {item['decision']: item['count'] for item in decision_stats},
-                'by_resource_type': {item['access__layer']: item['count'] for item in layer_stats},  # Garder la clé pour compatibilité API
-                'by_access_level': {item['access__profile']: item['count'] for item in profile_stats},  # Garder la clé pour compatibilité API
-                'by_department': {item['access__user__department']: item['count'] for item in department_stats}
+                'by_decision': breakdowns['decision'],
+                'by_resource_type': breakdowns['layer'],  # Garder la clé pour compatibilité API
+                'by_access_level': breakdowns['profile'],  # Garder la clé pour compatibilité API
+                'by_department': breakdowns['department']
             }
             
             return stats
@@ -164,6 +338,38 @@ class CampaignService:
         except Exception:
             return None
     
+    @staticmethod
+    def get_burndown(campaign_id, since=None):
+        """
+        Série temporelle de l'avancement d'une campagne: les instantanés
+        enregistrés (O(instantanés), quelle que soit la taille de la
+        campagne), suivis des compteurs courants
+        """
+        try:
+            campaign = Campaign.objects.get(id=campaign_id)
+            
+            snapshots = campaign.snapshots.order_by('taken_at', 'id')
+            if since is not None:
+                snapshots = snapshots.filter(taken_at__gte=since)
+            fields = list(CampaignSnapshot.COUNTERS)
+            
+            return True, {
+                'campaign': campaign.id,
+                'status': campaign.status,
+                'start_date': campaign.start_date,
+                'end_date': campaign.end_date,
+                'points': list(snapshots.values('taken_at', *fields)),
+                'current': {
+                    'taken_at': timezone.now(),
+                    **{field: getattr(campaign, counter) for field, counter in CampaignSnapshot.COUNTERS.items()}
+                }
+            }
+            
+        except Campaign.DoesNotExist:
+            return False, "Campagne non trouvée"
+        except Exception as e:
+            return False, str(e)
+    
     @staticmethod
     def send_reminders(campaign_id=None):
         """
@@ -227,4 +433,180 @@ class CampaignService:
             return True, f"{reminders_sent} rappels envoyés"
             
         except Exception as e:
-            return False, str(e) 
\ No newline at end of file
+            return False, str(e) 
+
+class ReportJobService:
+    @staticmethod
+    def get_or_queue(campaign, report_format, user=None):
+        """
+        Rapport de la campagne pour sa révision actuelle: le job existant
+        (terminé, en cours ou en attente), sinon un nouveau job en file
+        d'attente, lancé après le commit de la transaction courante.
+        Un job en échec, ou en cours depuis plus de REPORT_JOB_TIMEOUT
+        secondes, est remis en file.
+        """
+        job = ReportJob.objects.filter(campaign=campaign, format=report_format, revision=campaign.revision).first()
+        if job is not None and job.status == 'completed' and not (job.file and job.file.storage.exists(job.file.name)):
+            # Fichier évincé ou supprimé: le rapport est regénéré
+            job.status = 'failed'
+        if job is not None and job.status == 'running' and ReportJobService.requeue_stale(ReportJob.objects.filter(id=job.id)):
+            # Worker disparu: le job est relancé
+            job.status = 'queued'
+            job.started_at = None
+            transaction.on_commit(lambda: ReportJobService.dispatch(job.id))
+            return job
+        
+        if job is None:
+            try:
+                with transaction.atomic():
+                    job = ReportJob.objects.create(
+                        campaign=campaign,
+                        format=report_format,
+                        revision=campaign.revision,
+                        created_by=user
+                    )
+            except IntegrityError:
+                # Créé entre-temps par une autre requête
+                return ReportJob.objects.get(campaign=campaign, format=report_format, revision=campaign.revision)
+        elif job.status == 'failed':
+            job.status = 'queued'
+            job.error_message = ''
+            job.started_at = job.finished_at = None
+            job.save(update_fields=['status', 'error_message', 'started_at', 'finished_at'])
+        else:
+            return job
+        
+        transaction.on_commit(lambda: ReportJobService.dispatch(job.id))
+        return job
+    
+    @staticmethod
+    def dispatch(job_id):
+        """
+        Lance le job dans un thread du processus courant si
+        REPORT_JOBS_RUN_IN_PROCESS est actif; sinon il reste en file
+        pour la commande process_report_jobs.
+        """
+        if not getattr(settings, 'REPORT_JOBS_RUN_IN_PROCESS', True):
+            return
+        thread = threading.Thread(target=ReportJobService._run_in_thread, args=(job_id,), daemon=True)
+        thread.start()
+    
+    @staticmethod
+    def _run_in_thread(job_id):
+        try:
+            ReportJobService.run_job(job_id)
+        finally:
+            connections.close_all()
+    
+    @staticmethod
+    def requeue_stale(jobs=None):
+        """
+        Remet en file les jobs 'running' depuis plus de REPORT_JOB_TIMEOUT
+        secondes: le thread ou le worker qui les exécutait a disparu, et la
+        contrainte d'unicité par révision empêche d'en créer un autre.
+        Renvoie le nombre de jobs remis en file.
+        """
+        cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'REPORT_JOB_TIMEOUT', 30 * 60))
+        jobs = ReportJob.objects.all() if jobs is None else jobs
+        return jobs.filter(status='running', started_at__lt=cutoff).update(status='queued', started_at=None)
+    
+    @staticmethod
+    def claim(job_id):
+        """Passe le job à 'running' si personne ne l'a déjà pris"""
+        return ReportJob.objects.filter(id=job_id, status='queued').update(
+            status='running',
+            started_at=timezone.now()
+        ) == 1
+    
+    @staticmethod
+    def run_job(job_id):
+        """
+        Génère le rapport d'un job en file d'attente dans un fichier
+        temporaire, puis l'enregistre dans le stockage (MEDIA_ROOT).
+        Les artefacts périmés sont ensuite évincés.
+        """
+        if not ReportJobService.claim(job_id):
+            return None
+        
+        job = ReportJob.objects.select_related('campaign').get(id=job_id)
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=ReportGenerator.SPOOL_SIZE) as output:
+                ReportGenerator.write_report(job.campaign, job.format, output)
+                job.file_size = output.tell()
+                output.seek(0)
+                job.file.save(ReportGenerator.file_name(job.campaign, job.format), File(output), save=False)
+            job.status = 'completed'
+        except Exception as e:
+            job.status = 'failed'
+            job.error_message = str(e)
+        
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'file', 'file_size', 'error_message', 'finished_at'])
+        
+        ReportJobService.evict()
+        return job
+    
+    @staticmethod
+    def process_queued(limit=None):
+        """Exécute les jobs en attente, du plus ancien au plus récent"""
+        ReportJobService.requeue_stale()
+        job_ids = ReportJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True)
+        if limit:
+            job_ids = job_ids[:limit]
+        
+        processed = 0
+        for job_id in list(job_ids):
+            if ReportJobService.run_job(job_id):
+                processed += 1
+        return processed
+    
+    @staticmethod
+    def serve(job, request=None):
+        """
+        Réponse HTTP envoyant le fichier d'un job terminé; le CSV est
+        compressé à la volée si la requête accepte gzip
+        """
+        ReportJob.objects.filter(id=job.id).update(last_accessed_at=timezone.now())
+        if job.format != 'csv':
+            return ReportGenerator.file_response(job.file.open('rb'), job.campaign, job.format)
+        
+        gzip = request is not None and ReportGenerator.accepts_gzip(request)
+        response = ReportGenerator.file_response(job.file.open('rb'), job.campaign, job.format, gzip=gzip)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+    
+    @staticmethod
+    def evict(max_bytes=None, max_age=None):
+        """
+        Supprime les artefacts périmés: ceux d'une révision dépassée de leur
+        campagne, ceux qui n'ont pas servi depuis REPORT_CACHE_MAX_AGE
+        secondes, puis les moins récemment servis tant que le total dépasse
+        REPORT_CACHE_MAX_BYTES octets. Renvoie le nombre d'artefacts supprimés.
+        """
+        if max_bytes is None:
+            max_bytes = getattr(settings, 'REPORT_CACHE_MAX_BYTES', 500 * 1024 * 1024)
+        if max_age is None:
+            max_age = getattr(settings, 'REPORT_CACHE_MAX_AGE', 7 * 86400)
+        
+        finished = ReportJob.objects.filter(status__in=['completed', 'failed'])
+        last_used = Coalesce('last_accessed_at', 'finished_at')
+        expired = finished.annotate(last_used=last_used).filter(
+            Q(revision__lt=F('campaign__revision')) | Q(last_used__lt=timezone.now() - timedelta(seconds=max_age))
+        )
+        evicted = list(expired)
+        
+        # Artefacts restants, du plus récemment servi au plus ancien
+        total = 0
+        expired_ids = {job.id for job in evicted}
+        for job in finished.exclude(id__in=expired_ids).annotate(last_used=last_used).order_by(
+            F('last_used').desc(nulls_last=True), '-id'
+        ).only('id', 'file', 'file_size'):
+            total += job.file_size
+            if total > max_bytes:
+                evicted.append(job)
+        
+        for job in evicted:
+            if job.file:
+                job.file.delete(save=False)
+        ReportJob.objects.filter(id__in=[job.id for job in evicted]).delete()
+        return len(evicted)
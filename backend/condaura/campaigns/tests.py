@@ -1,14 +1,30 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
+from django.db.models import Count, F
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+import csv
 import datetime
+import gzip
+import io
+import shutil
+import tempfile
+from unittest import mock
+import openpyxl
+from pypdf import PdfReader
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from .models import Campaign, CampaignScope
-from .services import CampaignService
-from access.models import Access, Review
+from .models import Campaign, CampaignScope, CampaignSnapshot, CampaignStat, ReportJob, ReviewerStat
+from .reports import ReportGenerator
+from .services import CampaignService, ReportJobService
+from access.models import Access, Review, ResourceOwner, REVIEW_SEARCH_INDEX
 
 User = get_user_model()
 
@@ -411,3 +427,1488 @@ class CampaignAPITests(TestCase):
         
         # Vérifier que des revues ont été créées
         self.assertTrue(Review.objects.filter(campaign=campaign).exists())
+
+class CampaignStartTests(TestCase):
+    """Tests pour la création des revues au démarrage d'une campagne"""
+    
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        self.manager = User.objects.create_user(
+            username='manager@example.com',
+            email='manager@example.com',
+            password='password123',
+            user_id='MANAGER001',
+            department='IT'
+        )
+        
+        self.user1 = User.objects.create_user(
+            username='user1@example.com',
+            email='user1@example.com',
+            password='password123',
+            user_id='USER001',
+            department='IT',
+            manager=self.manager
+        )
+        
+        self.user2 = User.objects.create_user(
+            username='user2@example.com',
+            email='user2@example.com',
+            password='password123',
+            user_id='USER002',
+            department='Finance'
+        )
+        
+        self.campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            status='draft',
+            created_by=self.admin
+        )
+        
+        CampaignScope.objects.create(campaign=self.campaign, scope_type='department', scope_value='IT')
+        CampaignScope.objects.create(campaign=self.campaign, scope_type='layer', scope_value='Database')
+        
+        self.accesses = [
+            Access.objects.create(
+                access_id=access_id,
+                user=user,
+                resource_name=f'Resource {access_id}',
+                layer=layer,
+                profile='Read',
+                granted_date=timezone.now().date()
+            )
+            for access_id, user, layer in [
+                ('ACCESS001', self.user1, 'Application'),
+                ('ACCESS002', self.manager, 'Application'),
+                ('ACCESS003', self.user2, 'Database'),
+                ('ACCESS004', self.user2, 'Application'),
+            ]
+        ]
+    
+    def assert_reviews_created(self):
+        reviews = dict(
+            Review.objects.filter(campaign=self.campaign).values_list('access__access_id', 'reviewer__user_id')
+        )
+        # Réviseur: le manager de l'utilisateur, sinon le créateur de la campagne
+        self.assertEqual(reviews, {
+            'ACCESS001': 'MANAGER001',
+            'ACCESS002': 'ADMIN001',
+            'ACCESS003': 'ADMIN001',
+        })
+        self.assertFalse(Review.objects.filter(campaign=self.campaign).exclude(decision='pending').exists())
+    
+    def test_get_scope_queryset(self):
+        """Test que les périmètres sont combinés en OU"""
+        accesses = CampaignService.get_scope_queryset(self.campaign)
+        
+        self.assertEqual(
+            sorted(accesses.values_list('access_id', flat=True)),
+            ['ACCESS001', 'ACCESS002', 'ACCESS003']
+        )
+    
+    def test_create_reviews_set_based(self):
+        """Test la création des revues par INSERT ... SELECT"""
+        accesses = CampaignService.get_scope_queryset(self.campaign)
+        
+        # savepoint, groupes de la source, INSERT ... SELECT, compteur,
+        # lecture et création des groupes de statistiques, lecture et
+        # création des statistiques par réviseur, index de recherche,
+        # savepoint
+        with self.assertNumQueries(10):
+            created = CampaignService.create_reviews(self.campaign, accesses, set_based=True)
+        
+        self.assertEqual(created, 3)
+        self.assert_reviews_created()
+    
+    def test_create_reviews_in_batches(self):
+        """Test la création des revues par lots avec bulk_create"""
+        accesses = CampaignService.get_scope_queryset(self.campaign)
+        
+        with mock.patch.object(CampaignService, 'REVIEW_BATCH_SIZE', 2):
+            created = CampaignService.create_reviews(self.campaign, accesses, set_based=False)
+        
+        self.assertEqual(created, 3)
+        self.assert_reviews_created()
+    
+    def test_start_campaign(self):
+        """Test le démarrage d'une campagne"""
+        success, message = CampaignService.start_campaign(self.campaign.id)
+        
+        self.assertTrue(success)
+        self.assertIn('3 revues', message)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'active')
+        self.assert_reviews_created()
+    
+    def test_start_campaign_is_atomic(self):
+        """Test qu'un échec pendant la création des revues annule le démarrage"""
+        with mock.patch.object(CampaignService, 'create_reviews', side_effect=RuntimeError('boom')):
+            success, message = CampaignService.start_campaign(self.campaign.id)
+        
+        self.assertFalse(success)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'draft')
+    
+    def test_start_campaign_twice(self):
+        """Test qu'une campagne déjà démarrée ne l'est pas une seconde fois"""
+        CampaignService.start_campaign(self.campaign.id)
+        
+        success, message = CampaignService.start_campaign(self.campaign.id)
+        
+        self.assertFalse(success)
+        self.assertEqual(Review.objects.filter(campaign=self.campaign).count(), 3)
+
+class CampaignAssignmentTests(TestCase):
+    """Tests pour les stratégies d'attribution des revues"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        self.manager = User.objects.create_user(
+            username='manager@example.com',
+            email='manager@example.com',
+            password='password123',
+            user_id='MANAGER001'
+        )
+        
+        self.reviewer1 = User.objects.create_user(
+            username='reviewer1@example.com',
+            email='reviewer1@example.com',
+            password='password123',
+            user_id='REVIEWER001'
+        )
+        
+        self.reviewer2 = User.objects.create_user(
+            username='reviewer2@example.com',
+            email='reviewer2@example.com',
+            password='password123',
+            user_id='REVIEWER002'
+        )
+        
+        self.user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            user_id='USER001',
+            department='IT',
+            manager=self.manager
+        )
+        
+        for i in range(6):
+            Access.objects.create(
+                access_id=f'ACCESS{i:03d}',
+                user=self.user,
+                resource_name='ERP' if i < 2 else 'CRM',
+                layer='Application',
+                profile='Read',
+                granted_date=timezone.now().date()
+            )
+        
+        self.client.force_authenticate(user=self.admin)
+    
+    def create_campaign(self, assignment_method, reviewers=()):
+        campaign = Campaign.objects.create(
+            name=f'Campaign {assignment_method}',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            created_by=self.admin,
+            assignment_method=assignment_method
+        )
+        campaign.reviewers.set(reviewers)
+        CampaignScope.objects.create(campaign=campaign, scope_type='department', scope_value='IT')
+        return campaign
+    
+    def reviewer_counts(self, campaign):
+        return dict(
+            Review.objects.filter(campaign=campaign)
+            .values_list('reviewer__user_id')
+            .annotate(count=Count('id'))
+        )
+    
+    def test_manager_assignment(self):
+        """Test l'attribution au manager de l'utilisateur"""
+        campaign = self.create_campaign('manager')
+        
+        success, message = CampaignService.start_campaign(campaign.id)
+        
+        self.assertTrue(success)
+        self.assertEqual(self.reviewer_counts(campaign), {'MANAGER001': 6})
+    
+    def test_round_robin_assignment(self):
+        """Test la répartition à tour de rôle entre les réviseurs choisis"""
+        campaign = self.create_campaign('manual', [self.reviewer1, self.reviewer2])
+        
+        with mock.patch.object(CampaignService, 'REVIEW_BATCH_SIZE', 4):
+            success, message = CampaignService.start_campaign(campaign.id)
+        
+        self.assertTrue(success)
+        self.assertEqual(self.reviewer_counts(campaign), {'REVIEWER001': 3, 'REVIEWER002': 3})
+    
+    def test_least_loaded_assignment(self):
+        """Test la répartition selon les revues déjà en attente"""
+        busy = self.create_campaign('manual', [self.reviewer1])
+        CampaignService.start_campaign(busy.id)
+        campaign = self.create_campaign('least_loaded', [self.reviewer1, self.reviewer2])
+        
+        success, message = CampaignService.start_campaign(campaign.id)
+        
+        # reviewer1 a déjà 6 revues en attente: tout va à reviewer2
+        self.assertTrue(success)
+        self.assertEqual(self.reviewer_counts(campaign), {'REVIEWER002': 6})
+    
+    def test_resource_owner_assignment(self):
+        """Test l'attribution au propriétaire de la ressource, sinon au manager"""
+        ResourceOwner.objects.create(resource_name='ERP', owner=self.reviewer1)
+        campaign = self.create_campaign('resource_owner')
+        
+        for set_based in (True, False):
+            Review.objects.filter(campaign=campaign).delete()
+            CampaignService.create_reviews(campaign, CampaignService.get_scope_queryset(campaign), set_based=set_based)
+            self.assertEqual(self.reviewer_counts(campaign), {'REVIEWER001': 2, 'MANAGER001': 4})
+    
+    def test_pool_assignment_requires_reviewers(self):
+        """Test qu'une méthode par réviseurs échoue sans réviseur"""
+        campaign = self.create_campaign('least_loaded')
+        
+        success, message = CampaignService.start_campaign(campaign.id)
+        
+        self.assertFalse(success)
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, 'draft')
+    
+    def test_create_campaign_persists_assignment(self):
+        """Test que l'API enregistre la méthode d'attribution et les réviseurs"""
+        data = {
+            'name': 'API Campaign',
+            'start_date': timezone.now().isoformat(),
+            'end_date': (timezone.now() + datetime.timedelta(days=7)).isoformat(),
+            'department': 'IT',
+            'assignment_method': 'manual',
+            'reviewers': [str(self.reviewer1.id), 'reviewer2@example.com'],
+        }
+        
+        response = self.client.post('/api/campaigns/', data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        campaign = Campaign.objects.get(name='API Campaign')
+        self.assertEqual(campaign.assignment_method, 'manual')
+        self.assertEqual(set(campaign.reviewers.all()), {self.reviewer1, self.reviewer2})
+        
+        data['reviewers'] = []
+        response = self.client.post('/api/campaigns/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_scope_preview(self):
+        """Test l'aperçu du périmètre sans création de revues"""
+        other = User.objects.create_user(
+            username='other@example.com',
+            email='other@example.com',
+            password='password123',
+            user_id='USER002',
+            department='IT'
+        )
+        Access.objects.create(
+            access_id='ACCESS100',
+            user=other,
+            resource_name='CRM',
+            layer='Database',
+            profile='Write',
+            granted_date=timezone.now().date()
+        )
+        campaign = self.create_campaign('manager')
+        
+        response = self.client.get(f'/api/campaigns/{campaign.id}/scope_preview/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_accesses'], 7)
+        self.assertEqual(response.data['total_users'], 2)
+        self.assertEqual(response.data['by_department'], {'IT': 7})
+        self.assertEqual(response.data['by_layer'], {'Application': 6, 'Database': 1})
+        self.assertEqual(response.data['by_profile'], {'Read': 6, 'Write': 1})
+        self.assertEqual(
+            [(item['reviewer_email'], item['count']) for item in response.data['by_reviewer']],
+            [('manager@example.com', 6), ('admin@example.com', 1)]
+        )
+        self.assertFalse(Review.objects.filter(campaign=campaign).exists())
+    
+    def test_scope_preview_unknown_campaign(self):
+        """Test l'aperçu du périmètre d'une campagne inexistante"""
+        response = self.client.get('/api/campaigns/99999/scope_preview/')
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_scope_preview_matches_pool_assignment(self):
+        """Test que l'aperçu des méthodes par réviseurs correspond au démarrage"""
+        busy = self.create_campaign('manual', [self.reviewer1])
+        CampaignService.start_campaign(busy.id)
+        approved = Review.objects.filter(campaign=busy).values_list('id', flat=True)[:4]
+        Review.objects.filter(id__in=list(approved)).update(decision='approved')
+        
+        for method in ('manual', 'least_loaded'):
+            campaign = self.create_campaign(method, [self.reviewer1, self.reviewer2])
+            
+            success, preview = CampaignService.get_scope_preview(campaign.id)
+            CampaignService.start_campaign(campaign.id)
+            
+            self.assertTrue(success)
+            self.assertEqual(
+                {item['reviewer']: item['count'] for item in preview['by_reviewer']},
+                dict(Review.objects.filter(campaign=campaign).values_list('reviewer').annotate(count=Count('id')))
+            )
+    
+    def test_rescope_creates_missing_reviews_only(self):
+        """Test que le re-périmétrage ne crée que les revues manquantes"""
+        campaign = self.create_campaign('manager')
+        CampaignService.start_campaign(campaign.id)
+        Access.objects.create(
+            access_id='ACCESS100',
+            user=self.user,
+            resource_name='CRM',
+            layer='Database',
+            profile='Write',
+            granted_date=timezone.now().date()
+        )
+        
+        response = self.client.post(f'/api/campaigns/{campaign.id}/rescope/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'reviews_created': 1, 'reviews_removed': 0, 'reviews_revoked': 0})
+        self.assertEqual(Review.objects.filter(campaign=campaign).count(), 7)
+        
+        # Une seconde exécution ne crée rien
+        success, result = CampaignService.rescope(campaign.id)
+        self.assertTrue(success)
+        self.assertEqual(result['reviews_created'], 0)
+        self.assertEqual(Review.objects.filter(campaign=campaign).count(), 7)
+    
+    def test_rescope_prunes_pending_reviews_out_of_scope(self):
+        """Test la suppression des revues en attente sorties du périmètre"""
+        campaign = self.create_campaign('manager')
+        CampaignService.start_campaign(campaign.id)
+        Review.objects.filter(campaign=campaign, access__access_id='ACCESS000').update(decision='approved')
+        self.user.department = 'Finance'
+        self.user.save()
+        
+        success, result = CampaignService.rescope(campaign.id, prune=True)
+        
+        self.assertTrue(success)
+        self.assertEqual(result, {'reviews_created': 0, 'reviews_removed': 5, 'reviews_revoked': 0})
+        self.assertEqual(
+            list(Review.objects.filter(campaign=campaign).values_list('access__access_id', flat=True)),
+            ['ACCESS000']
+        )
+    
+    def test_rescope_closes_reviews_of_revoked_accesses(self):
+        """Test que les revues en attente des accès retirés sont closes, les décidées signalées"""
+        campaign = self.create_campaign('manager')
+        CampaignService.start_campaign(campaign.id)
+        Review.objects.filter(campaign=campaign, access__access_id='ACCESS000').update(decision='approved')
+        Access.objects.filter(access_id__in=['ACCESS000', 'ACCESS001']).update(revoked_at=timezone.now())
+        
+        response = self.client.post(f'/api/campaigns/{campaign.id}/rescope/', {'prune': 'false'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'reviews_created': 0, 'reviews_removed': 1, 'reviews_revoked': 1})
+        self.assertEqual(Review.objects.filter(campaign=campaign).count(), 5)
+        self.assertTrue(Review.objects.filter(campaign=campaign, access__access_id='ACCESS000').exists())
+    
+    def test_rescope_requires_active_campaign(self):
+        """Test qu'une campagne brouillon ne peut pas être re-périmétrée"""
+        campaign = self.create_campaign('manager')
+        
+        success, message = CampaignService.rescope(campaign.id)
+        
+        self.assertFalse(success)
+        self.assertFalse(Review.objects.filter(campaign=campaign).exists())
+
+class CampaignCounterTests(TestCase):
+    """Tests pour les compteurs de décision des campagnes"""
+    
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        self.user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            user_id='USER001',
+            department='IT'
+        )
+        
+        self.campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            created_by=self.admin
+        )
+        CampaignScope.objects.create(campaign=self.campaign, scope_type='department', scope_value='IT')
+        
+        for i in range(4):
+            Access.objects.create(
+                access_id=f'ACCESS{i:03d}',
+                user=self.user,
+                resource_name=f'Resource {i}',
+                layer='Application',
+                profile='Read',
+                granted_date=timezone.now().date()
+            )
+        
+        CampaignService.start_campaign(self.campaign.id)
+    
+    def assert_counters(self, **expected):
+        self.campaign.refresh_from_db()
+        counters = {
+            decision: getattr(self.campaign, field)
+            for decision, field in Campaign.DECISION_COUNTERS.items()
+        }
+        self.assertEqual(counters, {**dict.fromkeys(Campaign.DECISION_COUNTERS, 0), **expected})
+        self.assertEqual(Campaign.reconcile_counters([self.campaign.id]), 0)
+        
+        # La table de statistiques tenue à jour égale une reconstruction
+        def stat_groups():
+            return set(self.campaign.stats.filter(count__gt=0).values_list(*CampaignStat.DIMENSIONS, 'count'))
+        maintained = stat_groups()
+        CampaignStat.rebuild([self.campaign.id])
+        self.assertEqual(maintained, stat_groups())
+        self.assertEqual(CampaignStat.breakdown('decision', campaign=self.campaign), {
+            decision: count for decision, count in expected.items() if count
+        })
+        
+        # De même pour les statistiques par réviseur
+        def reviewer_stats():
+            return {
+                (stat.reviewer_id, stat.pending_count, stat.completed_count, tuple(stat.latency_histogram))
+                for stat in self.campaign.reviewer_stats.all()
+                if stat.pending_count or stat.completed_count
+            }
+        maintained = reviewer_stats()
+        ReviewerStat.rebuild([self.campaign.id])
+        self.assertEqual(maintained, reviewer_stats())
+    
+    def test_counters_follow_review_writes(self):
+        """Test les compteurs après création, décisions et suppressions"""
+        self.assert_counters(pending=4)
+        
+        review = Review.objects.filter(campaign=self.campaign).first()
+        review.decision = 'rejected'
+        review.save()
+        self.assert_counters(pending=3, rejected=1)
+        
+        Review.objects.filter(campaign=self.campaign, decision='pending').update(decision='approved')
+        self.assert_counters(approved=3, rejected=1)
+        
+        review.delete()
+        self.assert_counters(approved=3)
+        
+        Access.objects.filter(access_id='ACCESS001').delete()
+        self.assert_counters(approved=2)
+        
+        # Changement d'accès: les statistiques suivent le layer du nouvel accès
+        database = Access.objects.create(
+            access_id='ACCESS100',
+            user=self.user,
+            resource_name='Database',
+            layer='Database',
+            profile='Admin',
+            granted_date=timezone.now().date()
+        )
+        moved = Review.objects.filter(campaign=self.campaign).first()
+        moved.access = database
+        moved.save()
+        self.assert_counters(approved=2)
+        self.assertEqual(CampaignStat.breakdown('layer', campaign=self.campaign), {'Application': 1, 'Database': 1})
+        
+        Review.objects.filter(campaign=self.campaign).delete()
+        self.assert_counters()
+    
+    def test_review_save_query_count(self):
+        """Test qu'une décision unitaire lit l'état de la revue une fois, sans recompte"""
+        review = Review.objects.filter(campaign=self.campaign).first()
+        review.decision = 'approved'
+        review.reviewed_at = timezone.now()
+        
+        # savepoint/release, verrou, état avant, UPDATE, compteurs de la
+        # campagne, lecture et bulk_update par table de statistiques, et
+        # création de la ligne 'approved' de CampaignStat
+        with self.assertNumQueries(11):
+            review.save(update_fields=['decision', 'reviewed_at'])
+        self.assert_counters(pending=3, approved=1)
+        
+        # Réviseur changé en mémoire mais non écrit: ignoré par les statistiques
+        review.decision = 'rejected'
+        review.reviewer = self.admin
+        review.save(update_fields=['decision'])
+        self.assert_counters(pending=3, rejected=1)
+    
+    def test_department_change_moves_stats_without_recount(self):
+        """Test qu'un changement de département déplace les comptes sans les recompter"""
+        self.user.department = 'Finance'
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save()
+        rollup_reads = [query['sql'] for query in queries if 'COUNT("access_review"."id")' in query['sql']]
+        self.assertEqual(len(rollup_reads), 1)
+        # Lecture des champs modifiés, savepoint/release, verrou, comptes
+        # groupés avant écriture, UPDATE de l'utilisateur, révision, 3
+        # requêtes de CampaignStat, réindexation des accès et des revues,
+        # révision des campagnes du réviseur
+        self.assertEqual(len(queries), 15)
+        self.assert_counters(pending=4)
+        self.assertEqual(CampaignStat.breakdown('department', campaign=self.campaign), {'Finance': 4})
+    
+    def test_stats_follow_access_and_user_changes(self):
+        """Test que les statistiques suivent le layer, le profile et le département"""
+        access = Access.objects.get(access_id='ACCESS000')
+        access.layer = 'Database'
+        access.save()
+        Access.objects.filter(access_id='ACCESS001').update(profile='Admin')
+        moved = Access.objects.get(access_id='ACCESS002')
+        moved.profile = 'Write'
+        Access.objects.bulk_update([moved], ['profile'])
+        self.user.department = 'Finance'
+        self.user.save()
+        self.assert_counters(pending=4)
+        
+        Review.objects.filter(campaign=self.campaign).update(decision='approved')
+        self.assert_counters(approved=4)
+        
+        stats = CampaignService.get_campaign_stats(self.campaign.id)
+        self.assertEqual(stats['total_reviews'], 4)
+        self.assertEqual(stats['by_decision'], {'approved': 4})
+        self.assertEqual(stats['by_resource_type'], {'Application': 3, 'Database': 1})
+        self.assertEqual(stats['by_access_level'], {'Admin': 1, 'Read': 2, 'Write': 1})
+        self.assertEqual(stats['by_department'], {'Finance': 4})
+    
+    def test_counters_follow_cascade_deletes(self):
+        """Test les compteurs après suppression d'un utilisateur ou d'un réviseur"""
+        other = User.objects.create_user(
+            username='other@example.com',
+            email='other@example.com',
+            password='password123',
+            user_id='USER002',
+            department='IT'
+        )
+        reviewer = User.objects.create_user(
+            username='reviewer@example.com',
+            email='reviewer@example.com',
+            password='password123',
+            user_id='REVIEWER001'
+        )
+        access = Access.objects.create(
+            access_id='ACCESS100',
+            user=other,
+            resource_name='Other',
+            layer='Database',
+            profile='Read',
+            granted_date=timezone.now().date()
+        )
+        review = Review.objects.create(campaign=self.campaign, access=access, reviewer=reviewer)
+        self.assert_counters(pending=5)
+        
+        # Cascade depuis le titulaire des accès
+        self.user.delete()
+        self.assert_counters(pending=1)
+        self.assertEqual(list(Review.objects.values_list('id', flat=True)), [review.id])
+        self.assertEqual(REVIEW_SEARCH_INDEX.filter(Review.objects.all(), 'Resource').count(), 0)
+        
+        # Cascade depuis le réviseur, par un delete() de queryset
+        User.objects.filter(pk=reviewer.pk).delete()
+        self.assert_counters()
+        self.assertTrue(Access.objects.filter(pk=access.pk).exists())
+    
+    def test_progress_reads_counters(self):
+        """Test que la progression ne fait aucune requête"""
+        review_ids = Review.objects.filter(campaign=self.campaign).values_list('id', flat=True)[:1]
+        Review.objects.filter(id__in=list(review_ids)).update(decision='approved')
+        campaign = Campaign.objects.get(id=self.campaign.id)
+        
+        with self.assertNumQueries(0):
+            self.assertEqual(campaign.progress, 25)
+    
+    def test_stale_campaign_save_keeps_counters(self):
+        """Test qu'une campagne chargée avant une décision n'écrase pas les compteurs"""
+        stale = Campaign.objects.get(id=self.campaign.id)
+        Review.objects.filter(campaign=self.campaign).update(decision='approved')
+        
+        stale.name = 'Renamed'
+        stale.save()
+        
+        self.assert_counters(approved=4)
+    
+    def test_reconcile_command_repairs_drift(self):
+        """Test la commande de réconciliation"""
+        Campaign.objects.filter(id=self.campaign.id).update(pending_count=99)
+        out = io.StringIO()
+        
+        call_command('reconcile_campaign_counters', campaign=[self.campaign.id], stdout=out)
+        
+        self.assertIn('1 campagne', out.getvalue())
+        self.assert_counters(pending=4)
+    
+    def test_campaign_stats_read_rollup(self):
+        """Test que les statistiques de campagne ne lisent que la table CampaignStat"""
+        review_ids = Review.objects.filter(campaign=self.campaign).values_list('id', flat=True)[:1]
+        Review.objects.filter(id__in=list(review_ids)).update(decision='approved')
+        
+        # campagne, groupes de statistiques
+        with self.assertNumQueries(2):
+            stats = CampaignService.get_campaign_stats(self.campaign.id)
+        
+        self.assertEqual(stats['total_reviews'], 4)
+        self.assertEqual(stats['progress'], 25)
+        self.assertEqual(stats['by_decision'], {'approved': 1, 'pending': 3})
+        self.assertEqual(stats['by_resource_type'], {'Application': 4})
+        self.assertEqual(stats['by_access_level'], {'Read': 4})
+        self.assertEqual(stats['by_department'], {'IT': 4})
+    
+    def test_rebuild_command(self):
+        """Test la reconstruction de la table de statistiques"""
+        CampaignStat.objects.all().delete()
+        out = io.StringIO()
+        
+        call_command('rebuild_campaign_stats', stdout=out)
+        
+        self.assertIn('1 groupe', out.getvalue())
+        self.assertEqual(CampaignStat.breakdown('decision', campaign=self.campaign), {'pending': 4})
+
+class CampaignDashboardTests(TestCase):
+    """Tests pour le tableau de bord"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        self.reviewer = User.objects.create_user(
+            username='reviewer@example.com',
+            email='reviewer@example.com',
+            password='password123',
+            user_id='REVIEWER001'
+        )
+        
+        user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            user_id='USER001',
+            department='IT',
+            manager=self.reviewer
+        )
+        
+        self.campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            created_by=self.admin
+        )
+        Campaign.objects.create(
+            name='Draft Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            created_by=self.admin
+        )
+        
+        for i in range(3):
+            Access.objects.create(
+                access_id=f'ACCESS{i:03d}',
+                user=user,
+                resource_name=f'Resource {i}',
+                layer='Application',
+                profile='Read',
+                granted_date=timezone.now().date()
+            )
+        
+        CampaignService.start_campaign(self.campaign.id)
+        review = Review.objects.filter(campaign=self.campaign).first()
+        review.decision = 'rejected'
+        review.save()
+    
+    def get_dashboard(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.get('/api/campaigns/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+    
+    def test_dashboard_counts(self):
+        """Test les statistiques pour un administrateur et pour un réviseur"""
+        # Administrateur: campagnes et table de statistiques, une requête chacune
+        self.client.force_authenticate(user=self.admin)
+        with self.assertNumQueries(2):
+            data = self.client.get('/api/campaigns/dashboard/').data
+        
+        self.assertEqual(data['campaign_stats'], {'total': 2, 'active': 1, 'completed': 0, 'draft': 1})
+        self.assertEqual(data['review_stats'], {'total': 3, 'approved': 0, 'rejected': 1, 'pending': 2})
+        
+        other = User.objects.create_user(
+            username='other@example.com',
+            email='other@example.com',
+            password='password123',
+            user_id='OTHER001'
+        )
+        self.assertEqual(self.get_dashboard(self.reviewer)['review_stats'],
+                         {'total': 3, 'approved': 0, 'rejected': 1, 'pending': 2})
+        self.assertEqual(self.get_dashboard(other)['review_stats'],
+                         {'total': 0, 'approved': 0, 'rejected': 0, 'pending': 0})
+    
+    def test_dashboard_cache_is_invalidated_by_writes(self):
+        """Test le cache et son invalidation à l'écriture d'une revue ou d'une campagne"""
+        self.get_dashboard(self.admin)
+        
+        self.client.force_authenticate(user=self.admin)
+        with self.assertNumQueries(0):
+            self.client.get('/api/campaigns/dashboard/')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.filter(campaign=self.campaign, decision='pending').update(decision='approved')
+        self.assertEqual(self.get_dashboard(self.admin)['review_stats']['approved'], 2)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.status = 'completed'
+            self.campaign.save()
+        self.assertEqual(self.get_dashboard(self.admin)['campaign_stats']['completed'], 1)
+
+class CampaignBurndownTests(TestCase):
+    """Tests pour les instantanés et la courbe d'avancement"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            user_id='USER001',
+            department='IT'
+        )
+        
+        self.campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            created_by=self.admin
+        )
+        
+        for i in range(4):
+            Access.objects.create(
+                access_id=f'ACCESS{i:03d}',
+                user=user,
+                resource_name=f'Resource {i}',
+                layer='Application',
+                profile='Read',
+                granted_date=timezone.now().date()
+            )
+        
+        CampaignService.start_campaign(self.campaign.id)
+    
+    def decide(self, count, decision):
+        review_ids = Review.objects.filter(campaign=self.campaign, decision='pending').values_list('id', flat=True)[:count]
+        Review.objects.filter(id__in=list(review_ids)).update(decision=decision)
+    
+    def test_start_records_initial_snapshot(self):
+        """Test que le démarrage enregistre le point de départ"""
+        snapshot = CampaignSnapshot.objects.get(campaign=self.campaign)
+        self.assertEqual((snapshot.pending, snapshot.approved, snapshot.rejected, snapshot.deferred), (4, 0, 0, 0))
+    
+    def test_take_skips_unchanged_campaigns(self):
+        """Test qu'un instantané n'est ajouté que si les compteurs ont changé"""
+        self.assertEqual(CampaignSnapshot.take(), 0)
+        
+        self.decide(1, 'approved')
+        self.decide(1, 'rejected')
+        # campagnes avec leur dernier instantané, création des instantanés
+        with self.assertNumQueries(2):
+            self.assertEqual(CampaignSnapshot.take(), 1)
+        
+        latest = CampaignSnapshot.objects.filter(campaign=self.campaign).last()
+        self.assertEqual((latest.pending, latest.approved, latest.rejected), (2, 1, 1))
+        self.assertEqual(CampaignSnapshot.take(force=True), 1)
+    
+    def test_take_ignores_inactive_campaigns_by_default(self):
+        """Test que seules les campagnes actives sont photographiées par défaut"""
+        self.decide(1, 'approved')
+        Campaign.objects.filter(id=self.campaign.id).update(status='completed')
+        
+        self.assertEqual(CampaignSnapshot.take(), 0)
+        self.assertEqual(CampaignSnapshot.take([self.campaign.id]), 1)
+    
+    def test_snapshot_command(self):
+        """Test la commande snapshot_campaigns"""
+        self.decide(2, 'approved')
+        out = io.StringIO()
+        call_command('snapshot_campaigns', stdout=out)
+        self.assertIn('1 instantané(s) enregistré(s)', out.getvalue())
+    
+    def test_burndown_endpoint(self):
+        """Test que la courbe lit les instantanés sans parcourir les revues"""
+        self.decide(3, 'approved')
+        CampaignSnapshot.take()
+        self.decide(1, 'deferred')
+        
+        self.client.force_authenticate(user=self.admin)
+        # campagne, instantanés
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/campaigns/{self.campaign.id}/burndown/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([point['pending'] for point in response.data['points']], [4, 1])
+        self.assertEqual(response.data['current']['pending'], 0)
+        self.assertEqual(response.data['current']['deferred'], 1)
+        
+        response = self.client.get(f'/api/campaigns/{self.campaign.id}/burndown/',
+                                   {'since': (timezone.now() + datetime.timedelta(days=1)).date().isoformat()})
+        self.assertEqual(response.data['points'], [])
+        
+        response = self.client.get(f'/api/campaigns/{self.campaign.id}/burndown/', {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.get('/api/campaigns/9999/burndown/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class ReviewerStatTests(TestCase):
+    """Tests pour les statistiques par réviseur"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        self.reviewers = [
+            User.objects.create_user(
+                username=f'reviewer{i}@example.com',
+                email=f'reviewer{i}@example.com',
+                password='password123',
+                user_id=f'REVIEWER{i:03d}'
+            )
+            for i in range(2)
+        ]
+        
+        self.campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            created_by=self.admin,
+            assignment_method='manual'
+        )
+        self.campaign.reviewers.set(self.reviewers)
+        
+        user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            user_id='USER001',
+            department='IT'
+        )
+        for i in range(6):
+            Access.objects.create(
+                access_id=f'ACCESS{i:03d}',
+                user=user,
+                resource_name=f'Resource {i}',
+                layer='Application',
+                profile='Read',
+                granted_date=timezone.now().date()
+            )
+        
+        CampaignService.start_campaign(self.campaign.id)
+    
+    def stat(self, reviewer):
+        return ReviewerStat.objects.get(campaign=self.campaign, reviewer=reviewer)
+    
+    def test_latency_percentile(self):
+        """Test l'estimation des centiles depuis l'histogramme des délais"""
+        from .latency import LATENCY_BUCKETS, latency_bucket, latency_percentile
+        
+        histogram = [0] * len(LATENCY_BUCKETS)
+        self.assertIsNone(latency_percentile(histogram, 0.5))
+        
+        # 10 décisions entre 1 et 2 jours
+        histogram[latency_bucket(datetime.timedelta(hours=30))] = 10
+        self.assertEqual(latency_percentile(histogram, 0.5), datetime.timedelta(hours=36))
+        self.assertEqual(latency_percentile(histogram, 0.9), datetime.timedelta(hours=45.6))
+        
+        self.assertEqual(latency_bucket(datetime.timedelta(seconds=-5)), 0)
+        self.assertEqual(latency_bucket(datetime.timedelta(days=400)), len(LATENCY_BUCKETS) - 1)
+    
+    def test_stats_follow_decisions(self):
+        """Test les compteurs, délais et dernière activité au fil des décisions"""
+        self.assertEqual(self.stat(self.reviewers[0]).pending_count, 3)
+        self.assertEqual(self.stat(self.reviewers[1]).pending_count, 3)
+        
+        reviews = list(Review.objects.filter(reviewer=self.reviewers[0]).order_by('id'))
+        decided_at = reviews[0].created_at + datetime.timedelta(hours=3)
+        reviews[0].decision = 'approved'
+        reviews[0].reviewed_at = decided_at
+        reviews[0].save()
+        Review.objects.filter(id=reviews[1].id).update(
+            decision='rejected',
+            reviewed_at=F('created_at') + datetime.timedelta(hours=30)
+        )
+        
+        stat = self.stat(self.reviewers[0])
+        self.assertEqual((stat.pending_count, stat.completed_count), (1, 2))
+        self.assertEqual(stat.median_latency, datetime.timedelta(hours=4))
+        self.assertEqual(stat.last_activity, reviews[1].created_at + datetime.timedelta(hours=30))
+        
+        # Réattribution des revues en attente à l'autre réviseur
+        Review.objects.filter(reviewer=self.reviewers[0], decision='pending').update(reviewer=self.reviewers[1])
+        self.assertEqual(self.stat(self.reviewers[0]).pending_count, 0)
+        self.assertEqual(self.stat(self.reviewers[1]).pending_count, 4)
+        
+        reviews[0].delete()
+        stat = self.stat(self.reviewers[0])
+        self.assertEqual(stat.completed_count, 1)
+        self.assertEqual(stat.median_latency, datetime.timedelta(hours=36))
+    
+    def test_reviewer_stats_endpoint(self):
+        """Test l'endpoint paginé et trié des statistiques par réviseur"""
+        review_ids = list(Review.objects.filter(reviewer=self.reviewers[1]).values_list('id', flat=True)[:2])
+        Review.objects.filter(id__in=review_ids).update(decision='approved', reviewed_at=timezone.now())
+        
+        self.client.force_authenticate(user=self.admin)
+        url = f'/api/campaigns/{self.campaign.id}/reviewer_stats/'
+        # campagne, nombre de lignes, page de statistiques
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([row['reviewer'] for row in response.data['results']],
+                         [self.reviewers[0].id, self.reviewers[1].id])
+        self.assertEqual(response.data['results'][0]['reviewer_email'], 'reviewer0@example.com')
+        self.assertFalse(response.data['results'][0]['is_late'])
+        
+        response = self.client.get(url, {'ordering': '-completed_count'})
+        self.assertEqual(response.data['results'][0]['reviewer'], self.reviewers[1].id)
+        self.assertEqual(response.data['results'][0]['completed_count'], 2)
+        
+        # Tri croissant: les réviseurs sans délai mesuré en dernier
+        response = self.client.get(url, {'ordering': 'median_latency'})
+        self.assertEqual([row['reviewer'] for row in response.data['results']],
+                         [self.reviewers[1].id, self.reviewers[0].id])
+        
+        response = self.client.get(url, {'ordering': 'email'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.get(url, {'late': 'true'})
+        self.assertEqual(response.data['count'], 0)
+        Campaign.objects.filter(id=self.campaign.id).update(end_date=timezone.now() - datetime.timedelta(days=1))
+        response = self.client.get(url, {'late': 'true'})
+        self.assertEqual(response.data['count'], 2)
+        self.assertTrue(response.data['results'][0]['is_late'])
+        
+        self.client.force_authenticate(user=self.reviewers[0])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+class CampaignExportTests(TestCase):
+    """Tests pour les exports des campagnes"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            first_name='Admin',
+            last_name='User',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        self.client.force_authenticate(user=self.admin)
+        
+        user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            first_name='Test',
+            last_name='User',
+            user_id='USER001',
+            department='IT'
+        )
+        
+        self.campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            created_by=self.admin
+        )
+        
+        for i in range(5):
+            Access.objects.create(
+                access_id=f'ACCESS{i:03d}',
+                user=user,
+                resource_name=f'Resource {i}',
+                layer='Application' if i % 2 else 'Database',
+                profile='Read',
+                granted_date=timezone.now().date()
+            )
+        
+        CampaignService.start_campaign(self.campaign.id)
+        review = Review.objects.filter(campaign=self.campaign).order_by('id').first()
+        review.decision = 'rejected'
+        review.comment = 'Compte inutilisé, à retirer\nau plus vite'
+        review.reviewed_at = timezone.now()
+        review.save()
+    
+    def url(self, name):
+        # Génération synchrone, sans passer par les jobs de rapport
+        return f'/api/campaigns/{self.campaign.id}/{name}/?sync=true'
+    
+    def test_csv_is_streamed(self):
+        """Le CSV est envoyé en flux, une ligne par revue"""
+        with mock.patch('campaigns.reports.ReportGenerator.CSV_CHUNK_SIZE', 2):
+            response = self.client.get(self.url('export_csv'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.streaming)
+            chunks = list(response.streaming_content)
+        
+        self.assertGreater(len(chunks), 1)
+        self.assertNotIn('Content-Encoding', response)
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0][0], 'Utilisateur')
+        self.assertEqual(rows[1][2:7], ['IT', 'Resource 0', 'Database', 'Read', 'Rejected'])
+        self.assertEqual(rows[1][7], 'Compte inutilisé, à retirer\nau plus vite')
+        self.assertEqual(rows[2][9], 'Non revu')
+    
+    def test_csv_gzip_negotiation(self):
+        """Le CSV est compressé quand le client accepte gzip"""
+        plain = b''.join(self.client.get(self.url('export_csv')).streaming_content)
+        
+        response = self.client.get(self.url('export_csv'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+    
+    def test_csv_unknown_campaign(self):
+        """Test l'export d'une campagne inexistante"""
+        response = self.client.get('/api/campaigns/999999/export_csv/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ReportJob.objects.exists())
+    
+    def load_workbook(self):
+        response = self.client.get(self.url('export_excel'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('.xlsx', response['Content-Disposition'])
+        return openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+    
+    def test_excel_rows_and_statistics(self):
+        """Le classeur contient une ligne par revue et les statistiques de CampaignStat"""
+        workbook = self.load_workbook()
+        self.assertEqual(workbook.sheetnames, ['Campagne', 'Statistiques'])
+        
+        worksheet = workbook['Campagne']
+        self.assertEqual(worksheet['A1'].value, 'Rapport de campagne: Test Campaign')
+        self.assertIn('A1:F1', [str(cells) for cells in worksheet.merged_cells.ranges])
+        self.assertEqual(worksheet['A5'].value, 'Utilisateur')
+        self.assertTrue(worksheet['A5'].font.bold)
+        self.assertEqual(worksheet.freeze_panes, 'A6')
+        self.assertEqual(worksheet.column_dimensions['A'].width, 20)
+        rows = list(worksheet.iter_rows(min_row=6, values_only=True))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0][:6], ('Test User', 'IT', 'Resource 0', 'Database', 'Read', 'Rejected'))
+        self.assertEqual(rows[1][8], 'Non revu')
+        
+        stats = [row for row in workbook['Statistiques'].iter_rows(values_only=True) if row]
+        self.assertIn(('Rejected', 1, '20.0%'), stats)
+        self.assertIn(('Pending', 4, '80.0%'), stats)
+        self.assertIn(('Database', 3, '60.0%'), stats)
+    
+    def test_excel_rows_continue_on_new_sheet(self):
+        """Au-delà de la limite de lignes d'une feuille, les revues continuent sur une autre"""
+        with mock.patch('campaigns.reports.ReportGenerator.EXCEL_MAX_ROWS', 7):
+            workbook = self.load_workbook()
+        self.assertEqual(workbook.sheetnames, ['Campagne', 'Campagne (2)', 'Campagne (3)', 'Statistiques'])
+        self.assertEqual(
+            [workbook[name].max_row - 5 for name in workbook.sheetnames[:3]],
+            [2, 2, 1]
+        )
+    
+    def pdf_pages(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        return [page.extract_text() for page in PdfReader(io.BytesIO(b''.join(response.streaming_content))).pages]
+    
+    def test_pdf_summary_from_aggregates(self):
+        """La synthèse PDF est construite à partir des seuls agrégats"""
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url('export_pdf') + '&mode=summary')
+        pages = self.pdf_pages(response)
+        text = '\n'.join(pages)
+        self.assertIn('Test Campaign', text)
+        self.assertIn('5 revues', text)
+        self.assertIn('Décisions par département', text)
+        self.assertIn('IT', text)
+        self.assertNotIn('Resource 0', text)
+        self.assertNotIn('Détail des revues', text)
+    
+    def test_pdf_detail_is_rendered_in_parts(self):
+        """Le PDF détaillé assemble la synthèse et le détail rendu par tranches"""
+        with mock.patch('campaigns.reports.ReportGenerator.PDF_CHUNK_SIZE', 2), \
+                mock.patch('campaigns.reports.ReportGenerator.write_pdf_detail_part',
+                           wraps=ReportGenerator.write_pdf_detail_part) as write_part:
+            pages = self.pdf_pages(self.client.get(self.url('export_pdf')))
+        
+        self.assertEqual(write_part.call_count, 3)
+        text = '\n'.join(pages)
+        self.assertEqual(text.count('Détail des revues'), 1)
+        for i in range(5):
+            self.assertIn(f'Resource {i}', text)
+        # Numérotation continue d'une partie à l'autre
+        for number, page in enumerate(pages, start=1):
+            self.assertIn(f'Page {number}', page)
+    
+    def test_pdf_parts_writer_output_is_valid(self):
+        """Les parties recopiées au fil de l'eau forment un PDF valide et complet"""
+        with mock.patch('campaigns.reports.ReportGenerator.PDF_CHUNK_SIZE', 2):
+            response = self.client.get(self.url('export_pdf'))
+        reader = PdfReader(io.BytesIO(b''.join(response.streaming_content)), strict=True)
+        
+        self.assertEqual(reader.metadata.title, f'Rapport de campagne - {self.campaign.name}')
+        self.assertEqual(reader.trailer['/Root']['/Pages']['/Count'], len(reader.pages))
+        for page in reader.pages:
+            self.assertEqual(page['/Parent'].indirect_reference, reader.trailer['/Root']['/Pages'].indirect_reference)
+    
+    def test_parquet_typed_columns_in_row_groups(self):
+        """L'export Parquet a des colonnes typées et un row group par bloc de revues"""
+        with mock.patch('campaigns.reports.ReportGenerator.PARQUET_ROW_GROUP_SIZE', 2):
+            response = self.client.get(self.url('export_parquet'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('.parquet', response['Content-Disposition'])
+        
+        parquet_file = pq.ParquetFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(parquet_file.metadata.num_rows, 5)
+        self.assertEqual(parquet_file.num_row_groups, 3)
+        
+        table = parquet_file.read()
+        self.assertEqual(table.schema.field('review_id').type, pa.int64())
+        self.assertEqual(table.schema.field('reviewed_at').type, pa.timestamp('us', tz='UTC'))
+        self.assertEqual(table.schema.field('granted_date').type, pa.date32())
+        for name in ('decision', 'layer', 'profile', 'department'):
+            self.assertTrue(pa.types.is_dictionary(table.schema.field(name).type))
+        
+        frame = table.to_pandas()
+        self.assertEqual(str(frame['decision'].dtype), 'category')
+        reviews = list(Review.objects.filter(campaign=self.campaign).order_by('id'))
+        self.assertEqual(list(frame['review_id']), [review.id for review in reviews])
+        self.assertEqual(list(frame['decision']), [review.decision for review in reviews])
+        self.assertEqual(frame['reviewed_at'][0].to_pydatetime(), reviews[0].reviewed_at)
+        self.assertEqual(int(frame['reviewed_at'].isna().sum()), 4)
+        self.assertEqual(frame['comment'][0], 'Compte inutilisé, à retirer\nau plus vite')
+        self.assertEqual(list(frame['access_id']), [f'ACCESS{i:03d}' for i in range(5)])
+    
+    def test_parquet_empty_campaign(self):
+        """Une campagne sans revue donne un fichier Parquet vide mais typé"""
+        Review.objects.filter(campaign=self.campaign).delete()
+        response = self.client.get(self.url('export_parquet'))
+        table = pq.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.schema.field('campaign_id').type, pa.int64())
+
+
+REPORTS_MEDIA_ROOT = tempfile.mkdtemp()
+
+@override_settings(MEDIA_ROOT=REPORTS_MEDIA_ROOT, REPORT_JOBS_RUN_IN_PROCESS=False)
+class ReportJobTests(TestCase):
+    """Tests pour la génération des rapports en arrière-plan et leur cache"""
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(REPORTS_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        self.client.force_authenticate(user=self.admin)
+        
+        self.user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            first_name='Test',
+            last_name='User',
+            user_id='USER001',
+            department='IT'
+        )
+        
+        self.campaign = Campaign.objects.create(
+            name='Test Campaign',
+            start_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(days=7),
+            created_by=self.admin
+        )
+        for i in range(3):
+            Access.objects.create(
+                access_id=f'ACCESS{i:03d}',
+                user=self.user,
+                resource_name=f'Resource {i}',
+                layer='Application',
+                profile='Read',
+                granted_date=timezone.now().date()
+            )
+        CampaignService.start_campaign(self.campaign.id)
+    
+    def export(self, report_format='csv'):
+        return self.client.get(f'/api/campaigns/{self.campaign.id}/export_{report_format}/')
+    
+    def generate(self, report_format='csv'):
+        """Met le rapport en file puis exécute le worker"""
+        response = self.export(report_format)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(ReportJobService.process_queued(), 1)
+        return ReportJob.objects.get(id=response.data['job_id'])
+    
+    def revision(self):
+        self.campaign.refresh_from_db()
+        return self.campaign.revision
+    
+    def test_report_is_queued_then_served_from_cache(self):
+        """Le premier export met le rapport en file, les suivants le servent depuis le cache"""
+        response = self.export()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'queued')
+        self.assertEqual(self.client.get(response.data['status_url']).data['status'], 'queued')
+        
+        # Tant que le job n'a pas tourné, le même job est renvoyé
+        self.assertEqual(self.export().data['job_id'], response.data['job_id'])
+        
+        self.assertEqual(ReportJobService.process_queued(), 1)
+        job = ReportJob.objects.get(id=response.data['job_id'])
+        self.assertEqual(job.status, 'completed')
+        self.assertGreater(job.file_size, 0)
+        
+        for _ in range(2):
+            with mock.patch('campaigns.reports.ReportGenerator.write_report') as write_report:
+                response = self.export()
+                content = b''.join(response.streaming_content)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            write_report.assert_not_called()
+            self.assertIn('.csv', response['Content-Disposition'])
+            self.assertEqual(len(list(csv.reader(io.StringIO(content.decode('utf-8'))))), 4)
+        
+        self.assertEqual(ReportJob.objects.count(), 1)
+        job.refresh_from_db()
+        self.assertIsNotNone(job.last_accessed_at)
+        
+        detail = self.client.get(f'/api/campaigns/reports/{job.id}/').data
+        self.assertTrue(detail['is_current'])
+        response = self.client.get(detail['download_url'])
+        self.assertEqual(b''.join(response.streaming_content), content)
+    
+    def test_formats_are_cached_separately(self):
+        """Chaque format a son propre artefact"""
+        for report_format in ('csv', 'excel', 'parquet'):
+            job = self.generate(report_format)
+            self.assertEqual(job.status, 'completed', job.error_message)
+        self.assertEqual(self.export('excel').status_code, status.HTTP_200_OK)
+        self.assertEqual(ReportJob.objects.count(), 3)
+    
+    def test_writes_bump_the_revision(self):
+        """Toute écriture sur la campagne ou ses revues rend le rapport périmé"""
+        job = self.generate()
+        revision = self.revision()
+        self.assertEqual(job.revision, revision)
+        
+        review = Review.objects.filter(campaign=self.campaign).first()
+        review.decision = 'approved'
+        review.save()
+        self.assertGreater(self.revision(), revision)
+        
+        response = self.export()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertNotEqual(response.data['job_id'], job.id)
+        
+        def rename_user():
+            user = User.objects.get(pk=self.user.pk)
+            user.last_name = 'Renamed'
+            user.save()
+        
+        # Commentaire seul, renommage de l'utilisateur, modification de la campagne
+        for write in (
+            lambda: Review.objects.filter(pk=review.pk).update(comment='Vu avec le manager'),
+            lambda: review.save(update_fields=['comment']),
+            rename_user,
+            lambda: Campaign.objects.get(pk=self.campaign.pk).save(),
+        ):
+            revision = self.revision()
+            write()
+            self.assertGreater(self.revision(), revision)
+    
+    def test_report_fields_bump_the_revision(self):
+        """Réviseur renommé, email ou date d'octroi modifiés: le rapport est périmé"""
+        review = Review.objects.filter(campaign=self.campaign).select_related('reviewer', 'access').first()
+        
+        def rename_reviewer():
+            review.reviewer.first_name = 'Renamed'
+            review.reviewer.save()
+        
+        def change_email():
+            user = User.objects.get(pk=self.user.pk)
+            user.email = 'new@example.com'
+            user.save(update_fields=['email'])
+        
+        def change_granted_date():
+            review.access.granted_date -= datetime.timedelta(days=1)
+            review.access.save()
+        
+        for write in (
+            rename_reviewer,
+            change_email,
+            change_granted_date,
+            lambda: Access.objects.filter(pk=review.access_id).update(last_used=timezone.now().date()),
+        ):
+            revision = self.revision()
+            write()
+            self.assertGreater(self.revision(), revision)
+        
+        # Un save() sans changement ne périme rien
+        revision = self.revision()
+        User.objects.get(pk=self.user.pk).save()
+        Access.objects.get(pk=review.access_id).save()
+        self.assertEqual(self.revision(), revision)
+    
+    def test_reports_are_scoped_to_reviewers(self):
+        """Un réviseur ne voit que les rapports des campagnes qu'il revoit"""
+        job = self.generate()
+        outsider = User.objects.create_user(
+            username='outsider@example.com',
+            email='outsider@example.com',
+            password='password123',
+            user_id='OUTSIDER001'
+        )
+        self.client.force_authenticate(user=outsider)
+        self.assertEqual(self.client.get('/api/campaigns/reports/').data['results'], [])
+        self.assertEqual(self.client.get(f'/api/campaigns/reports/{job.id}/download/').status_code,
+                         status.HTTP_404_NOT_FOUND)
+        
+        reviewer = Review.objects.filter(campaign=self.campaign).first().reviewer
+        self.client.force_authenticate(user=reviewer)
+        self.assertEqual([row['id'] for row in self.client.get('/api/campaigns/reports/').data['results']], [job.id])
+    
+    def test_stale_running_job_is_requeued(self):
+        """Un job resté 'running' au-delà de REPORT_JOB_TIMEOUT est relancé"""
+        job_id = self.export().data['job_id']
+        self.assertTrue(ReportJobService.claim(job_id))
+        
+        # Worker encore dans les temps
+        self.assertEqual(self.export().data['status'], 'running')
+        
+        ReportJob.objects.filter(id=job_id).update(started_at=timezone.now() - datetime.timedelta(hours=1))
+        response = self.export()
+        self.assertEqual((response.data['job_id'], response.data['status']), (job_id, 'queued'))
+        self.assertEqual(ReportJobService.process_queued(), 1)
+        self.assertEqual(self.export().status_code, status.HTTP_200_OK)
+        
+        # process_report_jobs relance aussi les jobs abandonnés
+        ReportJob.objects.filter(id=job_id).update(status='running', started_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(ReportJobService.process_queued(), 1)
+    
+    def test_cached_csv_gzip_negotiation(self):
+        """Le CSV en cache est compressé quand le client accepte gzip"""
+        self.generate()
+        plain = self.export()
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        content = b''.join(plain.streaming_content)
+        
+        response = self.client.get(f'/api/campaigns/{self.campaign.id}/export_csv/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), content)
+    
+    def test_failed_job_is_requeued(self):
+        """Un rapport en échec est remis en file à la demande suivante"""
+        with mock.patch('campaigns.reports.ReportGenerator.write_report', side_effect=ValueError('boom')):
+            job = self.generate()
+        self.assertEqual((job.status, job.error_message), ('failed', 'boom'))
+        
+        response = self.export()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual((response.data['job_id'], response.data['status']), (job.id, 'queued'))
+    
+    def test_eviction_by_revision_age_and_size(self):
+        """Les artefacts périmés, anciens ou en trop sont supprimés avec leur fichier"""
+        stale = self.generate('csv')
+        storage = stale.file.storage
+        self.assertTrue(storage.exists(stale.file.name))
+        Review.objects.filter(campaign=self.campaign).update(decision='approved')
+        
+        # Révision dépassée: évincé après l'exécution du job suivant
+        old = self.generate('csv')
+        self.assertFalse(ReportJob.objects.filter(id=stale.id).exists())
+        self.assertFalse(storage.exists(stale.file.name))
+        
+        recent = self.generate('excel')
+        ReportJob.objects.filter(id=old.id).update(last_accessed_at=timezone.now() - datetime.timedelta(hours=2))
+        ReportJob.objects.filter(id=recent.id).update(last_accessed_at=timezone.now())
+        self.assertEqual(ReportJobService.evict(), 0)
+        
+        # Taille: le moins récemment servi part en premier
+        self.assertEqual(ReportJobService.evict(max_bytes=recent.file_size), 1)
+        self.assertEqual(list(ReportJob.objects.values_list('id', flat=True)), [recent.id])
+        self.assertFalse(storage.exists(old.file.name))
+        
+        # Âge
+        self.assertEqual(ReportJobService.evict(max_age=0), 1)
+        self.assertFalse(ReportJob.objects.exists())
+        
+        # Un fichier évincé est regénéré à la demande suivante
+        self.assertEqual(self.export('excel').status_code, status.HTTP_202_ACCEPTED)
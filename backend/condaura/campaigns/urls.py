@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CampaignViewSet, CampaignScopeViewSet
+from .views import CampaignViewSet, CampaignScopeViewSet, ReportJobViewSet
 
 router = DefaultRouter()
 router.register(r'', CampaignViewSet)
@@ -8,7 +8,12 @@ router.register(r'', CampaignViewSet)
 scopes_router = DefaultRouter()
 scopes_router.register(r'', CampaignScopeViewSet)
 
+reports_router = DefaultRouter()
+reports_router.register(r'', ReportJobViewSet)
+
 urlpatterns = [
+    # Avant les routes des campagnes, dont le détail capturerait 'reports/'
+    path('reports/', include(reports_router.urls)),
     path('', include(router.urls)),
     path('scopes/', include(scopes_router.urls)),
 ] 
\ No newline at end of file
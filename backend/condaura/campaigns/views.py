@@ -3,19 +3,26 @@ from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Count, Q
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time
+from django.db.models import Count, F, Q
 from django.http import Http404
+from django.urls import reverse
 
-from .models import Campaign, CampaignScope
+from .models import Campaign, CampaignScope, ReportJob
 from .serializers import (
     CampaignSerializer, 
     CampaignDetailSerializer,
     CampaignCreateSerializer,
-    CampaignScopeSerializer
+    CampaignScopeSerializer,
+    ReportJobSerializer,
+    ReviewerStatSerializer
 )
 from access.models import Access, Review
-from .services import CampaignService
+from imports.views import import_flag
+from .services import CampaignService, ReportJobService
 from .reports import ReportGenerator
+from .dashboard import get_dashboard
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """
@@ -67,6 +74,30 @@ class CampaignViewSet(viewsets.ModelViewSet):
         else:
             return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def rescope(self, request, pk=None):
+        """
+        Crée les revues des accès entrés dans le périmètre depuis le démarrage
+        et clôt les revues en attente des accès retirés du référentiel
+        Avec prune=true, supprime aussi les revues en attente hors périmètre
+        """
+        success, result = CampaignService.rescope(pk, prune=import_flag(request, 'prune'))
+        
+        if success:
+            return Response(result, status=status.HTTP_200_OK)
+        else:
+            return Response({'error': result}, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def scope_preview(self, request, pk=None):
+        """Aperçu du périmètre et de la répartition des revues avant démarrage"""
+        success, result = CampaignService.get_scope_preview(pk)
+        
+        if success:
+            return Response(result, status=status.HTTP_200_OK)
+        else:
+            return Response({'error': result}, status=status.HTTP_404_NOT_FOUND)
+    
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def complete(self, request, pk=None):
         """Termine une campagne de revue"""
@@ -88,6 +119,52 @@ class CampaignViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Campagne non trouvée ou erreur de calcul des statistiques'}, 
                            status=status.HTTP_404_NOT_FOUND)
     
+    @action(detail=True, methods=['get'])
+    def burndown(self, request, pk=None):
+        """Courbe d'avancement de la campagne, lue dans les instantanés"""
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_datetime(since) or datetime.combine(parse_date(since), time.min)
+            except (TypeError, ValueError):
+                return Response({'error': "Paramètre 'since' invalide"}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        success, result = CampaignService.get_burndown(pk, since=since or None)
+        
+        if success:
+            return Response(result, status=status.HTTP_200_OK)
+        else:
+            return Response({'error': result}, status=status.HTTP_404_NOT_FOUND)
+    
+    # Tris acceptés par reviewer_stats
+    REVIEWER_STAT_ORDERINGS = ('pending_count', 'completed_count', 'median_latency', 'p90_latency', 'last_activity')
+    
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def reviewer_stats(self, request, pk=None):
+        """
+        Charge et délais de décision de chaque réviseur, lus dans la table
+        ReviewerStat. Tri par ?ordering= (préfixe '-' pour décroissant),
+        ?late=true pour les seuls réviseurs en retard.
+        """
+        campaign = self.get_object()
+        
+        ordering = request.query_params.get('ordering', '-pending_count')
+        field = ordering.lstrip('-')
+        if field not in self.REVIEWER_STAT_ORDERINGS:
+            return Response({'error': f"Tri invalide: {ordering}"}, status=status.HTTP_400_BAD_REQUEST)
+        order = F(field).desc(nulls_last=True) if ordering.startswith('-') else F(field).asc(nulls_last=True)
+        
+        stats = campaign.reviewer_stats.select_related('reviewer', 'campaign').order_by(order, 'reviewer_id')
+        if str(request.query_params.get('late', '')).lower() in ('1', 'true', 'yes'):
+            if campaign.end_date >= timezone.now():
+                stats = stats.none()
+            stats = stats.filter(pending_count__gt=0)
+        
+        page = self.paginate_queryset(stats)
+        serializer = ReviewerStatSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def send_reminders(self, request, pk=None):
         """Envoie des rappels pour les revues en attente de cette campagne"""
@@ -98,38 +175,63 @@ class CampaignViewSet(viewsets.ModelViewSet):
         else:
             return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
     
-    @action(detail=True, methods=['get'])
-    def export_excel(self, request, pk=None):
-        """Exporte les données de la campagne au format Excel"""
-        response = ReportGenerator.generate_excel_report(pk)
+    def export_report(self, request, pk, report_format):
+        """
+        Serve the report of the campaign's current revision from the cache,
+        or queue its generation and return the job to poll (202).
+        ?sync=true generates the report within the request instead.
+        """
+        labels = {'excel': 'Excel', 'pdf': 'PDF', 'pdf_summary': 'PDF', 'csv': 'CSV', 'parquet': 'Parquet'}
+        campaign = Campaign.objects.filter(pk=pk).first()
+        if campaign is not None and not import_flag(request, 'sync'):
+            job = ReportJobService.get_or_queue(campaign, report_format, request.user)
+            if job.status == 'completed':
+                return ReportJobService.serve(job, request)
+            return Response({
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': reverse('reportjob-detail', args=[job.id])
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        if report_format == 'csv':
+            response = ReportGenerator.generate_csv_report(pk, gzip=ReportGenerator.accepts_gzip(request))
+        elif report_format == 'parquet':
+            response = ReportGenerator.generate_parquet_report(pk)
+        elif report_format in ('pdf', 'pdf_summary'):
+            response = ReportGenerator.generate_pdf_report(pk, 'summary' if report_format == 'pdf_summary' else 'detail')
+        else:
+            response = ReportGenerator.generate_excel_report(pk)
         
         if response:
             return response
         else:
-            return Response({'error': 'Erreur lors de la génération du rapport Excel'}, 
+            return Response({'error': f'Erreur lors de la génération du rapport {labels[report_format]}'}, 
                            status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=True, methods=['get'])
+    def export_excel(self, request, pk=None):
+        """Exporte les données de la campagne au format Excel"""
+        return self.export_report(request, pk, 'excel')
+    
     @action(detail=True, methods=['get'])
     def export_pdf(self, request, pk=None):
-        """Exporte les données de la campagne au format PDF"""
-        response = ReportGenerator.generate_pdf_report(pk)
-        
-        if response:
-            return response
-        else:
-            return Response({'error': 'Erreur lors de la génération du rapport PDF'}, 
-                           status=status.HTTP_400_BAD_REQUEST)
+        """
+        Exporte les données de la campagne au format PDF:
+        ?mode=summary pour la synthèse seule, sinon le rapport détaillé
+        """
+        if request.query_params.get('mode') == 'summary':
+            return self.export_report(request, pk, 'pdf_summary')
+        return self.export_report(request, pk, 'pdf')
     
     @action(detail=True, methods=['get'])
     def export_csv(self, request, pk=None):
         """Exporte les données de la campagne au format CSV"""
-        response = ReportGenerator.generate_csv_report(pk)
-        
-        if response:
-            return response
-        else:
-            return Response({'error': 'Erreur lors de la génération du rapport CSV'}, 
-                           status=status.HTTP_400_BAD_REQUEST)
+        return self.export_report(request, pk, 'csv')
+    
+    @action(detail=True, methods=['get'])
+    def export_parquet(self, request, pk=None):
+        """Exporte les revues de la campagne au format Parquet, en colonnes typées"""
+        return self.export_report(request, pk, 'parquet')
     
     @action(detail=True, methods=['post'])
     def activate(self, request, pk=None):
@@ -150,43 +252,35 @@ class CampaignViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def dashboard(self, request):
-        """Get dashboard statistics"""
-        user = request.user
-        
-        # Count campaigns by status
-        campaign_stats = {
-            'total': Campaign.objects.count(),
-            'active': Campaign.objects.filter(status='active').count(),
-            'completed': Campaign.objects.filter(status='completed').count(),
-            'draft': Campaign.objects.filter(status='draft').count(),
-        }
-        
-        # Count reviews by decision for current user
-        review_stats = {}
-        if user.role == 'admin' or user.is_staff:
-            # Admin sees all reviews
-            review_stats = {
-                'total': Review.objects.count(),
-                'approved': Review.objects.filter(decision='approved').count(),
-                'rejected': Review.objects.filter(decision='rejected').count(),
-                'pending': Review.objects.filter(decision='pending').count(),
-            }
-        else:
-            # Regular users see only their reviews
-            review_stats = {
-                'total': Review.objects.filter(reviewer=user).count(),
-                'approved': Review.objects.filter(reviewer=user, decision='approved').count(),
-                'rejected': Review.objects.filter(reviewer=user, decision='rejected').count(),
-                'pending': Review.objects.filter(reviewer=user, decision='pending').count(),
-            }
-        
-        return Response({
-            'campaign_stats': campaign_stats,
-            'review_stats': review_stats
-        }, status=status.HTTP_200_OK)
+        """Get dashboard statistics (cached briefly per role / per reviewer)"""
+        return Response(get_dashboard(request.user), status=status.HTTP_200_OK)
 
 class CampaignScopeViewSet(viewsets.ModelViewSet):
     queryset = CampaignScope.objects.all()
     serializer_class = CampaignScopeSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['campaign', 'scope_type']
+
+class ReportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ReportJob.objects.select_related('campaign')
+    serializer_class = ReportJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filterset_fields = ['campaign', 'format', 'status']
+    
+    def get_queryset(self):
+        user = self.request.user
+        
+        # Admin users can see all reports
+        if user.is_staff or user.role == 'admin':
+            return self.queryset
+        
+        # Reviewers can only see the reports of campaigns they are involved in
+        return self.queryset.filter(campaign__in=Review.objects.filter(reviewer=user).values('campaign_id'))
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the file of a completed report"""
+        job = self.get_object()
+        if job.status != 'completed' or not job.file:
+            return Response({'error': 'Report is not ready'}, status=status.HTTP_400_BAD_REQUEST)
+        return ReportJobService.serve(job, request)
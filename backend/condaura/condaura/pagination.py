@@ -0,0 +1,178 @@
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par clé (keyset): une page est lue avec un WHERE sur la
+    position de la dernière ligne de la page précédente, et non avec un
+    OFFSET dont le coût croît avec la profondeur. L'ordre doit être total
+    (son dernier champ est la clé primaire) et couvert par un index
+    composite: une page coûte alors le même prix au début et au fond
+    d'une file de plusieurs milliers de lignes.
+
+    L'ordre est lu dans l'attribut `keyset_ordering` de la vue. Les NULL
+    sont classés après toutes les autres valeurs, comme par défaut sous
+    PostgreSQL, pour que l'index serve dans les deux sens de lecture.
+
+    Le total (un COUNT) est renvoyé sauf avec ?count=false. Le paramètre
+    ?page= des clients existants reste accepté (lecture par OFFSET); les
+    liens next et previous sont toujours des curseurs.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    page_query_param = 'page'
+    count_query_param = 'count'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+    invalid_page_message = 'Invalid page.'
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        ordering = getattr(view, 'keyset_ordering', None) or self.ordering
+        self.fields = [
+            (queryset.model._meta.get_field(name.lstrip('-')), name.startswith('-'))
+            for name in ordering
+        ]
+        # Avec only(), la position des lignes doit rester chargée
+        loaded, deferred = queryset.query.deferred_loading
+        if not deferred:
+            queryset = queryset.only(*loaded, *(field.name for field, _ in self.fields))
+
+        with_count = request.query_params.get(self.count_query_param, '').lower() not in ('false', '0', 'no')
+        self.count = queryset.count() if with_count else None
+
+        cursor = self.decode_cursor(request)
+        page_number = request.query_params.get(self.page_query_param)
+        if cursor is not None:
+            position, reverse = cursor
+            rows = list(queryset.filter(self.keyset_filter(position, reverse))
+                        .order_by(*self.order_by(reverse))[:self.page_size + 1])
+            has_more = len(rows) > self.page_size
+            rows = rows[:self.page_size]
+            if reverse:
+                rows.reverse()
+                self.has_previous, self.has_next = has_more, True
+            else:
+                self.has_previous, self.has_next = True, has_more
+        else:
+            offset = 0
+            if page_number:
+                try:
+                    page_number = int(page_number)
+                    if page_number < 1:
+                        raise ValueError
+                except ValueError:
+                    raise NotFound(self.invalid_page_message)
+                offset = (page_number - 1) * self.page_size
+            rows = list(queryset.order_by(*self.order_by())[offset:offset + self.page_size + 1])
+            self.has_previous = offset > 0
+            self.has_next = len(rows) > self.page_size
+            rows = rows[:self.page_size]
+
+        self.page = rows
+        return rows
+
+    def order_by(self, reverse=False):
+        """Expressions ORDER BY, NULL après toutes les autres valeurs"""
+        expressions = []
+        for field, descending in self.fields:
+            column = F(field.attname)
+            if descending != reverse:
+                expressions.append(column.desc(nulls_first=True) if field.null else column.desc())
+            else:
+                expressions.append(column.asc(nulls_last=True) if field.null else column.asc())
+        return expressions
+
+    def keyset_filter(self, position, reverse=False):
+        """Lignes situées après `position` dans l'ordre (avant, si `reverse`)"""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (field, descending), value in zip(self.fields, position):
+            name = field.attname
+            if descending != reverse:
+                # Ordre décroissant: NULL en tête, puis les valeurs inférieures
+                after = Q(**{f'{name}__isnull': False}) if value is None else Q(**{f'{name}__lt': value})
+            elif value is None:
+                after = Q(pk__in=[])
+            else:
+                after = Q(**{f'{name}__gt': value})
+                if field.null:
+                    after |= Q(**{f'{name}__isnull': True})
+            condition |= equal & after
+            equal &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+        return condition
+
+    def position(self, row):
+        return [getattr(row, field.attname) for field, _ in self.fields]
+
+    def encode_cursor(self, position, reverse):
+        values = [value.isoformat() if isinstance(value, (datetime.date, datetime.datetime)) else value
+                  for value in position]
+        token = base64.urlsafe_b64encode(json.dumps({'p': values, 'r': reverse}).encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.base_url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+            values = payload['p']
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [
+                None if value is None else field.to_python(value)
+                for (field, _), value in zip(self.fields, values)
+            ]
+            return position, bool(payload['r'])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.position(self.page[0]), True)
+
+    def get_paginated_response(self, data):
+        response = {}
+        if self.count is not None:
+            response['count'] = self.count
+        response.update({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
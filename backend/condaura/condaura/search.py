@@ -0,0 +1,190 @@
+import re
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Concat
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+
+class SearchIndex:
+    """
+    Index plein texte d'un modèle: une table (id, document) tenue à côté
+    de la table du modèle, où le document concatène les champs cherchés,
+    relations comprises (nom de la ressource, nom de l'utilisateur...).
+
+    Sous SQLite, c'est une table virtuelle FTS5; sous PostgreSQL, une
+    colonne tsvector couverte par un index GIN. Une recherche est une
+    lecture de l'index inversé: son coût dépend du nombre de résultats,
+    pas de la taille des tables, contrairement aux icontains de
+    SearchFilter qui parcourent les tables jointes.
+
+    Les documents sont calculés dans la base par un INSERT ... SELECT sur
+    un queryset quelconque du modèle (`refresh`): les écritures en masse
+    réindexent leurs lignes en deux requêtes. Sous un autre moteur, il n'y
+    a pas d'index et la recherche se replie sur des icontains.
+    """
+    # Configuration PostgreSQL: pas de racinisation, les documents mêlent
+    # noms propres, libellés de ressources et commentaires en français
+    config = 'simple'
+
+    def __init__(self, table, model, fields):
+        self.table = table
+        self.model = model
+        self.fields = tuple(fields)
+
+    @staticmethod
+    def vendor(connection):
+        return connection.vendor if connection.vendor in ('sqlite', 'postgresql') else None
+
+    @staticmethod
+    def terms(text):
+        """Mots de la recherche, sans la syntaxe des requêtes FTS5 et tsquery"""
+        return re.findall(r'\w+', text or '')
+
+    def create(self, connection):
+        """Crée la table d'index"""
+        vendor = self.vendor(connection)
+        table = connection.ops.quote_name(self.table)
+        with connection.cursor() as cursor:
+            if vendor == 'sqlite':
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {table} USING fts5(document, tokenize='unicode61 remove_diacritics 2')"
+                )
+            elif vendor == 'postgresql':
+                cursor.execute(f'CREATE TABLE {table} (id bigint PRIMARY KEY, document tsvector NOT NULL)')
+                cursor.execute(
+                    f'CREATE INDEX {connection.ops.quote_name(self.table + "_document_idx")} '
+                    f'ON {table} USING GIN (document)'
+                )
+
+    def drop(self, connection):
+        if self.vendor(connection):
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {connection.ops.quote_name(self.table)}')
+
+    def key_column(self, connection):
+        return 'rowid' if connection.vendor == 'sqlite' else 'id'
+
+    def document_queryset(self, queryset):
+        """(id, document) des lignes du queryset"""
+        parts = []
+        for field in self.fields:
+            if parts:
+                parts.append(Value(' '))
+            parts.append(field)
+        return queryset.order_by().annotate(
+            search_document=Concat(*parts, output_field=TextField())
+        ).values_list('pk', 'search_document')
+
+    def refresh(self, queryset, created=False):
+        """
+        (Ré)indexe les lignes du queryset, en deux requêtes; en une seule
+        pour des lignes qui viennent d'être créées (`created`)
+        """
+        connection = connections[queryset.db]
+        vendor = self.vendor(connection)
+        if vendor is None:
+            return
+
+        table = connection.ops.quote_name(self.table)
+        try:
+            select_sql, params = self.document_queryset(queryset).query.sql_with_params()
+        except EmptyResultSet:
+            return
+        with connection.cursor() as cursor:
+            if vendor == 'sqlite':
+                # FTS5 n'a pas d'UPSERT: les anciens documents sont supprimés
+                if not created:
+                    self.remove(queryset)
+                cursor.execute(f'INSERT INTO {table} (rowid, document) {select_sql}', params)
+            else:
+                cursor.execute(
+                    f'INSERT INTO {table} (id, document) '
+                    f'SELECT source.id, to_tsvector(%s, source.document) FROM ({select_sql}) AS source (id, document) '
+                    f'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document',
+                    (self.config, *params)
+                )
+
+    def remove(self, queryset):
+        """Retire de l'index les lignes du queryset (à appeler avant leur suppression)"""
+        connection = connections[queryset.db]
+        if self.vendor(connection) is None:
+            return
+
+        key = self.key_column(connection)
+        try:
+            pk_sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        except EmptyResultSet:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {connection.ops.quote_name(self.table)} WHERE {key} IN ({pk_sql})', params)
+
+    def rebuild(self, using='default', batch_size=10000):
+        """
+        Vide puis reconstruit l'index, par tranches de `batch_size` id.
+        Renvoie le nombre de lignes indexées.
+        """
+        connection = connections[using]
+        if self.vendor(connection) is None:
+            return 0
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {connection.ops.quote_name(self.table)}')
+
+        queryset = self.model._default_manager.using(using).order_by('pk')
+        indexed = 0
+        last = None
+        while True:
+            batch = queryset if last is None else queryset.filter(pk__gt=last)
+            ids = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            self.refresh(queryset.filter(pk__gte=ids[0], pk__lte=ids[-1]))
+            indexed += len(ids)
+            last = ids[-1]
+
+        if connection.vendor == 'sqlite':
+            # Fusionne les segments de l'index écrits par lots
+            with connection.cursor() as cursor:
+                table = connection.ops.quote_name(self.table)
+                cursor.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+        return indexed
+
+    def filter(self, queryset, text):
+        """Lignes du queryset dont le document contient tous les mots de `text` (en préfixe)"""
+        terms = self.terms(text)
+        if not terms:
+            return queryset
+
+        connection = connections[queryset.db]
+        vendor = self.vendor(connection)
+        table = connection.ops.quote_name(self.table)
+        if vendor == 'sqlite':
+            match = ' AND '.join(f'"{term}"*' for term in terms)
+            matches = RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', (match,))
+        elif vendor == 'postgresql':
+            match = ' & '.join(f'{term}:*' for term in terms)
+            matches = RawSQL(f'SELECT id FROM {table} WHERE document @@ to_tsquery(%s, %s)', (self.config, match))
+        else:
+            for term in terms:
+                condition = Q()
+                for field in self.fields:
+                    condition |= Q(**{f'{field}__icontains': term})
+                queryset = queryset.filter(condition)
+            return queryset
+        return queryset.filter(pk__in=matches)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """?search= cherché dans l'index plein texte `search_index` de la vue"""
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        index = getattr(view, 'search_index', None)
+        text = request.query_params.get(self.search_param, '')
+        if index is None or not text.strip():
+            return queryset
+        return index.filter(queryset, text)
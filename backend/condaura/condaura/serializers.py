@@ -0,0 +1,71 @@
+from rest_framework import serializers
+
+
+class SparseFieldsetMixin:
+    """
+    Représentations à la demande pour les requêtes GET:
+    ?fields=a,b ne renvoie que les champs demandés, ?expand=x remplace
+    l'id d'une relation par sa représentation.
+
+    `field_columns` associe un champ aux colonnes (chemins ORM) qu'il lit,
+    quand ce ne sont pas simplement le champ du même nom; `expandable_fields`
+    associe une relation dépliable à son serializer. `optimize_queryset`
+    en déduit les select_related et le only() du queryset: seules les
+    jointures et les colonnes des champs demandés sont chargées.
+
+    Les paramètres de la requête ne s'appliquent qu'au serializer racine:
+    une relation dépliée est toujours représentée en entier.
+    """
+    field_columns = {}
+    expandable_fields = {}
+
+    @staticmethod
+    def parse_list(value):
+        return {name.strip() for name in value.split(',') if name.strip()} if value else set()
+
+    @classmethod
+    def requested(cls, request):
+        """(champs demandés ou None pour tous, relations à déplier)"""
+        if request is None or request.method != 'GET':
+            return None, set()
+        fields = request.query_params.get('fields')
+        expand = cls.parse_list(request.query_params.get('expand')) & cls.expandable_fields.keys()
+        return (cls.parse_list(fields) if fields else None), expand
+
+    @classmethod
+    def required_columns(cls, fields=None, expand=()):
+        """Colonnes lues par la représentation des champs `fields` (tous par défaut)"""
+        columns = []
+        for name in cls.Meta.fields:
+            if fields is not None and name not in fields:
+                continue
+            if name in expand:
+                nested = cls.expandable_fields[name]
+                columns.append(name)
+                columns.extend(f'{name}__{column}' for column in nested.required_columns())
+            else:
+                columns.extend(cls.field_columns.get(name, (name,)))
+        return columns
+
+    @classmethod
+    def optimize_queryset(cls, queryset, request=None):
+        """Charge en une requête, jointures comprises, ce que lira la représentation demandée"""
+        columns = cls.required_columns(*cls.requested(request))
+        related = {column.rsplit('__', 1)[0] for column in columns if '__' in column}
+        if related:
+            # select_related() sans argument suivrait toutes les relations
+            queryset = queryset.select_related(*related)
+        return queryset.only('pk', *columns)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        root = self.parent if isinstance(self.parent, serializers.ListSerializer) else self
+        if root.parent is not None:
+            return fields
+
+        requested, expand = self.requested(self.context.get('request'))
+        for name in expand & fields.keys():
+            fields[name] = self.expandable_fields[name](read_only=True)
+        if requested is not None:
+            fields = {name: field for name, field in fields.items() if name in requested}
+        return fields
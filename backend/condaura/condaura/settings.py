@@ -55,6 +55,7 @@ INSTALLED_APPS = [
     'access',
     'access_review',
     'notifications',
+    'imports',
 ]
 
 MIDDLEWARE = [
@@ -119,6 +120,10 @@ CACHES = {
     }
 }
 
+# Durée de vie du cache du tableau de bord, en secondes; il est aussi
+# invalidé à chaque écriture de campagne ou de revue
+DASHBOARD_CACHE_TIMEOUT = 30
+
 # Uncomment for Redis when installed
 # CACHES = {
 #     "default": {
@@ -209,6 +214,21 @@ INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+# Background imports
+# Jobs run in a thread of the web process by default; set to False and run
+# `python manage.py process_import_jobs --loop` to use a dedicated worker.
+IMPORT_JOBS_RUN_IN_PROCESS = True
+IMPORT_JOB_TIMEOUT = 30 * 60  # seconds without progress before a running import job is considered dead
+
+# Background reports
+# Same as imports: set to False and run `python manage.py process_report_jobs
+# --loop` to use a dedicated worker. Generated files are kept under
+# MEDIA_ROOT/reports and evicted past the size and age limits below.
+REPORT_JOBS_RUN_IN_PROCESS = True
+REPORT_CACHE_MAX_BYTES = 500 * 1024 * 1024
+REPORT_CACHE_MAX_AGE = 7 * 24 * 3600  # seconds
+REPORT_JOB_TIMEOUT = 30 * 60  # seconds before a running report job is considered dead
+
 # Celery settings
 # Uncomment for Celery with Redis when installed
 # CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/1')
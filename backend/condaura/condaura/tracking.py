@@ -0,0 +1,19 @@
+def changed_fields(instance, fields, update_fields=None):
+    """
+    Champs parmi `fields` dont la valeur en mémoire diffère de celle
+    enregistrée en base (tous pour une instance absente de la base), lus
+    en une requête. Avec `update_fields`, seuls les champs enregistrés par
+    le save() sont comparés.
+    """
+    options = instance._meta
+    if update_fields is not None:
+        saved = {options.get_field(name).name for name in update_fields}
+        fields = [name for name in fields if name in saved]
+    if not fields:
+        return set()
+
+    attnames = {name: options.get_field(name).attname for name in fields}
+    stored = type(instance)._base_manager.filter(pk=instance.pk).values(*attnames.values()).first()
+    if stored is None:
+        return set(fields)
+    return {name for name, attname in attnames.items() if stored[attname] != getattr(instance, attname)}
@@ -61,6 +61,7 @@ urlpatterns = [
     # New API Endpoints
     path('api/access_review/', include('access_review.urls')),
     path('api/', include('notifications.urls')),
+    path('api/imports/', include('imports.urls')),
 ]
 
 # Add debug toolbar URLs in development
@@ -13,6 +13,7 @@ def home(request):
             'users': '/api/users/',
             'campaigns': '/api/campaigns/',
             'access': '/api/',
+            'imports': '/api/imports/',
             'admin': '/admin/'
         }
     }) 
\ No newline at end of file
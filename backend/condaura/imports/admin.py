@@ -0,0 +1,15 @@
+from django.contrib import admin
+from .models import ImportJob, ImportJobError
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'file_name', 'rows_processed', 'rows_failed', 'created_by', 'created_at')
+    list_filter = ('kind', 'status', 'created_at')
+    search_fields = ('file_name', 'created_by__email')
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'rows_processed', 'rows_failed', 'rows_created')
+
+@admin.register(ImportJobError)
+class ImportJobErrorAdmin(admin.ModelAdmin):
+    list_display = ('job', 'row_number', 'message')
+    search_fields = ('message',)
+    raw_id_fields = ('job',)
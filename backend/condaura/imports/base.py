@@ -0,0 +1,192 @@
+import os
+import warnings
+
+import pandas as pd
+from pandas.errors import EmptyDataError, ParserError, ParserWarning
+from openpyxl import load_workbook
+
+# pyarrow n'est nécessaire que pour les fichiers Parquet
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class BaseImporter:
+    """
+    Socle commun des imports de fichiers par lots.
+
+    Le fichier (CSV, XLSX ou Parquet) est lu en flux et découpé en lots de
+    `chunk_size` lignes, chacun chargé dans un DataFrame de chaînes indexé
+    par numéro de ligne. Chaque sous-classe implémente `import_chunk`, qui
+    valide le lot de façon vectorisée avant toute écriture. Un callback
+    `on_chunk` optionnel est appelé après chaque lot pour suivre la
+    progression. Avec `dry_run`, seule la validation est effectuée.
+
+    Un fichier illisible (vide, ligne avec trop de champs...) arrête la
+    lecture: l'erreur est enregistrée comme erreur d'import et
+    `read_failed` est positionné.
+    """
+    CHUNK_SIZE = 5000
+    BATCH_SIZE = 1000
+    REQUIRED_FIELDS = []
+    FORMATS = ('.csv', '.xlsx', '.parquet')
+
+    def __init__(self, chunk_size=None, batch_size=None, on_chunk=None, dry_run=False):
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.on_chunk = on_chunk
+        self.dry_run = dry_run
+        self.rows_processed = 0
+        self.rows_failed = 0
+        self.created = 0
+        self.row_errors = []
+        self.read_failed = False
+
+    @property
+    def errors(self):
+        return [message for _, message in self.row_errors]
+
+    def add_error(self, row_number, message):
+        self.row_errors.append((row_number, message))
+        self.rows_failed += 1
+
+    def add_errors(self, messages):
+        """Enregistre les erreurs d'une série de messages indexée par numéro de ligne"""
+        messages = messages[messages != '']
+        self.row_errors.extend(zip(messages.index.tolist(), messages.tolist()))
+        self.rows_failed += len(messages)
+
+    @classmethod
+    def file_format(cls, file_name):
+        """Extension du fichier si elle est prise en charge, sinon None"""
+        extension = os.path.splitext(file_name or '')[1].lower()
+        return extension if extension in cls.FORMATS else None
+
+    def count_rows(self, uploaded_file, file_name=None):
+        """Nombre de lignes de données (hors en-tête), lu sans parser le fichier"""
+        file_format = self.file_format(file_name or getattr(uploaded_file, 'name', '')) or '.csv'
+
+        if file_format == '.parquet':
+            total = self._parquet_file(uploaded_file).metadata.num_rows
+        elif file_format == '.xlsx':
+            workbook = load_workbook(uploaded_file, read_only=True)
+            total = max((workbook.active.max_row or 1) - 1, 0)
+            workbook.close()
+        else:
+            lines = 0
+            for block in iter(lambda: uploaded_file.read(1024 * 1024), b''):
+                lines += block.count(b'\n')
+            total = max(lines - 1, 0)
+
+        uploaded_file.seek(0)
+        return total
+
+    @staticmethod
+    def _parquet_file(uploaded_file):
+        if pq is None:
+            raise ImportError("pyarrow is required to import Parquet files")
+        return pq.ParquetFile(getattr(uploaded_file, 'file', uploaded_file))
+
+    @staticmethod
+    def _as_strings(frame):
+        """Toutes les cellules en chaînes, les valeurs absentes en ''"""
+        frame = frame.astype(object).where(frame.notna(), '')
+        return frame.astype(str)
+
+    def _read_csv(self, uploaded_file):
+        # index_col=False: une virgule finale sur chaque ligne ne décale pas
+        # les colonnes vers un index implicite. Le moteur C tronque sans
+        # rien signaler une ligne avec trop de champs placée en début de
+        # lot; le moteur python la signale toujours par un ParserWarning,
+        # traité ici comme une erreur de lecture
+        with pd.read_csv(getattr(uploaded_file, 'file', uploaded_file), chunksize=self.chunk_size, dtype=str, index_col=False,
+                         keep_default_na=False, encoding='utf-8-sig', engine='python') as reader:
+            while True:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('error', ParserWarning)
+                    frame = next(reader, None)
+                if frame is None:
+                    return
+                yield frame
+
+    def _read_xlsx(self, uploaded_file):
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(value) if value is not None else '' for value in next(rows, [])]
+            chunk = []
+            for values in rows:
+                chunk.append(values[:len(header)])
+                if len(chunk) == self.chunk_size:
+                    yield pd.DataFrame(chunk, columns=header)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=header)
+        finally:
+            workbook.close()
+
+    def _read_parquet(self, uploaded_file):
+        for batch in self._parquet_file(uploaded_file).iter_batches(batch_size=self.chunk_size):
+            yield batch.to_pandas()
+
+    def read_chunks(self, uploaded_file, file_name=None):
+        """Génère des DataFrames indexés par numéro de ligne du fichier"""
+        file_format = self.file_format(file_name or getattr(uploaded_file, 'name', '')) or '.csv'
+        reader = {
+            '.csv': self._read_csv,
+            '.xlsx': self._read_xlsx,
+            '.parquet': self._read_parquet,
+        }[file_format]
+
+        # La ligne 1 est l'en-tête
+        next_row_number = 2
+        try:
+            for frame in reader(uploaded_file):
+                frame = self._as_strings(frame)
+                frame.index = pd.RangeIndex(next_row_number, next_row_number + len(frame))
+                next_row_number += len(frame)
+                yield frame
+        except (ParserError, EmptyDataError, ParserWarning) as error:
+            self.read_failed = True
+            self.add_error(next_row_number, f"Error reading file: {error}")
+
+    def missing_fields_errors(self, frame):
+        """Message 'Row missing required fields' pour chaque ligne incomplète"""
+        missing = pd.DataFrame({
+            field: frame[field].str.strip() == '' if field in frame.columns else True
+            for field in self.REQUIRED_FIELDS
+        }, index=frame.index)
+        messages = pd.Series('', index=frame.index)
+        incomplete = missing.any(axis=1)
+        if incomplete.any():
+            fields = missing[incomplete].dot(pd.Index(self.REQUIRED_FIELDS) + ', ').str.rstrip(', ')
+            messages[incomplete] = 'Row missing required fields: ' + fields
+        return messages
+
+    @staticmethod
+    def flag(errors, mask, messages):
+        """Renseigne le message des lignes de `mask` qui n'ont pas encore d'erreur"""
+        target = (errors == '') & mask
+        errors[target] = messages[target]
+
+    def run(self, uploaded_file, file_name=None):
+        for frame in self.read_chunks(uploaded_file, file_name):
+            self.import_chunk(frame)
+            self.rows_processed += len(frame)
+            if self.on_chunk:
+                self.on_chunk(self)
+        self.finalize()
+        # Remonte aussi les erreurs éventuelles de finalize
+        if self.on_chunk and self.row_errors:
+            self.on_chunk(self)
+        return self.get_result()
+
+    def import_chunk(self, frame):
+        raise NotImplementedError
+
+    def finalize(self):
+        """Traitement éventuel après le dernier lot"""
+
+    def get_result(self):
+        raise NotImplementedError
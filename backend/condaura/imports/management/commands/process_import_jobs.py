@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from imports.services import ImportJobService
+
+
+class Command(BaseCommand):
+    help = "Exécute les imports en attente (worker adossé à la base de données)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Continuer à interroger la file d'attente")
+        parser.add_argument('--interval', type=float, default=5, help="Délai entre deux interrogations, en secondes")
+        parser.add_argument('--limit', type=int, default=None, help="Nombre maximum de jobs par passage")
+
+    def handle(self, *args, **options):
+        while True:
+            failed = ImportJobService.fail_stale()
+            if failed:
+                self.stdout.write(self.style.WARNING(f"{failed} import(s) abandonné(s) passé(s) en échec"))
+            processed = ImportJobService.process_queued(limit=options['limit'], fail_stale=False)
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f"{processed} import(s) traité(s)"))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:00
+
+from django.db import migrations, models
+
+
+def backfill_heartbeat(apps, schema_editor):
+    """Les jobs déjà en cours n'ont pas de progression enregistrée: leur début en tient lieu"""
+    ImportJob = apps.get_model('imports', 'ImportJob')
+    ImportJob.objects.using(schema_editor.connection.alias).filter(
+        status='running', heartbeat_at__isnull=True
+    ).update(heartbeat_at=models.F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text="Dernière progression d'un job en cours", null=True),
+        ),
+        migrations.RunPython(backfill_heartbeat, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+from django.db import models
+from django.utils import timezone
+from users.models import User
+
+class ImportJob(models.Model):
+    """Import de fichier exécuté en arrière-plan"""
+    KIND_CHOICES = (
+        ('users', 'Users'),
+        ('access', 'Access'),
+    )
+
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    file = models.FileField(upload_to='imports/%Y/%m/', blank=True)
+    file_name = models.CharField(max_length=255)
+    options = models.JSONField(default=dict, blank=True)
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    rows_created = models.PositiveIntegerField(default=0)
+    result = models.JSONField(default=dict, blank=True)
+    error_message = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='import_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Dernière progression d'un job en cours")
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} import #{self.id} ({self.status})"
+
+    class Meta:
+        verbose_name = 'Import Job'
+        verbose_name_plural = 'Import Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    @property
+    def elapsed_seconds(self):
+        if not self.started_at:
+            return 0
+        return ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+
+    @property
+    def throughput(self):
+        """Lignes traitées par seconde"""
+        elapsed = self.elapsed_seconds
+        if not elapsed:
+            return 0
+        return round(self.rows_processed / elapsed, 1)
+
+    @property
+    def eta_seconds(self):
+        """Temps restant estimé, en secondes"""
+        if self.status != 'running' or not self.total_rows:
+            return None
+        throughput = self.throughput
+        if not throughput:
+            return None
+        remaining = max(self.total_rows - self.rows_processed, 0)
+        return int(remaining / throughput)
+
+class ImportJobError(models.Model):
+    """Erreur de ligne d'un import, stockée à part pour être paginée"""
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='row_errors')
+    row_number = models.PositiveIntegerField(null=True, blank=True)
+    message = models.TextField()
+
+    def __str__(self):
+        return f"#{self.job_id} row {self.row_number}: {self.message}"
+
+    class Meta:
+        verbose_name = 'Import Job Error'
+        verbose_name_plural = 'Import Job Errors'
+        ordering = ['id']
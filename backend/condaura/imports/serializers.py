@@ -0,0 +1,21 @@
+from rest_framework import serializers
+from .models import ImportJob, ImportJobError
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    throughput = serializers.FloatField(read_only=True)
+    eta_seconds = serializers.IntegerField(read_only=True)
+    error_count = serializers.IntegerField(source='rows_failed', read_only=True)
+    
+    class Meta:
+        model = ImportJob
+        fields = ['id', 'kind', 'status', 'file_name', 'options', 'total_rows',
+                  'rows_processed', 'rows_failed', 'rows_created', 'error_count',
+                  'throughput', 'eta_seconds', 'result', 'error_message',
+                  'created_by', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+class ImportJobErrorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJobError
+        fields = ['id', 'row_number', 'message']
+        read_only_fields = fields
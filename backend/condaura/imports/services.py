@@ -0,0 +1,155 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ImportJob, ImportJobError
+
+IMPORTERS = {
+    'users': 'users.imports.UserImporter',
+    'access': 'access.imports.AccessImporter',
+}
+
+class ImportJobService:
+    @staticmethod
+    def create_job(kind, uploaded_file, user, options=None):
+        """
+        Enregistre le fichier et crée le job en file d'attente.
+        Le job est lancé après le commit de la transaction courante.
+        """
+        job = ImportJob(
+            kind=kind,
+            file_name=uploaded_file.name,
+            options=options or {},
+            created_by=user
+        )
+        job.file.save(uploaded_file.name, uploaded_file, save=False)
+        job.save()
+
+        transaction.on_commit(lambda: ImportJobService.dispatch(job.id))
+        return job
+
+    @staticmethod
+    def dispatch(job_id):
+        """
+        Lance le job dans un thread du processus courant si
+        IMPORT_JOBS_RUN_IN_PROCESS est actif; sinon il reste en file
+        pour la commande process_import_jobs.
+        """
+        if not getattr(settings, 'IMPORT_JOBS_RUN_IN_PROCESS', True):
+            return
+        thread = threading.Thread(target=ImportJobService._run_in_thread, args=(job_id,), daemon=True)
+        thread.start()
+
+    @staticmethod
+    def _run_in_thread(job_id):
+        try:
+            ImportJobService.run_job(job_id)
+        finally:
+            connections.close_all()
+
+    @staticmethod
+    def claim(job_id):
+        """Passe le job à 'running' si personne ne l'a déjà pris"""
+        now = timezone.now()
+        return ImportJob.objects.filter(id=job_id, status='queued').update(
+            status='running',
+            started_at=now,
+            heartbeat_at=now
+        ) == 1
+
+    @staticmethod
+    def fail_stale():
+        """
+        Passe en échec les jobs 'running' sans progression depuis plus de
+        IMPORT_JOB_TIMEOUT secondes: le thread ou le worker qui les
+        exécutait a disparu. Contrairement aux rapports, ils ne sont pas
+        remis en file: les lots déjà importés sont validés, et relancer
+        l'import compterait une seconde fois leurs lignes et leurs erreurs.
+        Renvoie le nombre de jobs passés en échec.
+        """
+        cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'IMPORT_JOB_TIMEOUT', 30 * 60))
+        stale = ImportJob.objects.filter(status='running', heartbeat_at__lt=cutoff)
+        failed = 0
+        for job in stale:
+            # Le fichier source n'est plus utile, comme pour un job terminé
+            job.file.delete(save=False)
+            failed += ImportJob.objects.filter(id=job.id, status='running', heartbeat_at__lt=cutoff).update(
+                status='failed',
+                error_message="Import interrompu: aucune progression depuis le dernier lot",
+                finished_at=timezone.now(),
+                file=''
+            )
+        return failed
+
+    @staticmethod
+    def run_job(job_id):
+        """
+        Exécute un job en file d'attente. Les compteurs et les erreurs
+        sont enregistrés après chaque lot pour suivre la progression.
+        """
+        if not ImportJobService.claim(job_id):
+            return None
+
+        job = ImportJob.objects.get(id=job_id)
+        importer_class = import_string(IMPORTERS[job.kind])
+
+        def flush_progress(importer):
+            if importer.row_errors:
+                ImportJobError.objects.bulk_create([
+                    ImportJobError(job_id=job.id, row_number=row_number, message=message)
+                    for row_number, message in importer.row_errors
+                ], batch_size=importer.batch_size)
+                importer.row_errors.clear()
+
+            ImportJob.objects.filter(id=job.id).update(
+                rows_processed=importer.rows_processed,
+                rows_failed=importer.rows_failed,
+                rows_created=importer.created,
+                heartbeat_at=timezone.now()
+            )
+
+        importer = importer_class(on_chunk=flush_progress, **job.options)
+
+        try:
+            with job.file.open('rb') as uploaded_file:
+                job.total_rows = importer.count_rows(uploaded_file, job.file_name)
+                job.save(update_fields=['total_rows'])
+
+                result = importer.run(uploaded_file, job.file_name)
+
+            job.status = 'completed'
+            job.result = {key: value for key, value in result.items() if key != 'errors'}
+        except Exception as e:
+            job.status = 'failed'
+            job.error_message = str(e)
+
+        job.refresh_from_db(fields=['rows_processed', 'rows_failed', 'rows_created'])
+        job.finished_at = timezone.now()
+
+        # Le fichier source n'est plus utile une fois le job terminé
+        job.file.delete(save=False)
+        job.save(update_fields=['status', 'result', 'error_message', 'finished_at', 'file'])
+
+        return job
+
+    @staticmethod
+    def process_queued(limit=None, fail_stale=True):
+        """
+        Exécute les jobs en attente, du plus ancien au plus récent, après
+        avoir passé en échec les jobs abandonnés (sauf `fail_stale=False`)
+        """
+        if fail_stale:
+            ImportJobService.fail_stale()
+        job_ids = ImportJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True)
+        if limit:
+            job_ids = job_ids[:limit]
+
+        processed = 0
+        for job_id in list(job_ids):
+            if ImportJobService.run_job(job_id):
+                processed += 1
+        return processed
@@ -0,0 +1,149 @@
+import datetime
+import io
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.urls import reverse
+
+from .models import ImportJob
+from .services import ImportJobService
+from access.models import Access
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMPORT_JOBS_RUN_IN_PROCESS=False)
+class ImportJobTests(TestCase):
+    """Tests pour les imports en arrière-plan"""
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        self.user = User.objects.create_user(
+            username='user@example.com',
+            email='user@example.com',
+            password='password123',
+            user_id='USER001',
+            department='IT'
+        )
+        
+        self.client.force_authenticate(user=self.admin)
+    
+    def build_access_csv(self, valid_rows, invalid_rows=0):
+        today = timezone.now().date().isoformat()
+        lines = ['access_id,user_id,resource_name,layer,profile,granted_date']
+        lines += [f'ACCESS{i:04d},USER001,Resource {i},Application,Read,{today}' for i in range(valid_rows)]
+        lines += [f'BAD{i:04d},UNKNOWN,Resource {i},Application,Read,{today}' for i in range(invalid_rows)]
+        upload = io.BytesIO(('\n'.join(lines) + '\n').encode('utf-8'))
+        upload.name = 'accesses.csv'
+        return upload
+    
+    def test_upload_returns_job_immediately(self):
+        """Test que l'upload renvoie un job sans traiter le fichier"""
+        response = self.client.post(reverse('access-import-csv'), {'file': self.build_access_csv(3)}, format='multipart')
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = ImportJob.objects.get(id=response.data['job_id'])
+        self.assertEqual(job.status, 'queued')
+        self.assertEqual(job.kind, 'access')
+        self.assertEqual(response.data['status_url'], reverse('importjob-detail', args=[job.id]))
+        self.assertEqual(Access.objects.count(), 0)
+    
+    def test_run_job_reports_progress_and_paged_errors(self):
+        """Test l'exécution d'un job: compteurs, débit et erreurs paginées"""
+        response = self.client.post(reverse('access-import-csv'), {'file': self.build_access_csv(5, invalid_rows=12)}, format='multipart')
+        job_id = response.data['job_id']
+        
+        job = ImportJobService.run_job(job_id)
+        
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(Access.objects.count(), 5)
+        
+        response = self.client.get(reverse('importjob-detail', args=[job_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_rows'], 17)
+        self.assertEqual(response.data['rows_processed'], 17)
+        self.assertEqual(response.data['rows_failed'], 12)
+        self.assertEqual(response.data['rows_created'], 5)
+        self.assertEqual(response.data['result'], {'access_created': 5})
+        self.assertIsNone(response.data['eta_seconds'])
+        
+        response = self.client.get(reverse('importjob-errors', args=[job_id]))
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][0]['row_number'], 7)
+        self.assertEqual(response.data['results'][0]['message'], 'User with ID UNKNOWN not found')
+    
+    def test_job_cannot_run_twice(self):
+        """Test qu'un job déjà pris n'est pas réexécuté"""
+        response = self.client.post(reverse('access-import-csv'), {'file': self.build_access_csv(1)}, format='multipart')
+        job_id = response.data['job_id']
+        
+        self.assertIsNotNone(ImportJobService.run_job(job_id))
+        self.assertIsNone(ImportJobService.run_job(job_id))
+    
+    def test_process_import_jobs_command(self):
+        """Test le worker en ligne de commande"""
+        self.client.post(reverse('access-import-csv'), {'file': self.build_access_csv(2)}, format='multipart')
+        
+        users_csv = io.BytesIO(b'user_id,email,first_name,last_name\nUSER002,new@example.com,New,User\n')
+        users_csv.name = 'users.csv'
+        self.client.post(reverse('user-import-csv'), {'file': users_csv}, format='multipart')
+        
+        call_command('process_import_jobs', stdout=io.StringIO())
+        
+        self.assertFalse(ImportJob.objects.exclude(status='completed').exists())
+        self.assertEqual(Access.objects.count(), 2)
+        self.assertTrue(User.objects.filter(user_id='USER002').exists())
+    
+    def test_stale_running_job_fails(self):
+        """Test qu'un job sans progression au-delà de IMPORT_JOB_TIMEOUT passe en échec"""
+        response = self.client.post(reverse('access-import-csv'), {'file': self.build_access_csv(1)}, format='multipart')
+        job_id = response.data['job_id']
+        self.assertTrue(ImportJobService.claim(job_id))
+        
+        # Worker encore dans les temps
+        self.assertEqual(ImportJobService.fail_stale(), 0)
+        
+        ImportJob.objects.filter(id=job_id).update(heartbeat_at=timezone.now() - datetime.timedelta(hours=1))
+        output = io.StringIO()
+        call_command('process_import_jobs', stdout=output)
+        
+        job = ImportJob.objects.get(id=job_id)
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(job.file)
+        self.assertIn('1 import(s) abandonné(s)', output.getvalue())
+        self.assertIsNone(ImportJobService.run_job(job_id))
+        
+        # process_queued passe aussi les jobs abandonnés en échec
+        ImportJob.objects.filter(id=job_id).update(status='running')
+        self.assertEqual(ImportJobService.process_queued(), 0)
+        self.assertEqual(ImportJob.objects.get(id=job_id).status, 'failed')
+    
+    def test_import_jobs_are_admin_only(self):
+        """Test que seuls les admins consultent les imports"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('importjob-list'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
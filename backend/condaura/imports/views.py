@@ -0,0 +1,46 @@
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.urls import reverse
+
+from .models import ImportJob
+from .serializers import ImportJobSerializer, ImportJobErrorSerializer
+from .services import ImportJobService
+
+def import_flag(request, name):
+    """Lit un booléen passé en query string ou dans le formulaire d'upload"""
+    value = request.query_params.get(name) or request.data.get(name) or ''
+    return str(value).lower() in ('1', 'true', 'yes')
+
+def wants_sync_import(request):
+    """True si le client demande l'ancien import synchrone (?sync=true)"""
+    return import_flag(request, 'sync')
+
+def queue_import(request, kind, uploaded_file, options=None):
+    """Crée un job d'import et renvoie immédiatement son identifiant"""
+    job = ImportJobService.create_job(kind, uploaded_file, request.user, options)
+    return Response({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': reverse('importjob-detail', args=[job.id])
+    }, status=status.HTTP_202_ACCEPTED)
+
+class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    permission_classes = [permissions.IsAdminUser]
+    filterset_fields = ['kind', 'status']
+    
+    @action(detail=True, methods=['get'])
+    def errors(self, request, pk=None):
+        """Get the row errors of an import, page by page"""
+        job = self.get_object()
+        errors = job.row_errors.all()
+        
+        page = self.paginate_queryset(errors)
+        if page is not None:
+            serializer = ImportJobErrorSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = ImportJobErrorSerializer(errors, many=True)
+        return Response(serializer.data)
@@ -4,6 +4,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from users.models import Notification
 from users.serializers import NotificationSerializer
+from condaura.pagination import KeysetPagination
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -11,6 +12,8 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         """
@@ -0,0 +1,200 @@
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+
+from .models import User
+from .services import NotificationService
+from imports.base import BaseImporter
+
+
+class UserImporter(BaseImporter):
+    """
+    Importe des utilisateurs depuis un fichier (CSV, XLSX ou Parquet) par
+    lots: chaque lot est validé avec une seule requête IN sur user_id /
+    email / username, puis écrit avec bulk_create dans une transaction.
+
+    Le mot de passe par défaut n'est haché qu'une fois par import et le
+    même hash est réutilisé pour tous les comptes créés: PBKDF2 coûte
+    environ 100 ms par appel, ce qui dominait le temps d'import.
+
+    Les managers sont résolus en deux passes: les liens email -> manager
+    sont collectés pendant l'import, puis `finalize` construit le graphe
+    en mémoire, écarte les cycles et fixe tous les manager_id avec un seul
+    bulk_update. Le résultat ne dépend donc pas de l'ordre des lignes.
+    """
+    REQUIRED_FIELDS = ['user_id', 'email', 'first_name', 'last_name']
+    DEFAULT_PASSWORD = 'ChangeMe123!'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._seen_user_ids = set()
+        self._seen_emails = set()
+        self._password_hash = None
+        # email -> (numéro de ligne, email du manager) des lignes valides
+        self._manager_links = {}
+        # email -> id des utilisateurs créés
+        self._created_ids = {}
+
+    @property
+    def password_hash(self):
+        """Hash du mot de passe par défaut, calculé une seule fois"""
+        if self._password_hash is None:
+            self._password_hash = make_password(self.DEFAULT_PASSWORD)
+        return self._password_hash
+
+    def get_result(self):
+        """Résultat au format historique de l'API"""
+        result = {
+            'users_created': self.created,
+            'errors': self.errors
+        }
+        if self.dry_run:
+            result['dry_run'] = True
+        return result
+
+    def validate_chunk(self, frame):
+        """
+        Valide un lot de façon vectorisée, sans écriture: champs
+        obligatoires, doublons dans le fichier et utilisateurs existants
+        (une seule requête IN sur user_id / email / username).
+        Les emails sont normalisés comme le fait create_user.
+        """
+        for column in ('department', 'manager_email'):
+            if column not in frame.columns:
+                frame = frame.assign(**{column: ''})
+
+        errors = self.missing_fields_errors(frame)
+        if (errors != '').all():
+            self.add_errors(errors)
+            return frame.iloc[0:0]
+
+        frame = frame.assign(
+            email=frame['email'].map(User.objects.normalize_email),
+            manager_email=frame['manager_email'].str.strip().map(User.objects.normalize_email)
+        )
+        user_ids = frame['user_id']
+        emails = frame['email']
+        complete = errors == ''
+
+        # Le username est l'email: il doit aussi être libre
+        candidate_emails = emails[complete].unique().tolist()
+        existing = User.objects.filter(
+            Q(user_id__in=user_ids[complete].unique().tolist())
+            | Q(email__in=candidate_emails)
+            | Q(username__in=candidate_emails)
+        ).values_list('user_id', 'email', 'username')
+        existing_user_ids = {user_id for user_id, _, _ in existing}
+        existing_emails = {email for _, email, _ in existing} | {username for _, _, username in existing}
+
+        duplicated = (
+            user_ids.duplicated(keep='first') | emails.duplicated(keep='first')
+            | user_ids.isin(self._seen_user_ids) | emails.isin(self._seen_emails)
+            | user_ids.isin(existing_user_ids) | emails.isin(existing_emails)
+        )
+        self.flag(errors, duplicated, 'User with ID ' + user_ids + ' or email ' + emails + ' already exists')
+
+        self._seen_user_ids.update(user_ids[complete].tolist())
+        self._seen_emails.update(emails[complete].tolist())
+
+        self.add_errors(errors)
+        return frame[errors == '']
+
+    def import_chunk(self, frame):
+        """Valide puis écrit un lot d'utilisateurs"""
+        frame = self.validate_chunk(frame)
+        if frame.empty:
+            return
+
+        for row_number, email, manager_email in zip(frame.index, frame['email'], frame['manager_email']):
+            if manager_email:
+                self._manager_links[email] = (row_number, manager_email)
+
+        if self.dry_run:
+            self.created += len(frame)
+            return
+
+        password = self.password_hash
+        users = [
+            User(
+                username=User.normalize_username(email),
+                email=email,
+                first_name=first_name,
+                last_name=last_name,
+                user_id=user_id,
+                department=department,
+                password=password
+            )
+            for user_id, email, first_name, last_name, department in zip(
+                frame['user_id'], frame['email'], frame['first_name'],
+                frame['last_name'], frame['department']
+            )
+        ]
+
+        with transaction.atomic():
+            users = User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.created += len(users)
+        self._created_ids.update((user.email, user.id) for user in users)
+
+        # Notifications de bienvenue, créées en une requête
+        NotificationService.create_bulk_notifications(
+            users,
+            'system',
+            'Bienvenue sur Condaura',
+            lambda user: f'Bonjour {user.first_name}, bienvenue sur la plateforme Condaura ! Veuillez changer votre mot de passe par défaut.',
+            '/profile/change-password',
+            True  # Envoyer un email
+        )
+
+    @staticmethod
+    def find_cycles(links):
+        """
+        Emails des utilisateurs pris dans un cycle de managers.
+        `links` associe chaque email à l'email de son manager.
+        """
+        in_cycle = set()
+        state = {}  # email -> 'visiting' ou 'done'
+
+        for start in links:
+            path = []
+            email = start
+            while email in links and email not in state:
+                state[email] = 'visiting'
+                path.append(email)
+                email = links[email]
+            # On est revenu sur le chemin courant: sa fin forme un cycle
+            if state.get(email) == 'visiting':
+                in_cycle.update(path[path.index(email):])
+            for visited in path:
+                state[visited] = 'done'
+
+        return in_cycle
+
+    def finalize(self):
+        """Seconde passe: rattache les managers de tous les utilisateurs importés"""
+        links = {email: manager_email for email, (_, manager_email) in self._manager_links.items()}
+        if not links:
+            return
+
+        for email in sorted(self.find_cycles(links), key=lambda email: self._manager_links[email][0]):
+            row_number, manager_email = self._manager_links[email]
+            self.add_error(row_number, f"Manager cycle detected for {email} (manager {manager_email}); manager not set")
+            del links[email]
+
+        # Managers hors fichier: recherchés en base par lots
+        manager_ids = dict(self._created_ids)
+        external = sorted({manager_email for manager_email in links.values() if manager_email not in manager_ids})
+        for start in range(0, len(external), self.batch_size):
+            manager_ids.update(
+                User.objects.filter(email__in=external[start:start + self.batch_size]).values_list('email', 'id')
+            )
+
+        if self.dry_run:
+            return
+
+        users = [
+            User(id=self._created_ids[email], manager_id=manager_ids[manager_email])
+            for email, manager_email in links.items()
+            if email in self._created_ids and manager_email in manager_ids
+        ]
+        with transaction.atomic():
+            User.objects.bulk_update(users, ['manager'], batch_size=self.batch_size)
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+
+from condaura.tracking import changed_fields
 
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -16,9 +18,42 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='back_office')
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Champs repris dans les documents de recherche des accès et des revues
+    SEARCH_FIELDS = {'first_name', 'last_name', 'department'}
+    # Champs repris dans les rapports de campagne (titulaire ou réviseur)
+    REPORT_FIELDS = SEARCH_FIELDS | {'email', 'user_id'}
+    
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
     
+    def save(self, *args, **kwargs):
+        # Sans changement des champs indexés ou repris dans les rapports
+        # (changement de mot de passe, dernière connexion...), rien à faire
+        changed = set() if self._state.adding else changed_fields(self, self.REPORT_FIELDS, kwargs.get('update_fields'))
+        if not changed:
+            return super().save(*args, **kwargs)
+        
+        # Import local: access.models importe ce module
+        from access.models import Access, Review
+        with transaction.atomic():
+            if 'department' in changed:
+                # Les statistiques des revues sont groupées par département
+                Review.objects.filter(access__user=self).moving_rollup(
+                    lambda: super(User, self).save(*args, **kwargs), department=self.department
+                )
+            else:
+                super().save(*args, **kwargs)
+            if self.SEARCH_FIELDS & changed:
+                Access.objects.refresh_search(Access.objects.filter(user=self).values('pk'), bump=False)
+            # Les rapports en cache des campagnes où l'utilisateur est réviseur
+            # ou titulaire d'un accès sont périmés; pour ces dernières, le
+            # déplacement des statistiques a déjà changé la révision
+            if 'department' in changed:
+                reviews = Review.objects.filter(reviewer=self)
+            else:
+                reviews = Review.objects.filter(models.Q(access__user=self) | models.Q(reviewer=self))
+            reviews.campaign_model.bump_revision(reviews.values('campaign_id'))
+    
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
@@ -50,3 +85,7 @@ class Notification(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Notification'
         verbose_name_plural = 'Notifications'
+        indexes = [
+            # Pagination par clé des notifications d'un utilisateur
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_keyset_idx'),
+        ]
@@ -2,12 +2,17 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from .models import Notification
+from condaura.serializers import SparseFieldsetMixin
 
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     manager_name = serializers.SerializerMethodField(read_only=True)
     
+    field_columns = {
+        'manager_name': ('manager__first_name', 'manager__last_name'),
+    }
+    
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 
@@ -1,6 +1,6 @@
 from django.utils import timezone
 from django.db.models import Q
-from django.core.mail import send_mail
+from django.core.mail import send_mail, send_mass_mail
 from django.conf import settings
 
 from .models import User, Notification
@@ -39,6 +39,37 @@ class NotificationService:
         except Exception:
             return None
     
+    @staticmethod
+    def create_bulk_notifications(users, notification_type, title, message, link='', send_email=False):
+        """
+        Crée la même notification pour plusieurs utilisateurs en une requête
+        `message` peut être une fonction recevant l'utilisateur
+        Les emails éventuels partagent une seule connexion SMTP
+        """
+        try:
+            render = message if callable(message) else (lambda user: message)
+            notifications = Notification.objects.bulk_create([
+                Notification(
+                    user=user,
+                    type=notification_type,
+                    title=title,
+                    message=render(user),
+                    link=link
+                )
+                for user in users
+            ])
+            
+            if send_email and settings.EMAIL_BACKEND:
+                send_mass_mail(
+                    [(title, notification.message, settings.DEFAULT_FROM_EMAIL, [notification.user.email])
+                     for notification in notifications],
+                    fail_silently=True,
+                )
+            
+            return notifications
+        except Exception:
+            return []
+    
     @staticmethod
     def create_campaign_notifications(campaign, notification_type, title, message, link='', send_email=False):
         """
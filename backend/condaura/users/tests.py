@@ -1,8 +1,14 @@
+import csv
+import io
+from unittest import mock
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core import mail
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
+from .imports import UserImporter
 from .models import Notification
 
 User = get_user_model()
@@ -222,6 +228,20 @@ class NotificationAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 3)
     
+    def test_user_notifications_keyset_pagination(self):
+        """Test la pagination par clé des notifications de l'utilisateur courant"""
+        url = reverse('user-notifications')
+        with mock.patch('condaura.pagination.KeysetPagination.page_size', 2):
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, status.HTTP_200_OK)
+            self.assertEqual(first.data['count'], 3)
+            self.assertIn('cursor=', first.data['next'])
+            second = self.client.get(first.data['next'])
+        
+        titles = [row['title'] for row in first.data['results'] + second.data['results']]
+        self.assertEqual(titles, ['Notification 3', 'Notification 2', 'Notification 1'])
+        self.assertIsNone(second.data['next'])
+    
     def test_mark_notification_read(self):
         """Test le marquage d'une notification comme lue"""
         notification = Notification.objects.first()
@@ -241,3 +261,124 @@ class NotificationAPITests(TestCase):
         
         # Vérifier que toutes les notifications sont marquées comme lues
         self.assertEqual(Notification.objects.filter(is_read=True).count(), 3)
+
+
+class UserImportTests(TestCase):
+    """Tests pour l'import en masse des utilisateurs"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        
+        self.admin_user = User.objects.create_user(
+            username='admin@example.com',
+            email='admin@example.com',
+            password='password123',
+            user_id='ADMIN001',
+            role='admin',
+            is_staff=True
+        )
+        
+        self.client.force_authenticate(user=self.admin_user)
+    
+    def build_csv(self, rows):
+        csv_file = io.StringIO()
+        writer = csv.writer(csv_file)
+        writer.writerow(['user_id', 'email', 'first_name', 'last_name', 'department', 'manager_email'])
+        writer.writerows(rows)
+        upload = io.BytesIO(csv_file.getvalue().encode('utf-8'))
+        upload.name = 'users.csv'
+        return upload
+    
+    def import_csv(self, upload, dry_run=False):
+        url = reverse('user-import-csv') + '?sync=true'
+        if dry_run:
+            url += '&dry_run=true'
+        return self.client.post(url, {'file': upload}, format='multipart')
+    
+    def test_import_creates_users_with_default_password(self):
+        """Test l'import: création en masse, mot de passe par défaut et notifications"""
+        upload = self.build_csv([
+            ['USER001', 'alice@Example.COM', 'Alice', 'Martin', 'IT', 'admin@example.com'],
+            ['USER002', 'bob@example.com', 'Bob', 'Durand', 'HR', ''],
+            ['ADMIN001', 'other@example.com', 'Dup', 'Id', '', ''],
+            ['USER003', 'bob@example.com', 'Dup', 'Email', '', ''],
+        ])
+        
+        response = self.import_csv(upload)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['users_created'], 2)
+        self.assertEqual(len(response.data['errors']), 2)
+        
+        alice = User.objects.get(user_id='USER001')
+        bob = User.objects.get(user_id='USER002')
+        self.assertEqual(alice.email, 'alice@example.com')
+        self.assertEqual(alice.username, 'alice@example.com')
+        self.assertEqual(alice.manager, self.admin_user)
+        self.assertIsNone(bob.manager)
+        
+        # Un seul hash partagé, toujours valide pour le mot de passe par défaut
+        self.assertEqual(alice.password, bob.password)
+        self.assertTrue(alice.check_password('ChangeMe123!'))
+        
+        self.assertEqual(Notification.objects.filter(user__in=[alice, bob], type='system').count(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+    
+    def test_import_query_count_is_independent_of_row_count(self):
+        """Test que le nombre de requêtes ne dépend pas du nombre de lignes"""
+        upload = self.build_csv([
+            [f'USER{i:03d}', f'user{i}@example.com', 'First', 'Last', 'IT', 'admin@example.com']
+            for i in range(50)
+        ])
+        
+        # Lot: existants, savepoint, insertion, savepoint, notifications
+        # Seconde passe: managers hors fichier, savepoint, bulk_update, savepoint
+        with self.assertNumQueries(9):
+            result = UserImporter().run(upload)
+        
+        self.assertEqual(result['users_created'], 50)
+        self.assertEqual(User.objects.filter(manager=self.admin_user).count(), 50)
+    
+    def test_import_links_managers_regardless_of_row_order(self):
+        """Test le rattachement d'un manager défini plus loin dans le fichier"""
+        upload = self.build_csv([
+            ['USER001', 'alice@example.com', 'Alice', 'Martin', 'IT', 'bob@example.com'],
+            ['USER002', 'bob@example.com', 'Bob', 'Durand', 'IT', 'carol@example.com'],
+            ['USER003', 'carol@example.com', 'Carol', 'Petit', 'IT', 'admin@EXAMPLE.com'],
+        ])
+        
+        result = UserImporter(chunk_size=1).run(upload)
+        
+        self.assertEqual(result['errors'], [])
+        managers = dict(User.objects.filter(user_id__startswith='USER').values_list('user_id', 'manager__user_id'))
+        self.assertEqual(managers, {'USER001': 'USER002', 'USER002': 'USER003', 'USER003': 'ADMIN001'})
+    
+    def test_import_reports_manager_cycles(self):
+        """Test qu'un cycle de managers est signalé et n'est pas écrit"""
+        upload = self.build_csv([
+            ['USER001', 'alice@example.com', 'Alice', 'Martin', 'IT', 'bob@example.com'],
+            ['USER002', 'bob@example.com', 'Bob', 'Durand', 'IT', 'alice@example.com'],
+            ['USER003', 'carol@example.com', 'Carol', 'Petit', 'IT', 'alice@example.com'],
+            ['USER004', 'dave@example.com', 'Dave', 'Roux', 'IT', 'dave@example.com'],
+        ])
+        
+        result = UserImporter().run(upload)
+        
+        self.assertEqual(result['users_created'], 4)
+        self.assertEqual(len(result['errors']), 3)
+        self.assertTrue(all('Manager cycle detected' in error for error in result['errors']))
+        managers = dict(User.objects.filter(user_id__startswith='USER').values_list('user_id', 'manager__user_id'))
+        self.assertEqual(managers, {'USER001': None, 'USER002': None, 'USER003': 'USER001', 'USER004': None})
+    
+    def test_import_dry_run(self):
+        """Test l'import à blanc: validation sans écriture"""
+        upload = self.build_csv([
+            ['USER001', 'alice@example.com', 'Alice', 'Martin', 'IT', ''],
+        ])
+        
+        response = self.import_csv(upload, dry_run=True)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['users_created'], 1)
+        self.assertTrue(response.data['dry_run'])
+        self.assertFalse(User.objects.filter(user_id='USER001').exists())
@@ -4,8 +4,6 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django.db.models import Q
-import csv
-import io
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from .serializers import (
@@ -17,6 +15,9 @@ from .serializers import (
 )
 from .models import Notification
 from .services import NotificationService
+from .imports import UserImporter
+from imports.views import import_flag, queue_import, wants_sync_import
+from condaura.pagination import KeysetPagination
 
 User = get_user_model()
 
@@ -45,12 +46,11 @@ class UserViewSet(viewsets.ModelViewSet):
     def notifications(self, request):
         """Get current user notifications"""
         notifications = Notification.objects.filter(user=request.user)
-        page = self.paginate_queryset(notifications)
-        if page is not None:
-            serializer = NotificationSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = NotificationSerializer(notifications, many=True)
-        return Response(serializer.data)
+        # Keyset pagination, same ordering as the notifications API
+        paginator = KeysetPagination(ordering=NotificationViewSet.keyset_ordering)
+        page = paginator.paginate_queryset(notifications, request, view=self)
+        serializer = NotificationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['post'])
     def mark_notification_read(self, request):
@@ -82,72 +82,25 @@ class UserViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def import_csv(self, request):
-        """Import users from CSV file"""
+        """
+        Import users from a CSV, XLSX or Parquet file.
+        
+        dry_run=true only validates the file and reports what would be written.
+        """
         if 'file' not in request.FILES:
             return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
         
-        csv_file = request.FILES['file']
-        if not csv_file.name.endswith('.csv'):
-            return Response({'error': 'File is not CSV'}, status=status.HTTP_400_BAD_REQUEST)
+        upload = request.FILES['file']
+        if not UserImporter.file_format(upload.name):
+            return Response({'error': 'File must be CSV, XLSX or Parquet'}, status=status.HTTP_400_BAD_REQUEST)
         
-        decoded_file = csv_file.read().decode('utf-8')
-        csv_data = csv.DictReader(io.StringIO(decoded_file))
+        options = {'dry_run': import_flag(request, 'dry_run')}
         
-        users_created = 0
-        errors = []
+        if wants_sync_import(request):
+            result = UserImporter(**options).run(upload)
+            return Response(result, status=status.HTTP_200_OK)
         
-        for row in csv_data:
-            try:
-                # Check for required fields
-                required_fields = ['user_id', 'email', 'first_name', 'last_name']
-                missing_fields = [field for field in required_fields if field not in row or not row[field]]
-                
-                if missing_fields:
-                    errors.append(f"Row missing required fields: {', '.join(missing_fields)}")
-                    continue
-                
-                # Check if user already exists
-                if User.objects.filter(Q(user_id=row['user_id']) | Q(email=row['email'])).exists():
-                    errors.append(f"User with ID {row['user_id']} or email {row['email']} already exists")
-                    continue
-                
-                # Create user with default password
-                user = User.objects.create_user(
-                    username=row['email'],
-                    email=row['email'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name'],
-                    user_id=row['user_id'],
-                    department=row.get('department', ''),
-                    password='ChangeMe123!'  # Default password to be changed on first login
-                )
-                
-                # Set manager if provided
-                if 'manager_email' in row and row['manager_email']:
-                    manager = User.objects.filter(email=row['manager_email']).first()
-                    if manager:
-                        user.manager = manager
-                        user.save()
-                
-                users_created += 1
-                
-                # Create welcome notification
-                NotificationService.create_notification(
-                    user.id,
-                    'system',
-                    'Bienvenue sur Condaura',
-                    f'Bonjour {user.first_name}, bienvenue sur la plateforme Condaura ! Veuillez changer votre mot de passe par défaut.',
-                    '/profile/change-password',
-                    True  # Send email
-                )
-                
-            except Exception as e:
-                errors.append(f"Error processing row: {str(e)}")
-        
-        return Response({
-            'users_created': users_created,
-            'errors': errors
-        }, status=status.HTTP_200_OK)
+        return queue_import(request, 'users', upload, options)
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -211,6 +164,8 @@ class PasswordChangeView(generics.UpdateAPIView):
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)